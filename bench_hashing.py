@@ -0,0 +1,74 @@
+import argparse
+import hashlib
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+from utils.hashing import hash_file, DEFAULT_BUFFER_SIZE
+
+
+def legacy_sha256(file_path):
+    """The original 4 KiB read loop used by the launcher and create_manifest.py."""
+    sha256_hash = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for byte_block in iter(lambda: f.read(4096), b""):
+            sha256_hash.update(byte_block)
+    return sha256_hash.hexdigest()
+
+
+def buffered_sha256(file_path):
+    return hash_file(file_path)[0]
+
+
+def measure(func, file_path, size, rounds):
+    best = None
+    digest = None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        digest = func(file_path)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return digest, size / best / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the legacy 4 KiB hashing loop with utils.hashing.")
+    parser.add_argument("file", nargs="?", help="File to hash (default: temporary random file)")
+    parser.add_argument("--size-mb", type=int, default=256, help="Size of the temporary file in MiB")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per implementation (best is reported)")
+    args = parser.parse_args()
+
+    temp_path = None
+    if args.file:
+        file_path = Path(args.file)
+    else:
+        fd, temp_path = tempfile.mkstemp(suffix=".bin")
+        with os.fdopen(fd, "wb") as f:
+            chunk = os.urandom(DEFAULT_BUFFER_SIZE)
+            for _ in range(args.size_mb):
+                f.write(chunk)
+        file_path = Path(temp_path)
+
+    try:
+        size = file_path.stat().st_size
+        # Warm the page cache so both runs measure per-call overhead, not the disk
+        legacy_sha256(file_path)
+
+        legacy_digest, legacy_speed = measure(legacy_sha256, file_path, size, args.rounds)
+        buffered_digest, buffered_speed = measure(buffered_sha256, file_path, size, args.rounds)
+        assert legacy_digest == buffered_digest, "digest mismatch"
+
+        print(f"File: {file_path} ({size / (1024 * 1024):.0f} MiB)")
+        print(f"legacy 4 KiB read loop : {legacy_speed:8.1f} MB/s")
+        print(f"utils.hashing.hash_file: {buffered_speed:8.1f} MB/s")
+        print(f"speedup                : {buffered_speed / legacy_speed:8.2f}x")
+    finally:
+        if temp_path:
+            os.remove(temp_path)
+
+
+if __name__ == "__main__":
+    main()
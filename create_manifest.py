@@ -1,72 +1,189 @@
+import argparse
 import hashlib
 import json
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import sys
 
-# --- Configuration ---
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+from utils.hashing import hash_file, hash_blocks
+from utils.manifest import (
+    DEFAULT_ALGORITHM, DEFAULT_BLOCK_SIZE, SUPPORTED_ALGORITHMS, build_manifest_document, load_manifest,
+    merkle_root
+)
+
+# --- Default configuration (overridable from the command line) ---
 # The path to your clean, original WoW 3.3.5a client directory.
 WOW_CLIENT_PATH = Path(r"C:\WISE\WOW335")
-# The location of the Data folder.
-DATA_FOLDER_PATH = WOW_CLIENT_PATH / "Data"
 # Where the final manifest file will be saved.
 OUTPUT_MANIFEST_PATH = Path(__file__).parent / "config" / "manifest.json"
+# Size of the blocks hashed for range-precise verification (0 = legacy flat manifest).
+BLOCK_SIZE = DEFAULT_BLOCK_SIZE
+# Number of files hashed at once.
+WORKERS = min(8, os.cpu_count() or 1)
 # --- End Configuration ---
 
-def calculate_sha256(file_path):
-    """Calculates the SHA256 hash of a file."""
-    sha256_hash = hashlib.sha256()
+def calculate_sha256(file_path, algorithm=DEFAULT_ALGORITHM):
+    """Calculates the hash of a file (SHA256 by default)."""
+    try:
+        # Streams the file through a reused buffer (see utils/hashing.py)
+        return hash_file(file_path, algorithm)[0]
+    except IOError as e:
+        print(f"Error reading file {file_path}: {e}")
+        return None
+
+def calculate_block_hashes(file_path, block_size, algorithm=DEFAULT_ALGORITHM):
+    """Calculates the whole-file hash plus per-block hashes and their Merkle root in one pass."""
+    file_hasher = hashlib.new(algorithm)
     try:
-        with open(file_path, "rb") as f:
-            # Read the file in chunks to handle large files efficiently
-            for byte_block in iter(lambda: f.read(4096), b""):
-                sha256_hash.update(byte_block)
-        return sha256_hash.hexdigest()
+        block_digests, _ = hash_blocks(file_path, block_size, algorithm=algorithm, file_hasher=file_hasher)
+        return file_hasher.hexdigest(), [d.hex() for d in block_digests], merkle_root(block_digests, algorithm)
     except IOError as e:
         print(f"Error reading file {file_path}: {e}")
+        return None, None, None
+
+def build_entry(file_path, block_size, algorithm):
+    """Hashes one file and returns its manifest entry (runs on a worker thread or process)."""
+    file_stat = os.stat(file_path)
+    if block_size:
+        file_hash, blocks, root = calculate_block_hashes(file_path, block_size, algorithm)
+    else:
+        file_hash, blocks, root = calculate_sha256(file_path, algorithm), None, None
+    if not file_hash:
         return None
 
-def create_manifest():
-    """Scans the Data folder and creates a manifest of file paths, hashes, sizes, and modification times."""
-    if not DATA_FOLDER_PATH.is_dir():
-        print(f"Error: The specified Data folder does not exist: {DATA_FOLDER_PATH}")
+    entry = {
+        "hash": file_hash,
+        "size": file_stat.st_size,
+        "mtime": file_stat.st_mtime
+    }
+    if blocks is not None:
+        entry["root"] = root
+        entry["blocks"] = blocks
+    return entry
+
+def load_previous_entries(previous_path, block_size, algorithm):
+    """Returns entries of an existing manifest that were built with the same settings."""
+    if not previous_path or not Path(previous_path).is_file():
+        return {}
+    try:
+        previous = load_manifest(previous_path)
+    except (OSError, ValueError) as e:
+        print(f"Ignoring previous manifest {previous_path}: {e}")
+        return {}
+
+    if previous.algorithm != algorithm or (previous.block_size or 0) != (block_size or 0):
+        print("Previous manifest uses a different algorithm or block size; hashing everything.")
+        return {}
+    return previous.files
+
+def can_reuse(entry, file_stat, block_size):
+    return (
+        entry is not None
+        and entry.get("size") == file_stat.st_size
+        and entry.get("mtime") == file_stat.st_mtime
+        and (not block_size or "blocks" in entry)
+    )
+
+def create_manifest(client_path=WOW_CLIENT_PATH, output_path=OUTPUT_MANIFEST_PATH, algorithm=DEFAULT_ALGORITHM,
+                    block_size=BLOCK_SIZE, workers=WORKERS, use_processes=False, previous_path=None):
+    """Scans the Data folder and creates a manifest of file paths, hashes, sizes, and modification times.
+
+    Entries of the previous manifest are reused when size and mtime are unchanged,
+    so only new or modified archives are hashed.
+    """
+    data_folder_path = Path(client_path) / "Data"
+    if not data_folder_path.is_dir():
+        print(f"Error: The specified Data folder does not exist: {data_folder_path}")
+        sys.exit(1)
+    if algorithm not in SUPPORTED_ALGORITHMS:
+        print(f"Error: Unsupported hash algorithm: {algorithm} (use one of {', '.join(SUPPORTED_ALGORITHMS)})")
         sys.exit(1)
 
-    print(f"Scanning files in: {DATA_FOLDER_PATH}")
+    print(f"Scanning files in: {data_folder_path}")
+    previous = load_previous_entries(previous_path, block_size, algorithm)
     manifest = {}
-    
-    files_to_scan = list(DATA_FOLDER_PATH.rglob("*"))
-    total_files = len(files_to_scan)
-    
-    for i, file_path in enumerate(files_to_scan):
-        if file_path.is_file():
-            relative_path = str(file_path.relative_to(DATA_FOLDER_PATH)).replace('\\', '/')
-            
-            progress = (i + 1) / total_files * 100
-            print(f"[{progress:.2f}%] Processing: {relative_path}")
-            
+    to_hash = []
+
+    for file_path in sorted(data_folder_path.rglob("*")):
+        if not file_path.is_file():
+            continue
+        relative_path = str(file_path.relative_to(data_folder_path)).replace('\\', '/')
+        try:
+            file_stat = file_path.stat()
+        except OSError as e:
+            print(f"Could not access file {file_path}: {e}")
+            continue
+
+        if can_reuse(previous.get(relative_path), file_stat, block_size):
+            manifest[relative_path] = previous[relative_path]
+        else:
+            to_hash.append((relative_path, file_path))
+
+    print(f"Reused {len(manifest)} unchanged entries, hashing {len(to_hash)} files with {workers} workers.")
+
+    executor_class = ProcessPoolExecutor if use_processes else ThreadPoolExecutor
+    with executor_class(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(build_entry, str(file_path), block_size, algorithm): relative_path
+            for relative_path, file_path in to_hash
+        }
+        for i, future in enumerate(as_completed(futures)):
+            relative_path = futures[future]
+            progress = (i + 1) / len(futures) * 100
+            print(f"[{progress:.2f}%] Processed: {relative_path}")
             try:
-                file_stat = file_path.stat()
-                file_hash = calculate_sha256(file_path)
-                
-                if file_hash:
-                    manifest[relative_path] = {
-                        "hash": file_hash,
-                        "size": file_stat.st_size,
-                        "mtime": file_stat.st_mtime
-                    }
+                entry = future.result()
             except OSError as e:
-                print(f"Could not access file {file_path}: {e}")
+                print(f"Could not access file {relative_path}: {e}")
+                continue
+            if entry:
+                manifest[relative_path] = entry
 
     print("\nManifest generation complete.")
-    
+
     try:
         # Ensure the config directory exists
-        OUTPUT_MANIFEST_PATH.parent.mkdir(exist_ok=True)
-        with open(OUTPUT_MANIFEST_PATH, "w") as f:
-            json.dump(manifest, f, indent=4)
-        print(f"Successfully saved manifest to: {OUTPUT_MANIFEST_PATH}")
+        output_path = Path(output_path)
+        output_path.parent.mkdir(parents=True, exist_ok=True)
+        document = build_manifest_document(manifest, block_size, algorithm)
+        with open(output_path, "w") as f:
+            # Sorted keys keep manifest diffs reviewable between patches
+            json.dump(document, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Successfully saved manifest to: {output_path}")
     except IOError as e:
         print(f"Error writing manifest file: {e}")
 
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate config/manifest.json from a clean WoW client.")
+    parser.add_argument("source", nargs="?", default=str(WOW_CLIENT_PATH),
+                        help=f"Client directory containing Data (default: {WOW_CLIENT_PATH})")
+    parser.add_argument("-o", "--output", default=str(OUTPUT_MANIFEST_PATH),
+                        help="Manifest file to write (default: config/manifest.json)")
+    parser.add_argument("-a", "--algorithm", default=DEFAULT_ALGORITHM, choices=SUPPORTED_ALGORITHMS,
+                        help="Hash algorithm (default: sha256)")
+    parser.add_argument("-j", "--workers", type=int, default=WORKERS,
+                        help=f"Number of files hashed in parallel (default: {WORKERS})")
+    parser.add_argument("--processes", action="store_true",
+                        help="Use a process pool instead of threads")
+    parser.add_argument("--block-size-mb", type=int, default=BLOCK_SIZE // (1024 * 1024),
+                        help="Block size in MiB for block hashes, 0 for the legacy flat format (default: 4)")
+    parser.add_argument("--previous", default=None,
+                        help="Manifest to reuse unchanged entries from (default: the output file)")
+    parser.add_argument("--no-reuse", action="store_true",
+                        help="Hash every file even if the previous manifest has it")
+    return parser.parse_args(argv)
+
 if __name__ == "__main__":
-    create_manifest()
+    args = parse_args()
+    create_manifest(
+        client_path=Path(args.source),
+        output_path=Path(args.output),
+        algorithm=args.algorithm,
+        block_size=args.block_size_mb * 1024 * 1024,
+        workers=args.workers,
+        use_processes=args.processes,
+        previous_path=None if args.no_reuse else (args.previous or args.output)
+    )
@@ -0,0 +1,180 @@
+import argparse
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+import sys
+
+sys.path.insert(0, str(Path(__file__).parent / "src"))
+from utils.delta import create_delta, DELTA_BLOCK_SIZE
+from utils.hashing import hash_file
+from utils.manifest import DEFAULT_ALGORITHM, SUPPORTED_ALGORITHMS
+
+# --- Default configuration (overridable from the command line) ---
+# Where delta files and the patch index are written (upload this folder to the mirror as "patches/").
+OUTPUT_PATCH_PATH = Path(__file__).parent / "patches"
+INDEX_NAME = "index.json"
+# Deltas larger than this fraction of the new file are dropped; a full download is used instead.
+MAX_DELTA_RATIO = 0.8
+# Number of files diffed at once.
+WORKERS = min(4, os.cpu_count() or 1)
+# --- End Configuration ---
+
+def data_files(client_path):
+    data_folder_path = Path(client_path) / "Data"
+    if not data_folder_path.is_dir():
+        print(f"Error: The specified Data folder does not exist: {data_folder_path}")
+        sys.exit(1)
+    return {
+        str(p.relative_to(data_folder_path)).replace('\\', '/'): p
+        for p in sorted(data_folder_path.rglob("*")) if p.is_file()
+    }
+
+def load_index(index_path, algorithm):
+    """Returns the existing patch index so deltas from older versions are kept."""
+    if not index_path.is_file():
+        return {"format": 1, "algorithm": algorithm, "files": {}}
+    with open(index_path, "r") as f:
+        index = json.load(f)
+    if index.get("algorithm") != algorithm:
+        print("Existing index uses a different algorithm; starting a new one.")
+        return {"format": 1, "algorithm": algorithm, "files": {}}
+    return index
+
+def build_delta(relative_path, old_path, new_path, output_dir, algorithm, block_size):
+    """Diffs one file and returns its index entry, or None if the delta is not worth shipping."""
+    source_hash = hash_file(old_path, algorithm)[0]
+    delta_name = f"{relative_path}.{source_hash[:16]}.delta"
+    delta_path = output_dir / delta_name
+    delta_path.parent.mkdir(parents=True, exist_ok=True)
+    header = create_delta(old_path, new_path, delta_path, algorithm, block_size)
+    delta_size = delta_path.stat().st_size
+    if delta_size > header["target_size"] * MAX_DELTA_RATIO:
+        delta_path.unlink()
+        return None
+    return {
+        "source_hash": header["source_hash"],
+        "source_size": os.path.getsize(old_path),
+        "target_hash": header["target_hash"],
+        "delta": delta_name,
+        "delta_size": delta_size,
+        "delta_hash": hash_file(delta_path, algorithm)[0],
+    }
+
+def create_patch(old_client, new_client, output_dir=OUTPUT_PATCH_PATH, algorithm=DEFAULT_ALGORITHM,
+                 block_size=DELTA_BLOCK_SIZE, workers=WORKERS):
+    """Writes binary deltas for every Data file that changed between two client versions.
+
+    New files are not diffed (the launcher downloads them in full). The index keeps
+    deltas from earlier runs, keyed by the hash of the file they apply to, so players
+    several versions behind can still patch as long as those deltas lead to the current file.
+    """
+    old_files = data_files(old_client)
+    new_files = data_files(new_client)
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    index_path = output_dir / INDEX_NAME
+    index = load_index(index_path, algorithm)
+
+    current = {}
+    dropped = []  # index entries removed in this run
+
+    def current_hash(relative_path):
+        if relative_path not in current:
+            current[relative_path] = hash_file(new_files[relative_path], algorithm)[0]
+        return current[relative_path]
+
+    changed = []
+    for relative_path, new_path in new_files.items():
+        old_path = old_files.get(relative_path)
+        if old_path is None:
+            print(f"New file (full download): {relative_path}")
+            continue
+        if os.path.getsize(old_path) == os.path.getsize(new_path) and \
+                hash_file(old_path, algorithm)[0] == current_hash(relative_path):
+            continue
+        changed.append((relative_path, old_path, new_path))
+
+    print(f"Creating deltas for {len(changed)} changed files with {workers} workers.")
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+        futures = {
+            executor.submit(build_delta, relative_path, old_path, new_path, output_dir, algorithm, block_size):
+                (relative_path, new_path)
+            for relative_path, old_path, new_path in changed
+        }
+        for future in as_completed(futures):
+            relative_path, new_path = futures[future]
+            try:
+                entry = future.result()
+            except OSError as e:
+                print(f"Could not diff {relative_path}: {e}")
+                continue
+            if entry is None:
+                print(f"Skipped {relative_path}: delta is not smaller than the file")
+                continue
+            current[relative_path] = entry["target_hash"]
+            entries = []
+            for e in index["files"].get(relative_path, []):
+                if e["source_hash"] != entry["source_hash"] and e["target_hash"] == entry["target_hash"]:
+                    entries.append(e)
+                else:
+                    dropped.append(e)
+            entries.append(entry)
+            index["files"][relative_path] = entries
+            ratio = entry["delta_size"] / max(1, os.path.getsize(new_path)) * 100
+            print(f"Processed: {relative_path} ({entry['delta_size']} bytes, {ratio:.1f}% of the file)")
+
+    # Deltas that lead to an outdated target can no longer produce the current file
+    for relative_path in list(index["files"]):
+        target_hash = current_hash(relative_path) if relative_path in new_files else None
+        entries = []
+        for e in index["files"][relative_path]:
+            (entries if e["target_hash"] == target_hash else dropped).append(e)
+        index["files"][relative_path] = entries
+        if not index["files"][relative_path]:
+            del index["files"][relative_path]
+
+    try:
+        with open(index_path, "w") as f:
+            json.dump(index, f, indent=4, sort_keys=True)
+            f.write("\n")
+        print(f"Successfully saved patch index to: {index_path}")
+    except IOError as e:
+        print(f"Error writing patch index: {e}")
+        return
+
+    # Remove delta files no longer referenced by the index (a new delta from the
+    # same source reuses the file name, so keep anything still listed)
+    kept = {e["delta"] for entries in index["files"].values() for e in entries}
+    for e in dropped:
+        if e["delta"] not in kept:
+            try:
+                (output_dir / e["delta"]).unlink()
+                print(f"Removed outdated delta: {e['delta']}")
+            except FileNotFoundError:
+                pass
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Generate binary deltas between two WoW client versions.")
+    parser.add_argument("old", help="Previous client directory containing Data")
+    parser.add_argument("new", help="New client directory containing Data (the one the manifest is built from)")
+    parser.add_argument("-o", "--output", default=str(OUTPUT_PATCH_PATH),
+                        help="Folder for deltas and index.json (default: patches)")
+    parser.add_argument("-a", "--algorithm", default=DEFAULT_ALGORITHM, choices=SUPPORTED_ALGORITHMS,
+                        help="Hash algorithm, must match the manifest (default: sha256)")
+    parser.add_argument("-j", "--workers", type=int, default=WORKERS,
+                        help=f"Number of files diffed in parallel (default: {WORKERS})")
+    parser.add_argument("--block-size-kb", type=int, default=DELTA_BLOCK_SIZE // 1024,
+                        help="Match granularity in KiB; smaller finds more reuse but builds slower (default: 64)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args()
+    create_patch(
+        old_client=Path(args.old),
+        new_client=Path(args.new),
+        output_dir=Path(args.output),
+        algorithm=args.algorithm,
+        block_size=args.block_size_kb * 1024,
+        workers=args.workers
+    )
@@ -17,7 +17,7 @@ echo Starting scan...
 echo.
 
 REM Execute the Python script
-python create_manifest.py
+python create_manifest.py %*
 
 echo.
 echo ==================================================
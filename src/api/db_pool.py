@@ -0,0 +1,117 @@
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+import aiomysql
+
+# 런처 하나가 DB에 여는 최대 연결 수 (상태 조회는 순차적이므로 작게)
+DEFAULT_MAXSIZE = 2
+# 이 시간(초) 동안 쓰지 않은 연결은 다음 사용 전에 닫고 새로 연결
+DEFAULT_IDLE_TIMEOUT = 300
+# 이 시간(초) 이상 쉬었던 연결은 사용 전에 ping으로 확인
+HEALTH_CHECK_IDLE = 10
+# 풀이 가득 찼을 때 연결을 기다리는 최대 시간 (초)
+DEFAULT_ACQUIRE_TIMEOUT = 1.0
+# 새 연결을 만들 때 기다리는 최대 시간 (초)
+DEFAULT_CONNECT_TIMEOUT = 3
+# 쉬는 연결을 정리하는 주기의 최대값 (초)
+SWEEP_INTERVAL = 60
+
+
+class PoolExhausted(Exception):
+    """정해진 시간 안에 풀에서 연결을 얻지 못함"""
+
+
+class DatabasePool:
+    """처음 사용할 때 만들고 계속 재사용하는 aiomysql 연결 풀
+
+    매 조회마다 TCP 연결과 인증을 반복하지 않도록 연결을 유지합니다.
+    오래 쉰 연결은 ping으로 확인하고(끊겼으면 다시 연결), idle_timeout 동안
+    아무 연결도 쓰지 않으면 정리 작업이 쉬는 연결을 닫아 DB 서버의 연결을
+    붙잡고 있지 않습니다. 연결 수는 maxsize로 제한하고, 모두 사용 중이면
+    acquire_timeout 뒤 PoolExhausted를 발생시킵니다. 새 연결을 만드는 경우는
+    connect_timeout까지 기다립니다 (시간 초과는 asyncio.TimeoutError).
+    풀은 처음 만든 이벤트 루프에서만 사용해야 합니다.
+    """
+
+    def __init__(self, db_config: dict, maxsize: int = DEFAULT_MAXSIZE,
+                 idle_timeout: float = DEFAULT_IDLE_TIMEOUT,
+                 acquire_timeout: float = DEFAULT_ACQUIRE_TIMEOUT,
+                 connect_timeout: float = DEFAULT_CONNECT_TIMEOUT):
+        self.db_config = db_config
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self.acquire_timeout = acquire_timeout
+        self.connect_timeout = connect_timeout
+        self.logger = logging.getLogger('DatabasePool')
+        self._pool: Optional[aiomysql.Pool] = None
+        self._lock: Optional[asyncio.Lock] = None
+        self._sweeper: Optional[asyncio.Task] = None
+        self._last_release = 0.0
+
+    async def get_pool(self) -> aiomysql.Pool:
+        """풀이 없으면 생성 (동시에 호출되어도 하나만 만듦)"""
+        if self._pool is not None:
+            return self._pool
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            if self._pool is None:
+                self._pool = await asyncio.wait_for(
+                    aiomysql.create_pool(
+                        minsize=0,
+                        maxsize=self.maxsize,
+                        pool_recycle=self.idle_timeout,
+                        connect_timeout=self.connect_timeout,
+                        autocommit=True,
+                        **self.db_config
+                    ),
+                    timeout=self.connect_timeout
+                )
+                self.logger.info(f"DB 연결 풀 생성: {self.db_config.get('db')} (최대 {self.maxsize}개)")
+                self._sweeper = asyncio.ensure_future(self._sweep(self._pool))
+        return self._pool
+
+    async def _sweep(self, pool: aiomysql.Pool):
+        """idle_timeout 동안 쓰지 않은 풀의 쉬는 연결을 닫음"""
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(min(self.idle_timeout, SWEEP_INTERVAL))
+            idle = loop.time() - self._last_release
+            if pool.freesize and pool.size == pool.freesize and idle >= self.idle_timeout:
+                self.logger.debug(f"쉬는 DB 연결 {pool.freesize}개를 닫습니다")
+                await pool.clear()
+
+    @asynccontextmanager
+    async def connection(self):
+        """풀에서 확인된 연결을 빌려 사용. 오류가 난 연결은 풀에 돌려주지 않고 닫음"""
+        pool = await self.get_pool()
+        # 모두 사용 중일 때만 짧게 기다림. 쉬는 연결이 없어도 자리가 있으면 새로 연결
+        full = pool.size >= pool.maxsize and pool.freesize == 0
+        try:
+            conn = await asyncio.wait_for(
+                pool.acquire(), timeout=self.acquire_timeout if full else self.connect_timeout
+            )
+        except asyncio.TimeoutError:
+            if full:
+                raise PoolExhausted(f"no free connection within {self.acquire_timeout}s")
+            raise
+        try:
+            if asyncio.get_running_loop().time() - conn.last_usage > HEALTH_CHECK_IDLE:
+                await asyncio.wait_for(conn.ping(reconnect=True), timeout=self.connect_timeout)
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+        finally:
+            self._last_release = asyncio.get_running_loop().time()
+            pool.release(conn)
+
+    async def close(self):
+        sweeper, self._sweeper = self._sweeper, None
+        if sweeper:
+            sweeper.cancel()
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.close()
+            await pool.wait_closed()
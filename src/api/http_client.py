@@ -0,0 +1,95 @@
+import asyncio
+import random
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional
+import aiohttp
+
+# 런처 전체의 동시 연결 수와 호스트별 연결 수
+CONNECTION_LIMIT = 20
+CONNECTION_LIMIT_PER_HOST = 4
+# DNS 조회 결과 재사용 시간 (초)
+DNS_CACHE_TTL = 300
+# 쉬는 연결을 유지하는 시간 (초)
+KEEPALIVE_TIMEOUT = 30
+DEFAULT_TIMEOUT = aiohttp.ClientTimeout(total=10, connect=5)
+DEFAULT_RETRIES = 2
+# 재시도 대기: BACKOFF_BASE * 2^시도 + 무작위 (초)
+BACKOFF_BASE = 0.5
+# 같은 요청을 다시 보내도 결과가 같은 메서드만 응답 후 재시도
+IDEMPOTENT_METHODS = {"GET", "HEAD", "OPTIONS", "PUT", "DELETE"}
+RETRY_STATUSES = {429, 502, 503, 504}
+
+
+class HttpClient:
+    """런처 전체가 함께 쓰는 aiohttp 세션
+
+    연결(keep-alive)과 DNS 조회 결과를 재사용하고 호스트별 연결 수를 제한합니다.
+    연결 자체에 실패하면 모든 메서드를, 시간 초과나 일시적인 서버 오류(429, 5xx)는
+    멱등 메서드만 지수 백오프로 다시 시도합니다. 세션은 런처의 asyncio 루프에서
+    처음 요청할 때 만들어지며, 같은 루프에서 close()로 닫습니다.
+    """
+
+    def __init__(self, timeout: aiohttp.ClientTimeout = DEFAULT_TIMEOUT, retries: int = DEFAULT_RETRIES):
+        self.timeout = timeout
+        self.retries = retries
+        self.logger = logging.getLogger('HttpClient')
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """공유 세션 (루프 안에서만 호출)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(
+                limit=CONNECTION_LIMIT,
+                limit_per_host=CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=DNS_CACHE_TTL,
+                keepalive_timeout=KEEPALIVE_TIMEOUT
+            )
+            self._session = aiohttp.ClientSession(connector=connector, timeout=self.timeout)
+        return self._session
+
+    def _backoff(self, attempt: int) -> float:
+        delay = BACKOFF_BASE * 2 ** attempt
+        return delay + random.uniform(0, delay / 2)
+
+    @asynccontextmanager
+    async def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs):
+        """재시도를 포함한 요청. 블록이 끝나면 응답을 연결 풀에 돌려줌"""
+        retries = self.retries if retries is None else retries
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        for attempt in range(retries + 1):
+            last = attempt == retries
+            try:
+                response = await self.session.request(method, url, **kwargs)
+            except aiohttp.ClientConnectorError as e:
+                # 요청을 보내기 전에 실패했으므로 어떤 메서드든 다시 보내도 안전
+                if last:
+                    raise
+                self.logger.debug(f"{method} {url} 연결 실패, 다시 시도합니다: {e}")
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                if last or not idempotent:
+                    raise
+                self.logger.debug(f"{method} {url} 오류, 다시 시도합니다: {e}")
+            else:
+                if idempotent and response.status in RETRY_STATUSES and not last:
+                    self.logger.debug(f"{method} {url} 상태 {response.status}, 다시 시도합니다")
+                    response.release()
+                else:
+                    try:
+                        yield response
+                    finally:
+                        response.release()
+                    return
+            await asyncio.sleep(self._backoff(attempt))
+
+    async def get_json(self, url: str, **kwargs):
+        """GET 후 JSON 반환. 2xx가 아니면 aiohttp.ClientResponseError"""
+        async with self.request("GET", url, **kwargs) as response:
+            response.raise_for_status()
+            return await response.json()
+
+    async def close(self):
+        session, self._session = self._session, None
+        if session is not None and not session.closed:
+            await session.close()
@@ -0,0 +1,88 @@
+import math
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# 엔드포인트마다 보관하는 최근 측정 수
+LATENCY_SAMPLES = 20
+DEFAULT_AUTH_PORT = 3724
+
+Endpoint = Tuple[str, int]
+
+
+@dataclass
+class EndpointLatency:
+    host: str
+    port: int
+    p50: Optional[float]  # 초, 성공한 측정이 없으면 None
+    p95: Optional[float]
+    samples: int          # 성공한 측정 수
+    failures: int         # 최근 측정 중 실패 수
+    healthy: bool         # 마지막 측정이 성공했는지
+
+    def describe(self) -> str:
+        if self.p50 is None:
+            return "응답 없음"
+        return f"p50 {self.p50 * 1000:.0f} ms, p95 {self.p95 * 1000:.0f} ms"
+
+
+def _percentile(sorted_values: List[float], fraction: float) -> float:
+    """nearest-rank 백분위수"""
+    return sorted_values[max(0, math.ceil(fraction * len(sorted_values)) - 1)]
+
+
+def parse_gateways(text: str, default_port: int = DEFAULT_AUTH_PORT) -> List[Endpoint]:
+    """'host[:port], host2 ...' 형식의 realmlist 설정을 엔드포인트 목록으로"""
+    endpoints = []
+    for item in text.replace(',', ' ').split():
+        host, _, port = item.partition(':')
+        endpoint = (host, int(port) if port.isdigit() else default_port)
+        if host and endpoint not in endpoints:
+            endpoints.append(endpoint)
+    return endpoints
+
+
+def format_gateway(endpoint: Endpoint, default_port: int = DEFAULT_AUTH_PORT) -> str:
+    host, port = endpoint
+    return host if port == default_port else f"{host}:{port}"
+
+
+class LatencyTracker:
+    """엔드포인트별 최근 왕복 시간을 보관하고 p50/p95와 가장 빠른 엔드포인트를 계산
+
+    실패한 측정은 None으로 기록하며 백분위수에는 포함하지 않습니다.
+    asyncio 루프와 게임 실행 스레드에서 함께 사용합니다.
+    """
+
+    def __init__(self, max_samples: int = LATENCY_SAMPLES):
+        self.max_samples = max_samples
+        self._samples: Dict[Endpoint, deque] = {}
+        self._lock = threading.Lock()
+
+    def record(self, endpoint: Endpoint, rtt: Optional[float]):
+        with self._lock:
+            samples = self._samples.setdefault(endpoint, deque(maxlen=self.max_samples))
+            samples.append(rtt)
+
+    def stats(self, endpoint: Endpoint) -> Optional[EndpointLatency]:
+        """측정한 적이 없으면 None"""
+        with self._lock:
+            samples = list(self._samples.get(endpoint, ()))
+        if not samples:
+            return None
+        values = sorted(s for s in samples if s is not None)
+        return EndpointLatency(
+            host=endpoint[0],
+            port=endpoint[1],
+            p50=_percentile(values, 0.5) if values else None,
+            p95=_percentile(values, 0.95) if values else None,
+            samples=len(values),
+            failures=len(samples) - len(values),
+            healthy=samples[-1] is not None
+        )
+
+    def best(self, endpoints: Iterable[Endpoint]) -> Optional[EndpointLatency]:
+        """마지막 측정이 성공한 엔드포인트 중 p50이 가장 낮은 것. 없으면 None"""
+        healthy = [s for s in (self.stats(e) for e in endpoints) if s and s.healthy and s.p50 is not None]
+        return min(healthy, key=lambda s: s.p50, default=None)
@@ -1,25 +1,71 @@
 import asyncio
 import aiomysql
-from dataclasses import dataclass
-from typing import Optional, Tuple
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
 import time
 import aiohttp
+from api.db_pool import DatabasePool, PoolExhausted
+from api.http_client import HttpClient
+from api.latency import Endpoint, EndpointLatency, LatencyTracker
+
+# 동시에 확인하는 렐름 수
+MAX_CONCURRENT_PROBES = 8
+# acore_auth.realmlist 조회 결과 재사용 시간 (초)
+REALMLIST_CACHE_TIMEOUT = 300
+PROBE_TIMEOUT = 2.0
+# 월드 서버가 연결 직후 보내는 SMSG_AUTH_CHALLENGE의 헤더 (크기 2 + opcode 2)
+WORLD_HEADER_SIZE = 4
+
+@dataclass
+class Realm:
+    id: int
+    name: str
+    address: str
+    port: int
+    gamebuild: int = 12340
+    local_address: str = ""
+
+    @property
+    def endpoints(self) -> List[Endpoint]:
+        """접속 가능한 주소 (공개 주소, 다르면 내부 주소)"""
+        endpoints = [(self.address, self.port)]
+        if self.local_address and self.local_address != self.address:
+            endpoints.append((self.local_address, self.port))
+        return endpoints
+
+@dataclass
+class RealmStatus:
+    realm: Realm
+    online: bool
+    players_online: Optional[int] = None  # 캐릭터 DB를 모르는 렐름은 None
+    # 가장 빠른 주소의 왕복 시간 (매번 달라지므로 상태 비교에서 제외)
+    latency: Optional[EndpointLatency] = field(default=None, compare=False)
 
 @dataclass
 class ServerStatus:
     auth_online: bool
-    world_online: bool
-    players_online: int
+    world_online: bool  # 하나 이상의 렐름이 온라인
+    players_online: int  # 알 수 있는 렐름의 합계
     max_players: int = 1000
     realm_name: str = "WotLK Server"
     uptime: str = "Unknown"
+    realms: List[RealmStatus] = field(default_factory=list)
+    auth_latency: Optional[EndpointLatency] = field(default=None, compare=False)
+
+    @property
+    def realms_online(self) -> int:
+        return sum(1 for r in self.realms if r.online)
 
 class ServerAPI:
-    def __init__(self):
-        """서버 상태 확인을 위한 API 초기화"""
-        # 서버 설정
+    def __init__(self, http_client: Optional[HttpClient] = None):
+        """서버 상태 확인을 위한 API 초기화 (http_client: 런처 공유 HTTP 세션)"""
+        # 서버 설정 (인증 게이트웨이가 여러 개면 set_auth_gateways로 지정)
         self.auth_address = ('127.0.0.1', 3724)
-        self.world_address = ('127.0.0.1', 8085)
+        self.auth_gateways: List[Endpoint] = [self.auth_address]
+        # 엔드포인트별 최근 왕복 시간
+        self.latency = LatencyTracker()
+        # realmlist를 읽을 수 없을 때 사용하는 기본 렐름
+        self.default_realm = Realm(1, "WotLK Server", '127.0.0.1', 8085)
         # DB 설정 (읽기 전용)
         self.db_config = {
             'host': '127.0.0.1',
@@ -28,23 +74,63 @@ class ServerAPI:
             'password': 'root',
             'db': 'acore_characters'
         }
+        # 렐름 id별 캐릭터 DB (온라인 인원 조회용)
+        self.characters_dbs = {1: 'acore_characters'}
+        # 모든 DB 조회가 함께 쓰는 연결 풀 (DB별로 처음 조회할 때 생성)
+        self.auth_pool = DatabasePool(dict(self.db_config, db='acore_auth'))
+        self._character_pools: Dict[int, DatabasePool] = {}
+        self._probe_semaphore = None
         # 캐시
-        self._last_check = None
         self._cache_timeout = 10
-        self._players_cache = None
-        self._players_cache_time = None
+        self._auth_cache: Optional[Tuple[float, bool]] = None
+        self._realm_cache: Dict[int, Tuple[float, RealmStatus]] = {}
+        self._realmlist_cache: Optional[Tuple[float, List[Realm]]] = None
+        self._players_cache: Dict[int, Tuple[float, int]] = {}
         self._players_cache_timeout = 30
         self.base_url = "https://api.server.com"  # API URL
-        
-    async def get_players_count(self) -> int:
-        """Получает количество игроков через БД"""
+        self.http = http_client or HttpClient()
+
+    def _character_pool(self, realm_id: int) -> Optional[DatabasePool]:
+        db = self.characters_dbs.get(realm_id)
+        if db is None:
+            return None
+        if realm_id not in self._character_pools:
+            self._character_pools[realm_id] = DatabasePool(dict(self.db_config, db=db))
+        return self._character_pools[realm_id]
+
+    async def get_realms(self) -> List[Realm]:
+        """acore_auth.realmlist의 렐름 목록 (캐시). 읽을 수 없으면 마지막 목록 또는 기본 렐름"""
+        now = time.time()
+        if self._realmlist_cache and now - self._realmlist_cache[0] < REALMLIST_CACHE_TIMEOUT:
+            return self._realmlist_cache[1]
         try:
-            # 3초 타임아웃으로 DB 연결 시도
-            conn = await asyncio.wait_for(
-                aiomysql.connect(**self.db_config),
-                timeout=3.0
-            )
-            async with conn:
+            async with self.auth_pool.connection() as conn:
+                async with conn.cursor() as cur:
+                    await cur.execute("""
+                        SELECT id, name, address, localAddress, port, gamebuild
+                        FROM realmlist
+                        ORDER BY id
+                    """)
+                    rows = await cur.fetchall()
+            realms = [Realm(int(r[0]), r[1], r[2], int(r[4]), int(r[5]), local_address=r[3] or "") for r in rows]
+            if realms:
+                self._realmlist_cache = (now, realms)
+                return realms
+        except (PoolExhausted, asyncio.TimeoutError, OSError, aiomysql.Error) as e:
+            print(f"Realm list unavailable: {e}")
+        return self._realmlist_cache[1] if self._realmlist_cache else [self.default_realm]
+
+    async def get_players_count(self, realm_id: int = 1) -> Optional[int]:
+        """Получает количество игроков через БД (캐릭터 DB를 모르는 렐름은 None)"""
+        pool = self._character_pool(realm_id)
+        if pool is None:
+            return None
+        cached = self._players_cache.get(realm_id)
+        # 캐시가 유효하면 DB에 묻지 않음
+        if cached and time.time() - cached[0] < self._players_cache_timeout:
+            return cached[1]
+        try:
+            async with pool.connection() as conn:
                 async with conn.cursor() as cur:
                     # Запрос согласно структуре БД AzerothCore
                     await cur.execute("""
@@ -55,66 +141,111 @@ class ServerAPI:
                     result = await cur.fetchone()
                     count = result[0] if result else 0
                     
-                    print(f"Current online players: {count}")  # Отладочный вывод
+                    print(f"Current online players (realm {realm_id}): {count}")  # Отладочный вывод
                     
                     # Обновляем кэш
-                    self._players_cache = count
-                    self._players_cache_time = time.time()
+                    self._players_cache[realm_id] = (time.time(), count)
                     
                     return count
-        except (asyncio.TimeoutError, ConnectionRefusedError) as e:
+        except PoolExhausted as e:
+            # 다른 조회가 연결을 모두 사용 중: 마지막 값을 그대로 사용
+            print(f"DB pool busy: {e}")
+            return cached[1] if cached else 0
+        except (asyncio.TimeoutError, OSError, aiomysql.Error) as e:
             print(f"DB connection failed: {e}")
-            return self._players_cache if self._players_cache is not None else 0
+            return cached[1] if cached else 0
 
-    async def check_server(self, host: str, port: int) -> bool:
-        """Проверяет доступность сервера"""
+    async def close(self):
+        """DB 연결 풀 닫기 (런처 종료 시 이벤트 루프에서 호출)"""
+        await self.auth_pool.close()
+        for pool in self._character_pools.values():
+            await pool.close()
+
+    def set_auth_gateways(self, gateways: List[Endpoint]):
+        """인증 서버 주소 목록 (설정의 realmlist). 비어 있으면 기본 주소"""
+        self.auth_gateways = list(gateways) or [self.auth_address]
+        self._auth_cache = None
+
+    async def probe(self, host: str, port: int, expect_challenge: bool = False) -> Optional[float]:
+        """연결(월드 서버는 인증 요청 수신까지) 왕복 시간(초)을 측정해 기록. 실패하면 None"""
+        started = time.perf_counter()
+        rtt = None
         try:
-            # Создаем футуру с таймаутом в 2 секунды
             reader, writer = await asyncio.wait_for(
                 asyncio.open_connection(host, port),
-                timeout=2.0
+                timeout=PROBE_TIMEOUT
             )
-            writer.close()
-            await writer.wait_closed()
-            print(f"Server {host}:{port} is online")
-            return True
-        except (ConnectionRefusedError, asyncio.TimeoutError):
-            print(f"Server {host}:{port} is offline")
-            return False
+            try:
+                if expect_challenge:
+                    # 월드 서버는 연결되면 바로 SMSG_AUTH_CHALLENGE를 보냄 (로그인 시도 없이 응답 시간 측정)
+                    await asyncio.wait_for(reader.readexactly(WORLD_HEADER_SIZE), timeout=PROBE_TIMEOUT)
+                rtt = time.perf_counter() - started
+            finally:
+                writer.close()
+                try:
+                    await writer.wait_closed()
+                except OSError:
+                    pass
+        except (OSError, asyncio.TimeoutError, asyncio.IncompleteReadError) as e:
+            print(f"Server {host}:{port} is offline ({e.__class__.__name__})")
         except Exception as e:
             print(f"Error checking server {host}:{port}: {e}")
-            return False
+        self.latency.record((host, port), rtt)
+        return rtt
 
-    async def get_server_status(self) -> ServerStatus:
-        """Получает статус серверов"""
-        # Проверяем кэш
-        if self._last_check:
-            if (asyncio.get_event_loop().time() - self._last_check[0]) < self._cache_timeout:
-                return self._last_check[1]
-        
-        try:
-            # Проверяем оба сервера параллельно
-            auth_check, world_check = await asyncio.gather(
-                self.check_server(self.auth_address[0], self.auth_address[1]),
-                self.check_server(self.world_address[0], self.world_address[1])
-            )
-            
-            # Если world сервер онлайн, получаем количество игроков
-            players_online = 0
-            if world_check:
+    async def check_server(self, host: str, port: int) -> bool:
+        """Проверяет доступность сервера"""
+        return await self.probe(host, port) is not None
+
+    async def check_auth(self) -> bool:
+        """인증 게이트웨이를 모두 확인해 하나라도 응답하면 온라인 (캐시)"""
+        now = time.time()
+        if self._auth_cache and now - self._auth_cache[0] < self._cache_timeout:
+            return self._auth_cache[1]
+        results = await asyncio.gather(*(self.probe(host, port) for host, port in self.auth_gateways))
+        online = any(rtt is not None for rtt in results)
+        self._auth_cache = (now, online)
+        return online
+
+    async def check_realm(self, realm: Realm) -> RealmStatus:
+        """렐름 하나의 월드 서버와 온라인 인원 확인 (렐름별 캐시, 동시 확인 수 제한)"""
+        cached = self._realm_cache.get(realm.id)
+        if cached and time.time() - cached[0] < self._cache_timeout and cached[1].realm == realm:
+            return cached[1]
+        if self._probe_semaphore is None:
+            self._probe_semaphore = asyncio.Semaphore(MAX_CONCURRENT_PROBES)
+        async with self._probe_semaphore:
+            results = await asyncio.gather(*(
+                self.probe(host, port, expect_challenge=True) for host, port in realm.endpoints
+            ))
+            online = any(rtt is not None for rtt in results)
+            players = None
+            if online:
                 try:
-                    players_online = await self.get_players_count()
+                    players = await self.get_players_count(realm.id)
                 except Exception as e:
                     print(f"Error getting players count: {e}")
+        status = RealmStatus(realm=realm, online=online, players_online=players,
+                             latency=self.latency.best(realm.endpoints))
+        self._realm_cache[realm.id] = (time.time(), status)
+        return status
 
-            print(f"Status: auth={auth_check}, world={world_check}, players={players_online}")
+    async def get_server_status(self) -> ServerStatus:
+        """Получает статус серверов (인증 서버와 모든 렐름을 동시에 확인한 하나의 결과)"""
+        try:
+            auth_check, realms = await asyncio.gather(self.check_auth(), self.get_realms())
+            realm_statuses = await asyncio.gather(*(self.check_realm(realm) for realm in realms))
+
+            players_online = sum(r.players_online or 0 for r in realm_statuses)
             status = ServerStatus(
                 auth_online=auth_check,
-                world_online=world_check,
-                players_online=players_online
+                world_online=any(r.online for r in realm_statuses),
+                players_online=players_online,
+                realm_name=realm_statuses[0].realm.name if len(realm_statuses) == 1 else f"{len(realm_statuses)}개 렐름",
+                realms=list(realm_statuses),
+                auth_latency=self.latency.best(self.auth_gateways)
             )
-            # Сохраняем результат в кэш
-            self._last_check = (asyncio.get_event_loop().time(), status)
+            print(f"Status: auth={auth_check}, realms={status.realms_online}/{len(realm_statuses)}, players={players_online}")
             return status
         except Exception as e:
             print(f"Error in get_server_status: {e}")
@@ -127,12 +258,7 @@ class ServerAPI:
     async def get_client_info(self) -> dict:
         """서버에서 클라이언트 정보를 가져옵니다"""
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.base_url}/client/info") as response:
-                    if response.status == 200:
-                        return await response.json()
-                    else:
-                        raise Exception("Failed to get client info")
-        except Exception as e:
-            self.logger.error(f"Error getting client info: {e}")
+            return await self.http.get_json(f"{self.base_url}/client/info")
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+            print(f"Error getting client info: {e}")
             raise 
@@ -0,0 +1,175 @@
+import asyncio
+import random
+import time
+import logging
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Optional
+from api.server_api import ServerStatus
+
+# 창이 보일 때 기본 조회 주기 (초)
+VISIBLE_INTERVAL = 30.0
+# 가용 상태가 바뀐 직후 SETTLE_WINDOW초 동안은 더 자주 조회
+FAST_INTERVAL = 10.0
+SETTLE_WINDOW = 120.0
+# 창이 숨겨졌을 때 (트레이) 조회 주기
+HIDDEN_INTERVAL = 120.0
+# 서버가 오프라인일 때 지수 백오프 (처음 값, 창이 보일 때/숨겨졌을 때 최대값)
+OFFLINE_BASE = 15.0
+OFFLINE_MAX_VISIBLE = 60.0
+OFFLINE_MAX = 300.0
+# 모든 런처가 같은 순간에 조회하지 않도록 주기에 더하는 무작위 비율
+JITTER = 0.2
+# 게임 실행 중에는 조회하지 않고 이 주기로 게임 종료만 확인
+GAME_CHECK_INTERVAL = 15.0
+
+
+@dataclass
+class StatusTransition:
+    previous: Optional[ServerStatus]
+    current: ServerStatus
+
+    @property
+    def availability_changed(self) -> bool:
+        return self.previous is None or _availability(self.previous) != _availability(self.current)
+
+
+def _availability(status: ServerStatus) -> tuple:
+    """인증 서버와 렐름별 온라인 여부 (인원 변화는 제외)"""
+    return status.auth_online, status.world_online, tuple((r.realm.id, r.online) for r in status.realms)
+
+
+def _online(status: ServerStatus) -> bool:
+    return status.auth_online and status.world_online
+
+
+class StatusPoller:
+    """서버 상태를 상황에 맞는 주기로 조회하고 바뀔 때만 알림
+
+    창이 보이면 VISIBLE_INTERVAL, 상태가 막 바뀌었으면 FAST_INTERVAL,
+    트레이에 숨겨졌으면 HIDDEN_INTERVAL마다 조회합니다. 서버가 오프라인이면
+    지수 백오프로 간격을 늘리고, 모든 간격에 무작위 값을 섞어 서버 재시작
+    후에도 런처들이 한꺼번에 조회하지 않게 합니다. 게임이 실행 중이면 조회를
+    멈춥니다. on_transition은 조회 결과가 이전과 다를 때만 루프 스레드에서
+    호출됩니다. 왕복 시간처럼 비교에서 빠지는 값은 on_refresh로 매번 전달합니다.
+    """
+
+    def __init__(self, fetch: Callable[[], Awaitable[ServerStatus]],
+                 on_transition: Callable[[StatusTransition], None],
+                 game_running: Optional[Callable[[], bool]] = None,
+                 on_refresh: Optional[Callable[[ServerStatus], None]] = None):
+        self.fetch = fetch
+        self.on_transition = on_transition
+        self.on_refresh = on_refresh
+        self.game_running = game_running
+        self.logger = logging.getLogger('StatusPoller')
+        self.visible = True
+        self.last_status: Optional[ServerStatus] = None
+        self._changed_at = 0.0
+        self._failures = 0
+        self._suspended = False
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """loop에서 조회 시작 (다른 스레드에서 호출 가능)"""
+        self._loop = loop
+        loop.call_soon_threadsafe(self._start_task)
+
+    def _start_task(self):
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+
+    async def stop(self):
+        """조회 중단 (루프에서 실행)"""
+        task, self._task = self._task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    def wake(self):
+        """기다리지 않고 바로 조회 (다른 스레드에서 호출 가능)"""
+        if self._loop and self._wake:
+            self._loop.call_soon_threadsafe(self._wake.set)
+
+    def set_visible(self, visible: bool):
+        """창 표시 여부 갱신. 다시 보이면 바로 조회"""
+        changed = visible != self.visible
+        self.visible = visible
+        if visible and changed:
+            self.wake()
+
+    def next_interval(self, status: ServerStatus) -> float:
+        if not _online(status):
+            self._failures += 1
+            cap = OFFLINE_MAX_VISIBLE if self.visible else OFFLINE_MAX
+            base = min(cap, OFFLINE_BASE * 2 ** (self._failures - 1))
+            return random.uniform(base / 2, base)
+        self._failures = 0
+        if not self.visible:
+            base = HIDDEN_INTERVAL
+        elif time.monotonic() - self._changed_at < SETTLE_WINDOW:
+            base = FAST_INTERVAL
+        else:
+            base = VISIBLE_INTERVAL
+        return base * random.uniform(1 - JITTER, 1 + JITTER)
+
+    async def _sleep(self, delay: float):
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=delay)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _is_game_running(self) -> bool:
+        if self.game_running is None:
+            return False
+        try:
+            # 프로세스 조회는 블로킹이므로 루프 밖에서
+            return await asyncio.get_running_loop().run_in_executor(None, self.game_running)
+        except Exception as e:
+            self.logger.debug(f"게임 실행 여부를 확인할 수 없습니다: {e}")
+            return False
+
+    async def _poll(self) -> ServerStatus:
+        try:
+            return await self.fetch()
+        except Exception as e:
+            self.logger.warning(f"서버 상태 조회 오류: {e}")
+            return ServerStatus(auth_online=False, world_online=False, players_online=0)
+
+    def _publish(self, status: ServerStatus):
+        if status == self.last_status:
+            # 상태는 같아도 왕복 시간은 새 값으로
+            self.last_status = status
+            if self.on_refresh:
+                self.on_refresh(status)
+            return
+        transition = StatusTransition(self.last_status, status)
+        self.last_status = status
+        if transition.availability_changed:
+            self._changed_at = time.monotonic()
+            self.logger.info(
+                f"서버 상태 변경: auth={status.auth_online}, "
+                f"realms={status.realms_online}/{len(status.realms)}"
+            )
+        self.on_transition(transition)
+
+    async def _run(self):
+        while True:
+            if await self._is_game_running():
+                if not self._suspended:
+                    self._suspended = True
+                    self.logger.info("게임 실행 중: 서버 상태 조회를 멈춥니다")
+                await self._sleep(GAME_CHECK_INTERVAL)
+                continue
+            if self._suspended:
+                self._suspended = False
+                self.logger.info("게임 종료: 서버 상태 조회를 다시 시작합니다")
+            status = await self._poll()
+            self._publish(status)
+            await self._sleep(self.next_interval(status))
@@ -71,8 +71,9 @@ def main():
         
         loop_ready_event.wait()
 
-        window.update_server_status()
+        window.start_status_polling()
         window.show()
+        window.start_background_verification()
         
         sys.exit(app.exec())
 
@@ -2,18 +2,24 @@ from PySide6.QtWidgets import (
     QDialog, QVBoxLayout, QProgressBar, 
     QLabel, QPushButton, QWidget, QHBoxLayout
 )
-from PySide6.QtCore import Qt, Signal, QObject
+from PySide6.QtCore import Qt, Signal, QObject, QTimer
 from pathlib import Path
 import humanize
+from utils.progress import TransferSnapshot
+
+# 진행률 표시 갱신 주기 (ms)
+REFRESH_INTERVAL = 250
 
 class DownloadSignals(QObject):
-    progress = Signal(float, str, float)  # прогресс, состояние, скорость
+    progress = Signal(object)  # TransferSnapshot
     finished = Signal()
     error = Signal(str)
 
 class DownloadDialog(QDialog):
-    def __init__(self, parent=None):
+    def __init__(self, parent=None, launcher=None):
         super().__init__(parent)
+        # pause_download/resume_download/cancel_download을 제공하는 GameLauncher
+        self.launcher = launcher
         self.signals = DownloadSignals()
         self.setup_ui()
         
@@ -21,6 +27,12 @@ class DownloadDialog(QDialog):
         self.signals.progress.connect(self.update_progress)
         self.signals.finished.connect(self.on_finished)
         self.signals.error.connect(self.on_error)
+
+        # 백엔드가 보고하는 빈도와 관계없이 일정한 주기로 전송 통계를 조회
+        self.refresh_timer = QTimer(self)
+        self.refresh_timer.timeout.connect(self.refresh)
+        if self.launcher:
+            self.refresh_timer.start(REFRESH_INTERVAL)
         
     def setup_ui(self):
         self.setWindowTitle("Загрузка клиента")
@@ -68,41 +80,56 @@ class DownloadDialog(QDialog):
         
         layout.addWidget(button_widget)
         
-    def update_progress(self, progress: float, state: str, speed: float):
+    def refresh(self):
+        self.update_progress(self.launcher.transfer_stats.snapshot())
+
+    def update_progress(self, snapshot: TransferSnapshot):
         """Обновляет информацию о прогрессе"""
-        self.progress_bar.setValue(int(progress))
-        self.status_label.setText(state)
+        self.progress_bar.setValue(int(snapshot.percent))
+        self.status_label.setText(snapshot.label)
         
-        # Обновляем скорость
-        speed_str = humanize.naturalsize(speed, binary=True) + "/s"
+        # Обновляем скорость (평활한 현재 속도와 최근 평균/최고)
+        speed_str = humanize.naturalsize(snapshot.speed, binary=True) + "/s"
         self.speed_label.setText(f"Скорость: {speed_str}")
-        
-        # Расчет оставшегося времени
-        if speed > 0:
-            remaining = (100 - progress) / (progress / self.start_time)
-            time_str = humanize.naturaltime(remaining)
-            self.time_label.setText(f"Осталось: {time_str}")
+        self.speed_label.setToolTip(
+            f"Средняя: {humanize.naturalsize(snapshot.average, binary=True)}/s, "
+            f"максимум: {humanize.naturalsize(snapshot.peak, binary=True)}/s"
+        )
+        
+        # 남은 바이트와 평활한 속도로 계산한 남은 시간 (추정 전에는 --:--)
+        if snapshot.eta >= 0:
+            eta = int(snapshot.eta)
+            self.time_label.setText(f"Осталось: {eta // 3600:d}:{eta % 3600 // 60:02d}:{eta % 60:02d}")
+        else:
+            self.time_label.setText("Осталось: --:--")
             
     def toggle_pause(self):
         """Пауза/продолжение загрузки"""
         if self.pause_button.text() == "Пауза":
             self.pause_button.setText("Продолжить")
-            # TODO: Реализовать паузу
+            if self.launcher:
+                self.launcher.pause_download()
         else:
             self.pause_button.setText("Пауза")
-            # TODO: Реализовать продолжение
+            if self.launcher:
+                self.launcher.resume_download()
             
     def cancel_download(self):
         """Отмена загрузки"""
-        # TODO: Реализовать отмену
+        # 받은 부분은 남겨두고 다음 다운로드에서 이어받음
+        if self.launcher:
+            self.launcher.cancel_download()
+        self.refresh_timer.stop()
         self.reject()
         
     def on_finished(self):
         """Обработчик завершения загрузки"""
+        self.refresh_timer.stop()
         self.status_label.setText("Загрузка завершена")
         self.accept()
         
     def on_error(self, message: str):
         """Обработчик ошибки"""
+        self.refresh_timer.stop()
         self.status_label.setText(f"Ошибка: {message}")
         self.reject() 
\ No newline at end of file
@@ -15,12 +15,15 @@ from PySide6.QtGui import (
     QPainter, QLinearGradient, QColor, QAction
 )
 from api.server_api import ServerAPI
+from api.http_client import HttpClient
+from api.status_poller import StatusPoller, StatusTransition
+from api.latency import parse_gateways
 from api.auth_api import AuthResult
 import asyncio
 import sys
 from ui.login_dialog import LoginDialog
 from utils.game_launcher import GameLauncher
-from utils.resource_path import resource_path
+from utils.resource_path import resource_path, app_data_path
 import platform
 import humanize
 import webbrowser
@@ -32,6 +35,8 @@ DEFAULT_ICON_SIZE = QSize(20, 20)
 PLAY_BUTTON_SIZE = QSize(200, 50)
 SETTINGS_BUTTON_SIZE = QSize(40, 40)
 PROGRESS_BAR_HEIGHT = 4
+# 다운로드 진행률 표시 갱신 주기 (ms). 백엔드 보고 빈도와 관계없이 이 주기로만 다시 그림
+DOWNLOAD_REFRESH_INTERVAL = 250
 
 # 색상
 COLOR_PRIMARY = "#FFB100"
@@ -55,8 +60,10 @@ class Card(QFrame):
 
 class MainWindow(QMainWindow):
     server_status_updated = Signal(dict)
+    realms_tooltip_updated = Signal(str)
     game_launch_success = Signal()
     game_launch_error = Signal(str, str)
+    repair_requested = Signal(object)  # VerificationReport
 
     def __init__(self):
         super().__init__()
@@ -70,17 +77,12 @@ class MainWindow(QMainWindow):
         # 비동기 작업을 위한 이벤트 루프 준비
         self.loop = None
         
-        # API 클라이언트 초기화
-        self.server_api = ServerAPI()
-        
-        # 상태 업데이트 타이머
-        self.status_timer = QTimer()
-        self.status_timer.timeout.connect(self.update_server_status)
-        self.status_timer.start(30000)  # 30초마다 업데이트
+        # API 클라이언트 초기화 (HTTP 세션은 비동기 루프에서 처음 요청할 때 생성되어 계속 재사용)
+        self.http_client = HttpClient()
+        self.server_api = ServerAPI(self.http_client)
         
         # --- 설정 경로 수정 ---
-        app_data_path = Path(os.getenv('LOCALAPPDATA')) / 'WoWLauncher'
-        self.settings_file = app_data_path / "settings.json"
+        self.settings_file = app_data_path() / "settings.json"
         
         self.default_settings = {
             "game": {
@@ -97,19 +99,63 @@ class MainWindow(QMainWindow):
                 "username": None,
                 "account_id": None,
                 "auto_login": False
+            },
+            "verification": {
+                "workers": 4,  # 드라이브당 동시 해시 스레드 수
+                "workers_per_drive": {},  # 예: {"D:": 2} (HDD는 낮게)
+                "background_workers": 1,  # 시작 시 미리 검사할 때의 스레드 수
+                "max_age": 600,  # 미리 검사한 결과를 재사용하는 시간 (초)
+                "watch": True,  # Data 폴더를 감시해 변경된 파일만 다시 검사
+                "spot_samples": 2,  # 표본 검사 시 파일마다 해시하는 블록 수
+                "full_interval_hours": 168  # 전체 해시 검증 주기
+            },
+            "download": {
+                "method": "http",  # "http" 또는 "torrent" (assets/client/wow-3.3.5.torrent)
+                "mirror_url": "",  # 클라이언트 파일을 받을 HTTP 미러 (Data/... 경로로 요청)
+                "connections": 4,  # 동시 Range 요청 수
+                "segment_size_mb": 16  # 요청 하나가 받는 구간 크기
+            },
+            "bandwidth": {
+                "network_limit_kb": 0,  # 전체 다운로드/업로드 속도 제한 (KiB/s, 0 = 제한 없음)
+                "disk_limit_mb": 0,  # 전체 디스크 읽기/쓰기 속도 제한 (MiB/s, 0 = 제한 없음)
+                "playing_network_kb": 1024,  # 게임 실행 중 네트워크 제한
+                "playing_disk_mb": 8  # 게임 실행 중 디스크 제한
+            },
+            "store": {
+                "enabled": False,  # 여러 클라이언트 설치가 같은 파일을 공유 (하드링크/reflink)
+                "path": ""  # 비어 있으면 런처 데이터 폴더/objects (설치와 같은 드라이브여야 함)
+            },
+            "lan": {
+                "enabled": False,  # 같은 네트워크의 런처끼리 검증된 파일을 주고받음
+                "port": 0  # 파일 제공 HTTP 포트 (0 = 자동)
             }
         }
         
         self.settings = self.load_settings()
+        # realmlist에 인증 서버 주소를 여러 개 적으면 모두 측정해 가장 빠른 주소로 접속
+        self.server_api.set_auth_gateways(parse_gateways(self.settings.get('game', {}).get('realmlist', '')))
         self.game_launcher = GameLauncher(self.settings, self)
         self.current_user = None
         
         # GameLauncher 시그널 연결
         self.game_launcher.signals.client_missing.connect(self.show_download_buttons)
-        self.game_launcher.signals.download_progress.connect(self.update_download_progress)
+        self.download_refresh_timer = QTimer()
+        self.download_refresh_timer.timeout.connect(self.update_download_progress)
         self.game_launcher.signals.download_error.connect(self.on_download_error)
+        self.game_launcher.signals.download_finished.connect(self.on_download_finished)
         self.game_launcher.signals.login_required.connect(self.handle_login_required)
         self.game_launcher.signals.verification_progress.connect(self.update_verification_progress)
+        self.game_launcher.signals.verification_state.connect(self.on_verification_state_changed)
+        self.game_launcher.signals.io_allocations.connect(self.update_io_allocations)
+        # LAN 피어 (설치가 없어도 다른 런처에서 받을 수 있도록 바로 시작)
+        self.game_launcher.start_lan_peer()
+        # 서버 상태 조회 (창 표시 여부, 서버 상태, 게임 실행에 따라 주기 조정)
+        self.status_poller = StatusPoller(
+            self.server_api.get_server_status,
+            on_transition=self._on_status_transition,
+            game_running=self.game_launcher.is_game_running,
+            on_refresh=self._on_status_refresh
+        )
         
         # 저장된 인증 정보 확인
         auth = self.settings.get('auth', {})
@@ -172,8 +218,11 @@ class MainWindow(QMainWindow):
         main_layout.addWidget(footer)
         
         self.server_status_updated.connect(self._on_server_status_updated)
+        self.realms_tooltip_updated.connect(self._on_realms_tooltip_updated)
         self.game_launch_success.connect(self.handle_game_launch_success)
         self.game_launch_error.connect(self.handle_game_launch_error)
+        self.repair_requested.connect(self.ask_repair)
+        self.game_launcher.signals.repair_finished.connect(self.on_repair_finished)
         
         # 저장된 세션이 있으면 UI 업데이트
         # 저장된 세션이 있으면 UI 업데이트
@@ -519,6 +568,12 @@ class MainWindow(QMainWindow):
                 label.setProperty(key, value)
         return label
 
+    def _on_realms_tooltip_updated(self, tooltip):
+        """상태 변화 없이 왕복 시간만 바뀌었을 때 툴팁만 갱신"""
+        status_card = self.findChild(Card, "status_card")
+        if status_card:
+            status_card.setToolTip(tooltip)
+
     def _on_server_status_updated(self, status_data):
         """서버 상태 시그널을 받아 UI를 업데이트하는 슬롯"""
         if status_data:
@@ -544,6 +599,8 @@ class MainWindow(QMainWindow):
                 status_card.update()
             
             self.realm_name.setText(status_data['realm_name'])
+            if status_card:
+                status_card.setToolTip(status_data['realms_tooltip'])
             self.online_count.setText(str(status_data['players_online']))
             self.online_trend.setText(f"↑ {status_data['players_online']} / {status_data['max_players']}")
         else:
@@ -559,43 +616,57 @@ class MainWindow(QMainWindow):
                 status_card.style().unpolish(status_card)
                 status_card.style().polish(status_card)
 
-    def update_server_status(self):
-        """서버 상태 정보 업데이트"""
-        async def get_status():
-            status = await self.server_api.get_server_status()
-            status_data = {}
-            if status:
-                online = status.auth_online and status.world_online
-                
-                if online:
-                    status_text = "온라인"
-                elif not status.auth_online and not status.world_online:
-                    status_text = "오프라인"
-                elif not status.auth_online:
-                    status_text = "인증 서버 오프라인"
-                else:
-                    status_text = "월드 서버 오프라인"
-
-                status_data = {
-                    'online': online,
-                    'status_text': status_text,
-                    'realm_name': status.realm_name,
-                    'players_online': status.players_online,
-                    'max_players': status.max_players,
-                }
-            # 메인 스레드로 데이터 전송
-            self.server_status_updated.emit(status_data)
-
-        # 이벤트 루프에서 비동기 작업 실행
-        future = asyncio.run_coroutine_threadsafe(get_status(), self.loop)
-        future.add_done_callback(lambda f: self.handle_status_update_error(f))
-
-    def handle_status_update_error(self, future):
-        """상태 업데이트 오류 처리"""
-        try:
-            future.result()
-        except Exception as e:
-            print(f"서버 상태 업데이트 오류: {e}")
+    def start_status_polling(self):
+        """비동기 루프가 준비된 뒤 서버 상태 조회 시작"""
+        self.status_poller.start(self.loop)
+
+    def _on_status_transition(self, transition: StatusTransition):
+        """서버 상태가 바뀌었을 때만 호출됨 (비동기 루프 스레드)"""
+        status = transition.current
+        online = status.auth_online and status.world_online
+
+        if online:
+            status_text = "온라인"
+        elif not status.auth_online and not status.world_online:
+            status_text = "오프라인"
+        elif not status.auth_online:
+            status_text = "인증 서버 오프라인"
+        else:
+            status_text = "월드 서버 오프라인"
+
+        # 렐름이 여러 개면 온라인 렐름 수를 표시하고 렐름별 상태는 툴팁으로
+        realm_name = status.realm_name
+        if len(status.realms) > 1:
+            realm_name = f"{status.realms_online}/{len(status.realms)} 렐름 온라인"
+
+        status_data = {
+            'online': online,
+            'status_text': status_text,
+            'realm_name': realm_name,
+            'realms_tooltip': self._realms_tooltip(status),
+            'players_online': status.players_online,
+            'max_players': status.max_players,
+        }
+        # 메인 스레드로 데이터 전송
+        self.server_status_updated.emit(status_data)
+
+    def _on_status_refresh(self, status):
+        """상태는 같고 왕복 시간만 새로 잰 경우 (비동기 루프 스레드)"""
+        self.realms_tooltip_updated.emit(self._realms_tooltip(status))
+
+    @staticmethod
+    def _realms_tooltip(status) -> str:
+        """렐름별 상태와 왕복 시간 (p50/p95, 가장 빠른 주소 기준)"""
+        realm_lines = [
+            f"{r.realm.name}: " + (
+                ("온라인" if r.players_online is None else f"온라인 ({r.players_online}명)")
+                if r.online else "오프라인"
+            ) + (f" - {r.latency.describe()}" if r.online and r.latency else "")
+            for r in status.realms
+        ]
+        if status.auth_latency:
+            realm_lines.insert(0, f"인증 서버: {status.auth_latency.describe()}")
+        return "\n".join(realm_lines)
 
     def show_login(self):
         """인증 대화 상자 표시"""
@@ -735,15 +806,14 @@ class MainWindow(QMainWindow):
         payload = {"username": self.current_user.username}
 
         try:
-            async with aiohttp.ClientSession() as session:
-                async with session.post(url, json=payload, timeout=5) as response:
-                    if response.status == 200:
-                        print(f"성공적으로 게임 접속을 요청했습니다: {self.current_user.username}")
-                        return True, "Success"
-                    else:
-                        error_text = await response.text()
-                        return False, f"게임 접속 요청에 실패했습니다. (상태: {response.status})\n{error_text}"
-        except aiohttp.ClientError as e:
+            async with self.http_client.request("POST", url, json=payload) as response:
+                if response.status == 200:
+                    print(f"성공적으로 게임 접속을 요청했습니다: {self.current_user.username}")
+                    return True, "Success"
+                else:
+                    error_text = await response.text()
+                    return False, f"게임 접속 요청에 실패했습니다. (상태: {response.status})\n{error_text}"
+        except (aiohttp.ClientError, asyncio.TimeoutError) as e:
             return False, f"백엔드 서버에 연결할 수 없습니다.\n{e}"
 
     async def launch_game(self):
@@ -772,9 +842,17 @@ class MainWindow(QMainWindow):
                     self.current_user.account_id
                 )
 
-            verified, message = await self.loop.run_in_executor(None, self.game_launcher.verify_data_files)
-            if not verified:
-                self.game_launch_error.emit("파일 오류", message)
+            # 백그라운드 검사 결과를 재사용하거나 진행 중인 검사에 합류
+            report = await asyncio.wrap_future(self.game_launcher.background_verifier.request())
+            if report.cancelled:
+                # 사용자가 취소한 경우 오류 창 없이 종료
+                return
+            if not report.ok:
+                if report.complete and self.get_setting('download', 'mirror_url'):
+                    # 전체 재설치 대신 실패한 파일(블록)만 복구할 수 있음
+                    self.repair_requested.emit(report)
+                else:
+                    self.game_launch_error.emit("파일 오류", report.message())
                 return
             
             if self.game_launcher.launch_game():
@@ -830,23 +908,100 @@ class MainWindow(QMainWindow):
         self.progress_bar.setRange(0, 100)
         self.progress_bar.setValue(0)
         self.footer_layout.insertWidget(1, self.progress_bar)
+        # 다운로드/복구 일시정지 (같은 작업 안에서 이어서 받음)
+        self.pause_download_button = QPushButton("일시정지")
+        self.pause_download_button.setObjectName("pause-download-button")
+        self.pause_download_button.setFixedHeight(40)
+        self.pause_download_button.clicked.connect(self.toggle_download_pause)
+        self.footer_layout.insertWidget(2, self.pause_download_button)
+        self.download_refresh_timer.start(DOWNLOAD_REFRESH_INTERVAL)
         
         # 스타일 업데이트
         self.game_button.style().unpolish(self.game_button)
         self.game_button.style().polish(self.game_button)
 
-    def update_download_progress(self, progress: float, status: str, speed: float):
-        """다운로드 진행률 업데이트"""
+    def update_download_progress(self):
+        """다운로드 진행률 업데이트 (타이머에서 전송 통계를 조회)"""
         if hasattr(self, 'progress_bar'):
-            self.progress_bar.setValue(int(progress))
-            speed_str = humanize.naturalsize(speed, binary=True) + "/s"
-            self.progress_bar.setFormat(f"{status} - {speed_str}")
+            snapshot = self.game_launcher.transfer_stats.snapshot()
+            self.progress_bar.setValue(int(snapshot.percent))
+            speed_str = humanize.naturalsize(snapshot.speed, binary=True) + "/s"
+            peak_str = humanize.naturalsize(snapshot.peak, binary=True) + "/s"
+            eta = snapshot.eta
+            eta_str = f"{int(eta) // 60:02d}:{int(eta) % 60:02d}" if eta >= 0 else "--:--"
+            if self.game_launcher.download_paused:
+                self.progress_bar.setFormat(f"일시정지 - {snapshot.label}")
+                return
+            self.progress_bar.setFormat(f"{snapshot.label} - {speed_str} (최고 {peak_str}), 남은 시간 {eta_str}")
+
+    def toggle_download_pause(self):
+        """다운로드/복구 일시정지 또는 계속"""
+        if self.game_launcher.download_paused:
+            self.game_launcher.resume_download()
+        else:
+            self.game_launcher.pause_download()
+        self.pause_download_button.setText("계속" if self.game_launcher.download_paused else "일시정지")
+
+    def update_io_allocations(self, allocations):
+        """현재 네트워크/디스크 할당을 진행률 표시줄 툴팁으로 표시"""
+        if not hasattr(self, 'progress_bar'):
+            return
+        lines = [
+            f"{a.resource} ({a.priority}): "
+            + ("제한 없음" if not a.rate else humanize.naturalsize(a.rate, binary=True) + "/s")
+            for a in allocations if a.active
+        ]
+        if self.game_launcher.io_scheduler.playing:
+            lines.append("게임 실행 중: 속도 제한 적용")
+        self.progress_bar.setToolTip("\n".join(lines))
+
+    def hide_download_progress(self):
+        """다운로드 진행률 표시 제거"""
+        self.download_refresh_timer.stop()
+        if hasattr(self, 'progress_bar'):
+            self.progress_bar.hide()
+            self.progress_bar.deleteLater()
+            del self.progress_bar
+        if hasattr(self, 'pause_download_button'):
+            self.pause_download_button.hide()
+            self.pause_download_button.deleteLater()
+            del self.pause_download_button
+        self.game_button.setEnabled(True)
+        self.update_game_button_state()
+        self.game_button.style().unpolish(self.game_button)
+        self.game_button.style().polish(self.game_button)
 
     def on_download_error(self, error_msg: str):
         """다운로드 오류 핸들러"""
         self.hide_download_progress()
         QMessageBox.critical(self, "다운로드 오류", error_msg)
 
+    def ask_repair(self, report):
+        """손상된 파일 복구 여부를 묻고 복구를 시작합니다"""
+        answer = QMessageBox.question(
+            self, "파일 오류",
+            f"{report.message()}\n\n손상되거나 없는 파일만 다시 받아 복구하시겠습니까?",
+            QMessageBox.Yes | QMessageBox.No
+        )
+        if answer != QMessageBox.Yes:
+            return
+        self.show_download_progress()
+        self.game_button.setText("복구 중...")
+        self.game_launcher.start_repair(report)
+
+    def on_repair_finished(self, success: bool, message: str):
+        """복구 완료 핸들러"""
+        self.hide_download_progress()
+        if success:
+            QMessageBox.information(self, "복구 완료", "손상된 파일을 복구했습니다.")
+        else:
+            QMessageBox.critical(self, "복구 오류", message)
+
+    def on_download_finished(self):
+        """다운로드 완료 핸들러"""
+        self.hide_download_progress()
+        self.start_background_verification()
+
     def handle_game_launch_error(self, title, message):
         """게임 실행 오류 시그널을 처리하는 슬롯"""
         QMessageBox.critical(self, title, message)
@@ -865,10 +1020,15 @@ class MainWindow(QMainWindow):
 
         self.verification_status_label = QLabel("대기 중...")
         self.verification_status_label.setObjectName("verification-label")
+
+        self.cancel_verification_button = QPushButton("취소")
+        self.cancel_verification_button.setObjectName("cancel-verification-button")
+        self.cancel_verification_button.clicked.connect(self.game_launcher.background_verifier.cancel)
         
         # 푸터에 위젯 추가 (버튼은 이미 있음)
         self.footer_layout.insertWidget(1, self.verification_status_label)
         self.footer_layout.insertWidget(2, self.progress_bar)
+        self.footer_layout.insertWidget(3, self.cancel_verification_button)
 
     def _reset_ui_after_verification(self):
         """파일 검사 후 UI를 원래 상태로 복원합니다."""
@@ -880,16 +1040,40 @@ class MainWindow(QMainWindow):
             self.verification_status_label.hide()
             self.verification_status_label.deleteLater()
             del self.verification_status_label
+        if hasattr(self, 'cancel_verification_button'):
+            self.cancel_verification_button.hide()
+            self.cancel_verification_button.deleteLater()
+            del self.cancel_verification_button
             
         self.game_button.setEnabled(True)
         self.game_button.setText("게임 시작")
 
-    def update_verification_progress(self, progress: float, filename: str):
-        """파일 검증 진행률을 업데이트합니다."""
+    def update_verification_progress(self, progress: float, filename: str, speed: float, eta: float):
+        """파일 검증 진행률(해시한 바이트 기준)을 업데이트합니다."""
         if hasattr(self, 'progress_bar'):
             self.progress_bar.setValue(int(progress))
             self.game_button.setText(f"파일 검사 중... ({int(progress)}%)")
-            self.verification_status_label.setText(f"검사 파일: {filename}")
+            speed_str = humanize.naturalsize(speed, binary=True) + "/s"
+            eta_str = f"{int(eta) // 60:02d}:{int(eta) % 60:02d}" if eta >= 0 else "--:--"
+            self.verification_status_label.setText(f"검사 파일: {filename} - {speed_str}, 남은 시간 {eta_str}")
+
+    def start_background_verification(self):
+        """창이 표시된 후 게임 파일을 낮은 우선순위로 미리 검사합니다"""
+        game_path = self.settings.get('game', {}).get('path', '')
+        if game_path and self.game_launcher.validate_game_path(game_path):
+            # 감시를 먼저 시작해야 검사 중 변경된 파일을 놓치지 않음
+            self.game_launcher.start_watching()
+            self.game_launcher.background_verifier.start()
+
+    def on_verification_state_changed(self, state: str, message: str):
+        """백그라운드 검증 상태를 게임 버튼 툴팁에 표시합니다"""
+        tooltips = {
+            "running": "게임 파일 검사 중...",
+            "verified": "게임 파일 검사 완료",
+            "failed": f"게임 파일 오류: {message}",
+            "cancelled": "게임 파일 검사가 취소되었습니다",
+        }
+        self.game_button.setToolTip(tooltips.get(state, ""))
 
     def setup_game_button(self):
         """메인 게임/다운로드 버튼 설정"""
@@ -983,6 +1167,8 @@ class MainWindow(QMainWindow):
         """클라이언트 다운로드 시작"""
         try:
             self.game_launcher._download_client()
+            if not hasattr(self, 'progress_bar'):
+                self.show_download_progress()
         except Exception as e:
             QMessageBox.critical(self, "오류", str(e))
             
@@ -996,6 +1182,7 @@ class MainWindow(QMainWindow):
         if path:
             self.settings['game']['path'] = path
             self.save_settings()
+            self.game_launcher.set_game_path(path)
             # 새 경로 확인 및 버튼 상태 업데이트
             self.game_launcher.validate_game_path(path)
             self.update_game_button_state()
@@ -1030,10 +1217,37 @@ class MainWindow(QMainWindow):
         self.showNormal()
         self.activateWindow()
 
+    def showEvent(self, event):
+        super().showEvent(event)
+        self.status_poller.set_visible(True)
+
+    def hideEvent(self, event):
+        # 트레이로 숨기면 서버 상태를 드물게 조회
+        super().hideEvent(event)
+        self.status_poller.set_visible(False)
+
+    async def close_connections(self):
+        """상태 조회를 멈추고 공유 HTTP 세션과 DB 연결 풀 닫기 (비동기 루프에서 실행)"""
+        await self.status_poller.stop()
+        await self.server_api.close()
+        await self.http_client.close()
+
     def closeEvent(self, event):
         """애플리케이션 종료 이벤트 핸들러"""
-        # 이벤트 루프 정리
+        # 진행 중인 파일 검사 및 폴더 감시 중단
+        self.game_launcher.background_verifier.cancel()
+        self.game_launcher.stop_watching()
+        self.game_launcher.stop_lan_peer()
+        self.game_launcher.io_scheduler.stop()
+        # 다운로드는 받은 구간이 저장되어 다음 실행 때 이어받음
+        self.game_launcher.cancel_download()
+
+        # 이벤트 루프 정리 (HTTP 세션과 DB 연결 풀은 루프를 멈추기 전에 닫음)
         if self.loop and self.loop.is_running():
+            try:
+                asyncio.run_coroutine_threadsafe(self.close_connections(), self.loop).result(timeout=2)
+            except Exception as e:
+                print(f"연결 종료 오류: {e}")
             self.loop.call_soon_threadsafe(self.loop.stop)
         
         # 트레이 아이콘 숨기기
@@ -1163,6 +1377,7 @@ class SettingsDialog(QDialog):
         realmlist_label = QLabel("리얼름 목록:")
         realmlist_input = QLineEdit()
         realmlist_input.setObjectName("realmlist_input")  # 검색을 위한 ID 추가
+        realmlist_input.setToolTip("주소를 쉼표로 구분해 여러 개 적으면 가장 빠른 주소로 접속합니다")
         realmlist_input.setProperty("class", "settings-input")
         realmlist_input.setText(self.settings.get('game', {}).get('realmlist', '127.0.0.1'))
         
@@ -1264,6 +1479,9 @@ class SettingsDialog(QDialog):
                         self.main_window.show_download_buttons()
                         return
             
+            if game_path != old_path:
+                self.game_launcher.set_game_path(game_path)
+
             # 리얼름 목록
             realmlist = game_tab.findChild(QLineEdit, "realmlist_input").text()
             old_realmlist = self.settings['game'].get('realmlist', '')
@@ -1309,6 +1527,8 @@ class SettingsDialog(QDialog):
             # 설정 저장
             self.main_window.settings = self.settings
             self.main_window.save_settings()
+            self.main_window.game_launcher.apply_bandwidth_settings()
+            self.main_window.server_api.set_auth_gateways(parse_gateways(realmlist))
             self.accept()
             
         except Exception as e:
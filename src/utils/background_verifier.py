@@ -0,0 +1,208 @@
+import os
+import time
+import ctypes
+import logging
+import platform
+import threading
+from concurrent.futures import Future
+from typing import Callable, Optional
+from utils.file_verifier import VerificationReport, SCAN_DEEP, SCAN_SPOT
+from utils.progress import CancellationToken
+
+# 검증 상태
+IDLE = "idle"
+RUNNING = "running"
+VERIFIED = "verified"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# 검증 결과를 재사용할 수 있는 시간 (초)
+DEFAULT_MAX_AGE = 600
+# 전체 해시 검증 주기 (초). 그 사이에는 표본 검사만 수행
+DEFAULT_FULL_INTERVAL = 7 * 24 * 3600
+
+# Windows: 스레드의 CPU/I/O 우선순위를 백그라운드 모드로 전환
+THREAD_MODE_BACKGROUND_BEGIN = 0x00010000
+# Linux: ioprio_set 시스템 콜 번호와 IDLE 클래스
+_IOPRIO_SET_SYSCALL = {'x86_64': 251, 'aarch64': 30, 'i686': 289, 'i386': 289}
+_IOPRIO_WHO_PROCESS = 1
+_IOPRIO_CLASS_IDLE = 3
+_IOPRIO_CLASS_SHIFT = 13
+
+logger = logging.getLogger('BackgroundVerifier')
+
+
+def lower_thread_priority():
+    """현재 스레드의 CPU 및 디스크 I/O 우선순위를 낮춥니다"""
+    system = platform.system().lower()
+    try:
+        if system == 'windows':
+            import win32api
+            import win32process
+            win32process.SetThreadPriority(win32api.GetCurrentThread(), THREAD_MODE_BACKGROUND_BEGIN)
+        elif system == 'linux':
+            # Linux에서는 스레드마다 nice 값과 I/O 우선순위를 따로 가짐
+            tid = threading.get_native_id()
+            os.setpriority(os.PRIO_PROCESS, tid, 19)
+            syscall_nr = _IOPRIO_SET_SYSCALL.get(platform.machine())
+            if syscall_nr:
+                libc = ctypes.CDLL(None, use_errno=True)
+                libc.syscall(syscall_nr, _IOPRIO_WHO_PROCESS, tid, _IOPRIO_CLASS_IDLE << _IOPRIO_CLASS_SHIFT)
+    except Exception as e:
+        logger.debug(f"스레드 우선순위를 낮출 수 없습니다: {e}")
+
+
+class BackgroundVerifier:
+    """런처 시작 후 백그라운드에서 게임 파일을 미리 검사하는 서비스
+
+    게임 시작 시 request()는 최근 검증 결과가 있으면 즉시 돌려주고,
+    검사가 진행 중이면 그 검사에 합류합니다. 진행 중인 검사가 낮은
+    우선순위의 백그라운드 검사이면 중단하고 같은 Future로 일반 우선순위
+    검사를 다시 시작합니다 (이미 해시한 파일은 검증 캐시로 건너뜀).
+    평소에는 빠른 검사 + 블록 표본 검사만 하고, 전체 해시 검증은
+    full_interval이 지났거나 백그라운드 표본 검사가 실패했을 때만 수행합니다.
+    게임 시작을 기다리는 검사에서 표본이 실패하면 그 파일만 전체 해시합니다.
+    """
+
+    def __init__(self, launcher, max_age: float = DEFAULT_MAX_AGE,
+                 state_callback: Optional[Callable[[str, str], None]] = None,
+                 full_interval: float = DEFAULT_FULL_INTERVAL):
+        self.launcher = launcher
+        self.max_age = max_age
+        self.full_interval = full_interval
+        self.state_callback = state_callback
+        self.state = IDLE
+        self.report = None
+        self._finished_at = None
+        self._game_path = None
+        self._future: Optional[Future] = None
+        self._token: Optional[CancellationToken] = None
+        self._background = False
+        self._lock = threading.Lock()
+
+    def _set_state(self, state: str, message: str = ""):
+        self.state = state
+        if self.state_callback:
+            self.state_callback(state, message)
+
+    def is_fresh(self) -> bool:
+        """재사용 가능한 성공 결과가 있는지 확인"""
+        return (
+            self.state == VERIFIED
+            and self.report is not None
+            and self._game_path == self.launcher.game_path
+            and time.monotonic() - self._finished_at < self.max_age
+        )
+
+    def start(self, background: bool = True) -> Future:
+        """검사를 시작합니다. 이미 진행 중이면 그 Future를 반환"""
+        with self._lock:
+            if self._future and not self._future.done():
+                return self._future
+            future = Future()
+            self._future = future
+            self._set_state(RUNNING)
+            self._spawn(future, background)
+        return future
+
+    def _spawn(self, future: Future, background: bool):
+        """future를 완료할 검사 스레드 시작 (_lock 안에서 호출)"""
+        token = self._token = CancellationToken()
+        self._background = background
+        thread = threading.Thread(
+            target=self._run, args=(future, background, token),
+            name="background-verify" if background else "verify", daemon=True
+        )
+        thread.start()
+
+    def request(self) -> Future:
+        """게임 시작용 검증 결과: 최신 결과 재사용 → 진행 중 검사 합류 → 새 검사"""
+        with self._lock:
+            if self._future and not self._future.done():
+                if self._background:
+                    # 낮은 우선순위 검사를 기다리지 않도록 일반 우선순위로 다시 시작
+                    logger.info("게임 시작: 백그라운드 검사를 일반 우선순위로 전환합니다")
+                    self._token.cancel()
+                    self._spawn(self._future, background=False)
+                return self._future
+            if self.is_fresh():
+                future = Future()
+                future.set_result(self.report)
+                return future
+        return self.start(background=False)
+
+    def invalidate(self):
+        """게임 경로나 파일이 바뀌었을 때 저장된 결과를 버립니다"""
+        with self._lock:
+            if self.state == VERIFIED:
+                self.report = None
+                self._set_state(IDLE)
+
+    def cancel(self):
+        """진행 중인 검사를 중단합니다. 작업자 스레드는 다음 읽기 단위에서 멈춤"""
+        token = self._token
+        if token:
+            token.cancel()
+
+    def _claim(self, token: CancellationToken) -> bool:
+        """결과를 기록할 검사인지 확인. request()가 일반 우선순위 검사로 바꿨으면 False
+
+        True를 반환한 뒤에는 더 이상 다른 검사로 바뀌지 않습니다.
+        """
+        with self._lock:
+            if token is not self._token:
+                return False
+            self._background = False
+            return True
+
+    def _run(self, future: Future, background: bool, token: CancellationToken):
+        if background:
+            lower_thread_priority()
+        game_path = self.launcher.game_path
+        try:
+            verifier, error_msg = self.launcher.create_verifier(background=background, cancel_token=token)
+            if not verifier:
+                if not self._claim(token):
+                    return
+                self.report = None
+                self._set_state(FAILED, error_msg)
+                future.set_result(VerificationReport.from_error("manifest.json", error_msg))
+                return
+
+            # 게임 시작을 기다리게 하지 않도록 주기적인 전체 검증은 백그라운드에서만
+            if background:
+                # 처음 실행했거나 매니페스트가 바뀌었으면 지금부터 주기를 셈
+                # (검증 캐시에 없는 파일은 빠른 검사에서도 전체 해시하므로 바로 전체 검증할 필요 없음)
+                verifier.start_full_verify_clock()
+            mode = SCAN_DEEP if background and verifier.full_verify_due(self.full_interval) else SCAN_SPOT
+            report = verifier.scan(mode)
+            if mode == SCAN_SPOT and report.hash_mismatch and not report.cancelled:
+                if background:
+                    # 디스크 손상은 다른 파일에도 있을 수 있으므로 백그라운드에서는 전체 검사
+                    logger.warning("표본 검사 실패, 전체 해시 검증을 시작합니다")
+                    report = verifier.scan(SCAN_DEEP)
+                else:
+                    # 손상 범위를 모두 찾도록 표본이 실패한 파일만 전체 해시
+                    failed = [r.relative_path for r in report.hash_mismatch]
+                    logger.warning(f"표본 검사 실패, 파일 {len(failed)}개를 전체 해시합니다")
+                    report.replace(failed, verifier.scan(SCAN_DEEP, paths=failed))
+
+            if not self._claim(token):
+                return
+            self.report = report
+            self._finished_at = time.monotonic()
+            self._game_path = game_path
+            if report.ok:
+                self.launcher.share_verified_files(verifier.data_path, verifier.manifest)
+                self._set_state(VERIFIED, report.message())
+            elif report.cancelled:
+                self._set_state(CANCELLED, report.message())
+            else:
+                self._set_state(FAILED, report.message())
+            future.set_result(report)
+        except Exception as e:
+            if not self._claim(token):
+                return
+            logger.error(f"백그라운드 검증 오류: {e}")
+            self._set_state(FAILED, str(e))
+            future.set_exception(e)
@@ -0,0 +1,295 @@
+import os
+import select
+import struct
+import ctypes
+import ctypes.util
+import logging
+import platform
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Optional, Set, Tuple
+
+# 감시 방식
+BACKEND_INOTIFY = "inotify"
+BACKEND_WINDOWS = "ReadDirectoryChangesW"
+BACKEND_POLLING = "polling"
+
+DEFAULT_POLL_INTERVAL = 10.0
+
+# inotify 상수 (<sys/inotify.h>)
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = getattr(os, 'O_CLOEXEC', 0)
+_INOTIFY_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO
+                 | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF)
+_INOTIFY_EVENT = struct.Struct("iIII")
+
+_IS_WINDOWS = platform.system().lower() == 'windows'
+
+
+def normalize_path(relative_path: str) -> str:
+    """매니페스트 경로와 비교할 수 있도록 상대 경로를 정규화합니다"""
+    relative_path = relative_path.replace('\\', '/').strip('/')
+    return relative_path.lower() if _IS_WINDOWS else relative_path
+
+
+class DataWatcher:
+    """클라이언트 Data 폴더를 감시해 변경된 파일만 '더러운' 상태로 표시합니다
+
+    감시를 시작한 뒤 검증에 성공한 파일은 깨끗한 상태로 기록되고, 변경
+    이벤트가 오기 전까지 다시 stat/해시하지 않습니다. Linux는 inotify,
+    Windows는 ReadDirectoryChangesW를 사용하며 둘 다 안 되면 주기적인
+    scandir 비교로 대체합니다. 감시 등록(하위 폴더 포함)이 끝나기 전에 바뀐
+    파일은 놓칠 수 있으므로 그 전까지는 running이 False입니다.
+    """
+
+    def __init__(self, data_path: Path, on_change: Optional[Callable[[str], None]] = None,
+                 poll_interval: float = DEFAULT_POLL_INTERVAL):
+        self.data_path = Path(data_path)
+        self.on_change = on_change
+        self.poll_interval = poll_interval
+        self.backend = None
+        self.logger = logging.getLogger('DataWatcher')
+        self._lock = threading.Lock()
+        self._clean: Set[str] = set()
+        self._dirtied_at: Dict[str, int] = {}
+        self._sequence = 0
+        self._stop = threading.Event()
+        # 감시 등록이 끝나 이후의 변경을 모두 받을 수 있는 상태
+        self._ready = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def running(self) -> bool:
+        return self._ready.is_set() and self._thread is not None and self._thread.is_alive()
+
+    # --- 검증 상태 ---
+
+    def begin_scan(self) -> int:
+        """검증 시작 시점의 이벤트 번호. mark_clean에 넘겨 검사 중 변경을 구분합니다
+
+        감시 준비 전에 시작한 검사는 -1 (그 검사 결과로는 깨끗한 상태를 기록하지 않음)
+        """
+        if not self.running:
+            return -1
+        with self._lock:
+            return self._sequence
+
+    def is_clean(self, relative_path: str) -> bool:
+        if not self.running:
+            return False
+        with self._lock:
+            return normalize_path(relative_path) in self._clean
+
+    def mark_clean(self, relative_paths: Iterable[str], since: int):
+        """since 이후 변경 이벤트가 없었던 파일만 깨끗한 상태로 기록"""
+        if not self.running or since < 0:
+            return
+        with self._lock:
+            for relative_path in relative_paths:
+                key = normalize_path(relative_path)
+                if self._dirtied_at.get(key, -1) <= since:
+                    self._clean.add(key)
+
+    def mark_dirty(self, relative_path: str):
+        key = normalize_path(relative_path)
+        with self._lock:
+            self._sequence += 1
+            self._dirtied_at[key] = self._sequence
+            self._clean.discard(key)
+            # 디렉토리 이름 변경/삭제 시 하위 파일도 모두 더러운 상태
+            prefix = key + '/'
+            for path in [p for p in self._clean if p.startswith(prefix)]:
+                self._dirtied_at[path] = self._sequence
+                self._clean.discard(path)
+        if self.on_change:
+            self.on_change(relative_path)
+
+    def mark_all_dirty(self):
+        """이벤트 유실(버퍼 초과 등) 시 전체를 다시 검사하도록 표시"""
+        with self._lock:
+            self._sequence += 1
+            for path in self._clean:
+                self._dirtied_at[path] = self._sequence
+            self._clean.clear()
+        if self.on_change:
+            self.on_change("")
+
+    # --- 감시 스레드 ---
+
+    def start(self):
+        if self.running or not self.data_path.is_dir():
+            return
+        self._stop.clear()
+        self._ready.clear()
+        system = platform.system().lower()
+        if system == 'linux':
+            target, self.backend = self._run_inotify, BACKEND_INOTIFY
+        elif system == 'windows':
+            target, self.backend = self._run_windows, BACKEND_WINDOWS
+        else:
+            target, self.backend = self._run_polling, BACKEND_POLLING
+        self._thread = threading.Thread(target=self._run, args=(target,), name="data-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._ready.clear()
+        if self._thread:
+            self._thread.join(timeout=2)
+        self._thread = None
+        with self._lock:
+            self._clean.clear()
+
+    def _run(self, target):
+        try:
+            target()
+        except Exception as e:
+            if self._stop.is_set():
+                return
+            self.logger.warning(f"{self.backend} 감시를 사용할 수 없어 주기적 검사로 전환합니다: {e}")
+            self._ready.clear()
+            self.mark_all_dirty()
+            self.backend = BACKEND_POLLING
+            self._run_polling()
+
+    def _relative(self, path: str) -> str:
+        return os.path.relpath(path, self.data_path).replace(os.sep, '/')
+
+    def _run_inotify(self):
+        libc = ctypes.CDLL(ctypes.util.find_library('c') or None, use_errno=True)
+        fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+
+        watches: Dict[int, str] = {}
+
+        def add_watch(directory: str):
+            wd = libc.inotify_add_watch(fd, os.fsencode(directory), _INOTIFY_MASK)
+            if wd < 0:
+                raise OSError(ctypes.get_errno(), f"inotify_add_watch failed: {directory}")
+            watches[wd] = directory
+
+        def add_tree(root: str):
+            add_watch(root)
+            for dirpath, dirnames, _ in os.walk(root):
+                for dirname in dirnames:
+                    add_watch(os.path.join(dirpath, dirname))
+
+        try:
+            add_tree(str(self.data_path))
+            self._ready.set()
+            while not self._stop.is_set():
+                readable, _, _ = select.select([fd], [], [], 0.5)
+                if not readable:
+                    continue
+                try:
+                    data = os.read(fd, 64 * 1024)
+                except BlockingIOError:
+                    continue
+
+                offset = 0
+                while offset < len(data):
+                    wd, mask, _, name_len = _INOTIFY_EVENT.unpack_from(data, offset)
+                    offset += _INOTIFY_EVENT.size
+                    name = os.fsdecode(data[offset:offset + name_len].rstrip(b"\0"))
+                    offset += name_len
+
+                    if mask & IN_Q_OVERFLOW:
+                        self.mark_all_dirty()
+                        continue
+                    if mask & IN_IGNORED:
+                        watches.pop(wd, None)
+                        continue
+                    directory = watches.get(wd)
+                    if directory is None:
+                        continue
+                    full_path = os.path.join(directory, name) if name else directory
+                    if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                        add_tree(full_path)
+                    if full_path == str(self.data_path):
+                        self.mark_all_dirty()
+                    else:
+                        self.mark_dirty(self._relative(full_path))
+        finally:
+            os.close(fd)
+
+    def _run_windows(self):
+        import pywintypes
+        import win32con
+        import win32event
+        import win32file
+
+        handle = win32file.CreateFile(
+            str(self.data_path),
+            0x0001,  # FILE_LIST_DIRECTORY
+            win32con.FILE_SHARE_READ | win32con.FILE_SHARE_WRITE | win32con.FILE_SHARE_DELETE,
+            None,
+            win32con.OPEN_EXISTING,
+            win32con.FILE_FLAG_BACKUP_SEMANTICS | win32con.FILE_FLAG_OVERLAPPED,
+            None
+        )
+        flags = (win32con.FILE_NOTIFY_CHANGE_FILE_NAME | win32con.FILE_NOTIFY_CHANGE_DIR_NAME
+                 | win32con.FILE_NOTIFY_CHANGE_SIZE | win32con.FILE_NOTIFY_CHANGE_LAST_WRITE)
+        overlapped = pywintypes.OVERLAPPED()
+        overlapped.hEvent = win32event.CreateEvent(None, True, False, None)
+        buffer = win32file.AllocateReadBuffer(64 * 1024)
+        try:
+            while not self._stop.is_set():
+                win32file.ReadDirectoryChangesW(handle, buffer, True, flags, overlapped)
+                self._ready.set()
+                while not self._stop.is_set():
+                    if win32event.WaitForSingleObject(overlapped.hEvent, 500) == win32event.WAIT_OBJECT_0:
+                        break
+                if self._stop.is_set():
+                    win32file.CancelIo(handle)
+                    break
+
+                n_bytes = win32file.GetOverlappedResult(handle, overlapped, True)
+                win32event.ResetEvent(overlapped.hEvent)
+                if not n_bytes:
+                    # 버퍼 초과: 어떤 파일이 바뀌었는지 알 수 없음
+                    self.mark_all_dirty()
+                    continue
+                for _, file_name in win32file.FILE_NOTIFY_INFORMATION(buffer, n_bytes):
+                    self.mark_dirty(file_name)
+        finally:
+            win32file.CloseHandle(handle)
+
+    def _snapshot(self) -> Dict[str, Tuple[int, int]]:
+        snapshot = {}
+        stack = [str(self.data_path)]
+        while stack:
+            directory = stack.pop()
+            try:
+                with os.scandir(directory) as entries:
+                    for entry in entries:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            snapshot[self._relative(entry.path)] = (stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                continue
+        return snapshot
+
+    def _run_polling(self):
+        previous = self._snapshot()
+        self._ready.set()
+        while not self._stop.wait(self.poll_interval):
+            current = self._snapshot()
+            for relative_path in previous.keys() | current.keys():
+                if previous.get(relative_path) != current.get(relative_path):
+                    self.mark_dirty(relative_path)
+            previous = current
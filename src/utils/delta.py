@@ -0,0 +1,300 @@
+import os
+import json
+import mmap
+import zlib
+import struct
+import hashlib
+import urllib.parse
+import urllib.request
+from pathlib import Path
+from typing import BinaryIO, Callable, Dict, Optional
+from utils.disk_space import preallocate
+from utils.hashing import hash_file, iter_file_chunks
+
+# 이전 파일의 다른 위치로 옮겨진 블록을 찾는 단위
+DELTA_BLOCK_SIZE = 64 * 1024
+# 이보다 짧게 일치하는 구간은 복사 대신 리터럴로 기록
+MIN_MATCH = 256
+# 어긋난 위치를 다시 맞출 때 찾는 바이트 수와 탐색 범위
+ANCHOR_SIZE = 64
+SEARCH_WINDOW = 8 * 1024 * 1024
+# 일치하는 곳을 못 찾았을 때 건너뛰는 크기 (연속으로 실패하면 두 배씩)
+MIN_STEP = 1024
+MAX_STEP = 1024 * 1024
+COMPARE_CHUNK = 64 * 1024
+# 리터럴 데이터를 압축해서 기록하는 최대 단위
+MAX_LITERAL = 4 * 1024 * 1024
+
+# 미러에서 델타 목록 위치 (create_patch.py 출력 폴더를 patches/로 올림)
+PATCH_DIR = "patches/"
+PATCH_INDEX = "index.json"
+PATCH_TIMEOUT = 30
+
+MAGIC = b"WLDELTA1"
+_LENGTH = struct.Struct("<I")
+_OP = struct.Struct("<BQQ")
+OP_COPY = 0  # (이전 파일 오프셋, 길이)
+OP_DATA = 1  # (원래 길이, 압축 길이) + zlib 데이터
+OP_END = 2
+
+
+class DeltaError(Exception):
+    """델타 형식 오류 또는 적용 결과 해시 불일치"""
+
+
+def _block_digest(data) -> bytes:
+    return hashlib.blake2b(data, digest_size=16).digest()
+
+
+def _index_blocks(source_path: Path, block_size: int) -> Dict[bytes, int]:
+    """이전 파일의 블록 해시 → 오프셋"""
+    index = {}
+    offset = 0
+    for chunk in iter_file_chunks(source_path, buffer_size=block_size):
+        index.setdefault(_block_digest(chunk), offset)
+        offset += len(chunk)
+    return index
+
+
+class _DeltaWriter:
+    def __init__(self, f: BinaryIO):
+        self.f = f
+        self.copy_start = None
+        self.copy_length = 0
+        self.literal = bytearray()
+
+    def copy(self, source_offset: int, length: int):
+        self.flush_literal()
+        if self.copy_start is not None and self.copy_start + self.copy_length == source_offset:
+            self.copy_length += length  # 이어지는 복사는 하나로 합침
+            return
+        self.flush_copy()
+        self.copy_start, self.copy_length = source_offset, length
+
+    def data(self, chunk):
+        self.flush_copy()
+        self.literal += chunk
+        if len(self.literal) >= MAX_LITERAL:
+            self.flush_literal()
+
+    def flush_copy(self):
+        if self.copy_start is not None:
+            self.f.write(_OP.pack(OP_COPY, self.copy_start, self.copy_length))
+            self.copy_start, self.copy_length = None, 0
+
+    def flush_literal(self):
+        if self.literal:
+            compressed = zlib.compress(bytes(self.literal), 6)
+            self.f.write(_OP.pack(OP_DATA, len(self.literal), len(compressed)))
+            self.f.write(compressed)
+            self.literal = bytearray()
+
+    def close(self):
+        self.flush_copy()
+        self.flush_literal()
+        self.f.write(_OP.pack(OP_END, 0, 0))
+
+
+def _match_length(source, source_offset: int, target, target_offset: int) -> int:
+    """두 위치에서 시작해 같은 바이트가 이어지는 길이"""
+    limit = min(len(source) - source_offset, len(target) - target_offset)
+    length = 0
+    while length < limit:
+        size = min(COMPARE_CHUNK, limit - length)
+        a, b = source_offset + length, target_offset + length
+        if source[a:a + size] == target[b:b + size]:
+            length += size
+            continue
+        # 처음 달라지는 바이트를 이분 탐색
+        low, high = 0, size
+        while high - low > 1:
+            middle = (low + high) // 2
+            if source[a:a + middle] == target[b:b + middle]:
+                low = middle
+            else:
+                high = middle
+        return length + low
+    return length
+
+
+def _map_file(f: BinaryIO):
+    """빈 파일은 mmap할 수 없으므로 빈 bytes로 대체"""
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _write_ops(source, target, index: Dict[bytes, int], writer: "_DeltaWriter", block_size: int):
+    """target을 앞에서부터 훑으며 source에서 복사할 구간과 새 데이터를 기록
+
+    이전 파일에서 이어지는 위치(source_offset)를 따라가다가 어긋나면 세 가지로
+    다시 맞춥니다: 다른 위치로 옮겨진 블록(index), 앞뒤 범위에서 지워지거나
+    옮겨진 데이터, 새 데이터가 삽입된 경우. 비교와 탐색은 모두 C 수준의
+    슬라이스 비교와 find로 처리합니다.
+    """
+    source_size, target_size = len(source), len(target)
+    target_offset = source_offset = 0
+    step = MIN_STEP
+    while target_offset < target_size:
+        if source_offset < source_size:
+            length = _match_length(source, source_offset, target, target_offset)
+            if length >= MIN_MATCH:
+                writer.copy(source_offset, length)
+                target_offset += length
+                source_offset += length
+                step = MIN_STEP
+                continue
+
+        # 지워지거나 옮겨진 데이터: 현재 target 내용이 source 어디에 있는지 찾음
+        candidates = []
+        if target_offset + block_size <= target_size:
+            candidates.append(index.get(_block_digest(target[target_offset:target_offset + block_size])))
+        anchor = target[target_offset:target_offset + ANCHOR_SIZE]
+        if len(anchor) == ANCHOR_SIZE:
+            candidates.append(source.find(
+                anchor, max(0, source_offset - SEARCH_WINDOW), min(source_size, source_offset + SEARCH_WINDOW)
+            ))
+        found = next((
+            c for c in candidates
+            if c is not None and c >= 0 and _match_length(source, c, target, target_offset) >= MIN_MATCH
+        ), None)
+        if found is not None:
+            source_offset = found
+            continue
+
+        # 삽입된 새 데이터: source 현재 위치의 내용이 target 뒤쪽에서 다시 나오는지 찾음
+        if source_offset + ANCHOR_SIZE <= source_size:
+            resume = target.find(
+                source[source_offset:source_offset + ANCHOR_SIZE],
+                target_offset, min(target_size, target_offset + SEARCH_WINDOW)
+            )
+            if resume > target_offset and _match_length(source, source_offset, target, resume) >= MIN_MATCH:
+                writer.data(target[target_offset:resume])
+                target_offset = resume
+                continue
+
+        # 같은 길이로 바뀐 구간으로 보고 양쪽을 함께 건너뜀
+        end = min(target_size, target_offset + step)
+        writer.data(target[target_offset:end])
+        source_offset += end - target_offset
+        target_offset = end
+        step = min(step * 2, MAX_STEP)
+
+
+def create_delta(source_path: Path, target_path: Path, delta_path: Path,
+                 algorithm: str = "sha256", block_size: int = DELTA_BLOCK_SIZE) -> dict:
+    """source → target 변환 델타를 만들고 헤더 정보를 반환합니다 (빌드 도구용)"""
+    index = _index_blocks(source_path, block_size)
+    header = {
+        "algorithm": algorithm,
+        "source_hash": hash_file(source_path, algorithm)[0],
+        "target_hash": hash_file(target_path, algorithm)[0],
+        "target_size": Path(target_path).stat().st_size,
+    }
+    header_bytes = json.dumps(header, sort_keys=True).encode()
+    with open(source_path, "rb") as source_file, open(target_path, "rb") as target_file, \
+            open(delta_path, "wb") as out:
+        out.write(MAGIC)
+        out.write(_LENGTH.pack(len(header_bytes)))
+        out.write(header_bytes)
+        source, target = _map_file(source_file), _map_file(target_file)
+        try:
+            writer = _DeltaWriter(out)
+            _write_ops(source, target, index, writer, block_size)
+            writer.close()
+        finally:
+            for mapped in (source, target):
+                if isinstance(mapped, mmap.mmap):
+                    mapped.close()
+    return header
+
+
+def read_delta_header(f: BinaryIO) -> dict:
+    if f.read(len(MAGIC)) != MAGIC:
+        raise DeltaError("Not a delta file")
+    (length,) = _LENGTH.unpack(f.read(_LENGTH.size))
+    return json.loads(f.read(length))
+
+
+def apply_delta(source_path: Path, delta_path: Path, output_path: Path,
+                expected_hash: Optional[str] = None,
+                on_chunk: Optional[Callable[[int], None]] = None) -> str:
+    """이전 파일 + 델타 → 새 파일을 스트림으로 만들고 해시를 검증합니다
+
+    결과 해시가 델타 헤더나 expected_hash(새 매니페스트)와 다르면 DeltaError.
+    """
+    with open(delta_path, "rb") as delta, open(source_path, "rb") as source, open(output_path, "wb") as out:
+        header = read_delta_header(delta)
+        preallocate(out.fileno(), header["target_size"])
+        hasher = hashlib.new(header["algorithm"])
+        written = 0
+        while True:
+            raw = delta.read(_OP.size)
+            if len(raw) != _OP.size:
+                raise DeltaError("Truncated delta file")
+            op, a, b = _OP.unpack(raw)
+            if op == OP_END:
+                break
+            if op == OP_COPY:
+                source.seek(a)
+                remaining = b
+                while remaining:
+                    data = source.read(min(remaining, 1024 * 1024))
+                    if not data:
+                        raise DeltaError("Source file is shorter than the delta expects")
+                    out.write(data)
+                    hasher.update(data)
+                    remaining -= len(data)
+                    if on_chunk:
+                        on_chunk(len(data))
+                written += b
+            elif op == OP_DATA:
+                data = zlib.decompress(delta.read(b))
+                if len(data) != a:
+                    raise DeltaError("Corrupt literal block in delta")
+                out.write(data)
+                hasher.update(data)
+                written += a
+                if on_chunk:
+                    on_chunk(a)
+            else:
+                raise DeltaError(f"Unknown delta operation {op}")
+
+    digest = hasher.hexdigest()
+    if written != header["target_size"] or digest != header["target_hash"]:
+        raise DeltaError("Patched file does not match the delta target")
+    if expected_hash and digest != expected_hash:
+        raise DeltaError("Patched file does not match the manifest hash")
+    return digest
+
+
+def fetch_patch_index(mirror_url: str, timeout: float = PATCH_TIMEOUT) -> Optional[dict]:
+    """미러의 델타 목록. 없거나 읽을 수 없으면 None (전체 다운로드로 진행)"""
+    url = urllib.parse.urljoin(mirror_url.rstrip('/') + '/', PATCH_DIR + PATCH_INDEX)
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            return json.loads(response.read())
+    except (OSError, ValueError):
+        return None
+
+
+def find_patch(index: dict, relative_path: str, file_path: Path,
+               target_hash: str, algorithm: str) -> Optional[dict]:
+    """현재 파일에 적용해 target_hash를 만드는 델타 항목
+
+    크기가 맞는 후보가 있을 때만 현재 파일을 해시합니다.
+    """
+    if index.get("algorithm") != algorithm:
+        return None
+    try:
+        size = Path(file_path).stat().st_size
+    except OSError:
+        return None
+    entries = [
+        e for e in index.get("files", {}).get(relative_path, [])
+        if e["target_hash"] == target_hash and e["source_size"] == size
+    ]
+    if not entries:
+        return None
+    source_hash = hash_file(file_path, algorithm)[0]
+    return next((e for e in entries if e["source_hash"] == source_hash), None)
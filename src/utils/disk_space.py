@@ -0,0 +1,137 @@
+import os
+import errno
+import shutil
+import platform
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+# 다운로드가 끝난 뒤에도 볼륨마다 남겨둘 여유 공간
+DEFAULT_RESERVE = 256 * 1024 * 1024  # 256 MiB
+
+
+@dataclass
+class VolumeSpace:
+    path: Path  # 여유 공간을 조회한 경로
+    free: int
+    required: int = 0
+
+
+@dataclass
+class SpacePlan:
+    """볼륨(장치)별 필요 공간과 여유 공간"""
+    volumes: Dict[int, VolumeSpace] = field(default_factory=dict)
+    reserve: int = DEFAULT_RESERVE
+
+    @property
+    def required(self) -> int:
+        return sum(volume.required for volume in self.volumes.values())
+
+    @property
+    def shortages(self) -> list:
+        return [
+            volume for volume in self.volumes.values()
+            if volume.required and volume.free < volume.required + self.reserve
+        ]
+
+    @property
+    def ok(self) -> bool:
+        return not self.shortages
+
+    def message(self) -> str:
+        if self.ok:
+            return f"필요한 공간 {_format_size(self.required)} 확보됨"
+        return "사용 가능한 공간이 부족합니다: " + ", ".join(
+            f"{volume.path} ({_format_size(volume.required + self.reserve)} 필요, "
+            f"{_format_size(volume.free)} 남음)"
+            for volume in self.shortages
+        )
+
+
+def _format_size(n_bytes: int) -> str:
+    return f"{n_bytes / 1024 ** 3:.1f} GB"
+
+
+def existing_parent(path: Path) -> Path:
+    """아직 만들지 않은 경로라면 존재하는 가장 가까운 상위 폴더"""
+    path = Path(path).absolute()
+    while not path.exists() and path != path.parent:
+        path = path.parent
+    return path
+
+
+def plan_space(needs: Iterable[Tuple[Path, int]], reserve: int = DEFAULT_RESERVE) -> SpacePlan:
+    """(기록할 경로, 추가로 필요한 바이트) 목록을 볼륨별로 합산합니다
+
+    임시 폴더와 게임 폴더가 같은 드라이브면 한 번만 계산되고, 다르면
+    각각 따로 여유 공간과 비교합니다.
+    """
+    plan = SpacePlan(reserve=reserve)
+    for path, size in needs:
+        if size <= 0:
+            continue
+        base = existing_parent(path)
+        device = base.stat().st_dev
+        volume = plan.volumes.get(device)
+        if volume is None:
+            volume = plan.volumes[device] = VolumeSpace(base, shutil.disk_usage(base).free)
+        volume.required += size
+    return plan
+
+
+def preallocate(fd: int, size: int, out_of_order: bool = False):
+    """파일을 size 크기로 맞추고 디스크 공간을 미리 할당합니다
+
+    큰 MPQ가 조각나지 않고, 공간이 부족하면 다운로드 전에 바로 OSError로
+    실패합니다. Linux는 posix_fallocate, Windows는 SetEndOfFile을 사용하고
+    지원하지 않는 파일 시스템에서는 크기만 맞춥니다(sparse).
+    병렬 구간 다운로드처럼 뒤쪽부터 기록할 수 있으면 out_of_order=True:
+    Windows에서는 공간을 예약하지 않고 sparse 파일로 크기만 맞춥니다.
+    """
+    if os.fstat(fd).st_size > size:
+        os.ftruncate(fd, size)
+    if size == 0:
+        return
+    if platform.system().lower() == 'windows':
+        if out_of_order:
+            _set_sparse(fd)
+        _set_end_of_file(fd, size)
+        return
+    if hasattr(os, 'posix_fallocate'):
+        try:
+            os.posix_fallocate(fd, 0, size)
+            return
+        except OSError as e:
+            if e.errno not in (errno.EOPNOTSUPP, errno.ENOSYS, errno.EINVAL):
+                raise
+    os.ftruncate(fd, size)
+
+
+def _set_end_of_file(fd: int, size: int):
+    """파일 끝을 옮겨 클러스터를 할당 (sparse 파일이면 크기만 바뀜)
+
+    유효 데이터 길이(VDL)는 그대로이므로 VDL보다 뒤에 쓰면 NTFS가 그 사이를
+    0으로 채운 뒤 기록합니다. 앞에서부터 순서대로 기록할 때만 추가 비용이 없습니다.
+    """
+    import pywintypes
+    import win32file
+    handle = win32file._get_osfhandle(fd)
+    try:
+        win32file.SetFilePointer(handle, size, win32file.FILE_BEGIN)
+        win32file.SetEndOfFile(handle)
+        win32file.SetFilePointer(handle, 0, win32file.FILE_BEGIN)
+    except pywintypes.error as e:
+        raise OSError(None, e.strerror, None, e.winerror)
+
+
+def _set_sparse(fd: int):
+    """sparse 파일로 표시해 순서 없이 기록해도 앞쪽을 0으로 채우지 않게 함"""
+    import pywintypes
+    import win32file
+    import winioctlcon
+    handle = win32file._get_osfhandle(fd)
+    try:
+        win32file.DeviceIoControl(handle, winioctlcon.FSCTL_SET_SPARSE, None, None)
+    except pywintypes.error:
+        # FAT32 등 sparse를 지원하지 않는 파일 시스템: 일반 할당으로 진행
+        pass
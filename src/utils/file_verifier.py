@@ -0,0 +1,539 @@
+import os
+import time
+import random
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Collection, Dict, List, Optional, Tuple
+from utils.data_watcher import DataWatcher
+from utils.hashing import hash_file, hash_blocks
+from utils.io_scheduler import DISK, PRIORITY_FOREGROUND, IOScheduler
+from utils.manifest import Manifest
+from utils.progress import ByteProgress, CancellationToken
+from utils.verification_cache import VerificationCache
+
+DEFAULT_WORKERS = 4
+MAX_WORKERS = 32
+# 블록 매니페스트에서 한 작업이 연속으로 읽는 블록 수 (4 MiB x 8 = 32 MiB)
+BLOCKS_PER_TASK = 8
+# 표본 검사에서 파일마다 해시하는 블록 수
+DEFAULT_SAMPLES_PER_FILE = 2
+
+# 검사 방식
+SCAN_QUICK = "quick"  # size/mtime 또는 검증 캐시가 일치하면 해시 생략
+SCAN_SPOT = "spot"    # quick + 생략된 파일의 블록 일부를 표본 해시
+SCAN_DEEP = "deep"    # 모든 파일 전체 해시
+
+# 검사 결과 종류
+VERIFIED = "verified"
+MISSING = "missing"
+SIZE_MISMATCH = "size_mismatch"
+HASH_MISMATCH = "hash_mismatch"
+READ_ERROR = "read_error"
+
+
+class VerificationAborted(Exception):
+    """다른 파일의 실패로 검사가 중단되었을 때 발생"""
+
+
+@dataclass
+class FileCheckResult:
+    relative_path: str
+    ok: bool
+    message: str = ""
+    bytes_read: int = 0
+    bad_ranges: List[Tuple[int, int]] = field(default_factory=list)  # [start, end) 바이트 범위
+    kind: str = ""
+
+
+@dataclass
+class _Task:
+    relative_path: str
+    blocks: Optional[List[Tuple[int, int, int]]] = None  # None이면 파일 전체 해시
+
+
+@dataclass
+class _TaskResult:
+    relative_path: str
+    bytes_read: int = 0
+    bad_ranges: List[Tuple[int, int]] = field(default_factory=list)
+    error: Optional[str] = None
+
+
+def drive_key(path: Path) -> str:
+    """파일이 위치한 드라이브(Windows) 또는 마운트 지점(그 외)을 반환합니다"""
+    path = Path(os.path.abspath(path))
+    drive, _ = os.path.splitdrive(str(path))
+    if drive:
+        return drive.upper()
+    # Linux/macOS: 가장 가까운 마운트 지점을 드라이브로 취급
+    current = path
+    while not os.path.ismount(current) and current != current.parent:
+        current = current.parent
+    return str(current)
+
+
+def merge_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    """겹치거나 맞닿은 바이트 범위를 합칩니다"""
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def format_ranges(ranges: List[Tuple[int, int]]) -> str:
+    return ", ".join(f"{start}-{end}" for start, end in ranges)
+
+
+def sample_blocks(manifest: Manifest, relative_path: str, count: int,
+                  seed: str) -> List[Tuple[int, int, int]]:
+    """seed와 경로로 결정되는 의사 난수 블록 표본 (같은 seed면 항상 같은 블록)"""
+    blocks = manifest.block_ranges(relative_path)
+    if count >= len(blocks):
+        return blocks
+    rng = random.Random(f"{seed}:{relative_path}")
+    return sorted(rng.sample(blocks, count))
+
+
+class FileVerifier:
+    """매니페스트 기준으로 여러 파일을 병렬 해시하는 검증 엔진
+
+    hashlib은 해시 계산 중 GIL을 해제하므로 드라이브마다 제한된 크기의
+    스레드 풀을 두고 완료되는 순서대로 결과를 수집합니다. 블록 해시가 있는
+    매니페스트(format 2)는 큰 파일도 블록 묶음 단위로 나누어 병렬 검사하고
+    손상된 바이트 범위를 보고합니다.
+    """
+
+    def __init__(self, data_path: Path, manifest: Manifest,
+                 workers: int = DEFAULT_WORKERS,
+                 workers_per_drive: Optional[Dict[str, int]] = None,
+                 progress_callback: Optional[Callable[[float, str, float, float], None]] = None,
+                 cache: Optional[VerificationCache] = None,
+                 thread_initializer: Optional[Callable[[], None]] = None,
+                 watcher: Optional[DataWatcher] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 samples_per_file: int = DEFAULT_SAMPLES_PER_FILE,
+                 scheduler: Optional[IOScheduler] = None,
+                 priority: int = PRIORITY_FOREGROUND):
+        self.data_path = Path(data_path)
+        self.manifest = manifest
+        self.cache = cache
+        self.workers = workers
+        self.workers_per_drive = {k.upper(): v for k, v in (workers_per_drive or {}).items()}
+        self.progress_callback = progress_callback
+        self.thread_initializer = thread_initializer
+        self.watcher = watcher
+        self.cancel_token = cancel_token or CancellationToken()
+        self.samples_per_file = max(1, samples_per_file)
+        self.scheduler = scheduler
+        self.priority = priority
+        self.logger = logging.getLogger('FileVerifier')
+        self._stop = threading.Event()
+        self._progress: Optional[ByteProgress] = None
+        self._finishing = set()  # 중단 요청 후에도 끝까지 검사할 파일
+        self._stats: Dict[str, os.stat_result] = {}
+        self._verified_paths: List[str] = []
+        self._samples: Dict[str, List[Tuple[int, int, int]]] = {}  # 표본 검사할 파일의 블록
+
+    def _workers_for(self, drive: str) -> int:
+        workers = self.workers_per_drive.get(drive.upper(), self.workers)
+        return max(1, min(int(workers), MAX_WORKERS))
+
+    def _file_path(self, relative_path: str) -> Path:
+        return self.data_path / relative_path.replace('/', os.sep)
+
+    def _check_stop(self, relative_path: str):
+        if self.cancel_token.cancelled:
+            raise VerificationAborted()
+        if self._stop.is_set() and relative_path not in self._finishing:
+            raise VerificationAborted()
+
+    def _on_chunk(self, relative_path: str) -> Optional[Callable[[int], None]]:
+        progress = self._progress
+        scheduler = self.scheduler
+
+        def on_chunk(n_bytes: int):
+            if scheduler:
+                scheduler.acquire(DISK, n_bytes, self.priority, self.cancel_token)
+            if progress:
+                progress.advance(n_bytes, relative_path)
+
+        return on_chunk if progress or scheduler else None
+
+    def _hash_file(self, file_path: Path, relative_path: str) -> Tuple[str, int]:
+        """파일 해시를 계산합니다. 중단 요청 시 VerificationAborted 발생"""
+        return hash_file(file_path, self.manifest.algorithm,
+                         stop_check=lambda: self._check_stop(relative_path),
+                         on_chunk=self._on_chunk(relative_path))
+
+    def _hash_blocks(self, file_path: Path, relative_path: str,
+                     blocks: List[Tuple[int, int, int]]) -> Tuple[List[str], int]:
+        """연속된 블록들의 해시 목록을 계산합니다"""
+        start, end = blocks[0][1], blocks[-1][2]
+        digests, bytes_read = hash_blocks(
+            file_path, self.manifest.block_size, start, end - start,
+            algorithm=self.manifest.algorithm,
+            stop_check=lambda: self._check_stop(relative_path),
+            on_chunk=self._on_chunk(relative_path)
+        )
+        return [d.hex() for d in digests], bytes_read
+
+    def _run_task(self, task: _Task) -> _TaskResult:
+        relative_path = task.relative_path
+        file_info = self.manifest.files[relative_path]
+        file_path = self._file_path(relative_path)
+        result = _TaskResult(relative_path)
+        try:
+            if task.blocks is None:
+                current_hash, result.bytes_read = self._hash_file(file_path, relative_path)
+                if current_hash != file_info["hash"]:
+                    result.bad_ranges.append((0, file_info["size"]))
+            else:
+                digests, result.bytes_read = self._hash_blocks(file_path, relative_path, task.blocks)
+                expected = file_info["blocks"]
+                for position, (index, start, end) in enumerate(task.blocks):
+                    # 검사 중 파일이 줄어 읽지 못한 블록도 손상으로 처리
+                    if position >= len(digests) or digests[position] != expected[index]:
+                        result.bad_ranges.append((start, end))
+        except IOError as e:
+            result.error = f"Could not read file for verification: {relative_path} ({e})"
+        return result
+
+    def _make_tasks(self, relative_path: str) -> List[_Task]:
+        if relative_path in self._samples:
+            # 표본 블록은 서로 떨어져 있으므로 블록마다 작업 하나
+            return [_Task(relative_path, [block]) for block in self._samples[relative_path]]
+        if not self.manifest.has_blocks(relative_path):
+            return [_Task(relative_path)]
+        blocks = self.manifest.block_ranges(relative_path)
+        return [
+            _Task(relative_path, blocks[i:i + BLOCKS_PER_TASK])
+            for i in range(0, len(blocks), BLOCKS_PER_TASK)
+        ] or [_Task(relative_path)]
+
+    def _finish_file(self, relative_path: str, bytes_read: int,
+                     bad_ranges: List[Tuple[int, int]], error: Optional[str]) -> FileCheckResult:
+        file_path = self._file_path(relative_path)
+        if error:
+            return FileCheckResult(relative_path, False, error, bytes_read, kind=READ_ERROR)
+
+        if bad_ranges:
+            if self.cache:
+                self.cache.invalidate(file_path)
+            bad_ranges = merge_ranges(bad_ranges)
+            message = f"File is corrupt or has been modified: Data\\{relative_path}"
+            if self.manifest.has_blocks(relative_path):
+                message += f" (bad byte ranges: {format_ranges(bad_ranges)})"
+            return FileCheckResult(relative_path, False, message, bytes_read, bad_ranges, kind=HASH_MISMATCH)
+
+        if self.cache and relative_path not in self._samples:
+            self._record_verified(relative_path, file_path, self.manifest.files[relative_path]["hash"])
+        return FileCheckResult(relative_path, True, bytes_read=bytes_read, kind=VERIFIED)
+
+    def _record_verified(self, relative_path: str, file_path: Path, file_hash: str):
+        """해시 도중 파일이 바뀌지 않았을 때만 검증 캐시에 기록"""
+        before = self._stats.get(relative_path)
+        try:
+            after = file_path.stat()
+        except OSError:
+            return
+        if before and (before.st_size, before.st_mtime_ns) == (after.st_size, after.st_mtime_ns):
+            self.cache.record(file_path, after, file_hash, self.manifest.version)
+
+    def _skip_or_sample(self, relative_path: str, report: "VerificationReport", mode: str, seed: str) -> bool:
+        """해시를 생략할 수 있는 파일 처리. 표본 검사 대상이면 False (pending에 추가)"""
+        if mode == SCAN_SPOT and self.manifest.has_blocks(relative_path):
+            self._samples[relative_path] = sample_blocks(
+                self.manifest, relative_path, self.samples_per_file, seed
+            )
+            report.files_sampled += 1
+            return False
+        report.files_skipped += 1
+        self._verified_paths.append(relative_path)
+        return True
+
+    def _collect_pending(self, files: Dict[str, dict], report: "VerificationReport", stop_on_failure: bool,
+                         mode: str = SCAN_QUICK, seed: str = "") -> List[str]:
+        """size/mtime 빠른 검사를 수행하고 해시가 필요한 파일 목록을 반환합니다"""
+        pending = []
+        deep = mode == SCAN_DEEP
+        for relative_path, file_info in files.items():
+            # 0. 감시 중인 폴더에서 마지막 검증 이후 변경 이벤트가 없던 파일은 stat도 생략
+            #    (디스크 자체 손상은 변경 이벤트가 없으므로 spot 모드에서는 표본 검사)
+            if not deep and self.watcher and self.watcher.is_clean(relative_path):
+                if not self._skip_or_sample(relative_path, report, mode, seed):
+                    pending.append(relative_path)
+                continue
+
+            file_path = self._file_path(relative_path)
+            try:
+                file_stat = file_path.stat()
+            except FileNotFoundError:
+                report.add(FileCheckResult(
+                    relative_path, False, f"File is missing: Data\\{relative_path}", kind=MISSING
+                ))
+                if stop_on_failure:
+                    return []
+                continue
+            except OSError as e:
+                report.add(FileCheckResult(
+                    relative_path, False,
+                    f"Could not read file for verification: {relative_path} ({e})", kind=READ_ERROR
+                ))
+                if stop_on_failure:
+                    return []
+                continue
+
+            # 1. 크기가 다르면 해시할 필요 없이 손상된 파일
+            if file_stat.st_size != file_info["size"]:
+                report.add(FileCheckResult(
+                    relative_path, False,
+                    f"File is corrupt or has been modified: Data\\{relative_path}",
+                    kind=SIZE_MISMATCH, bad_ranges=[(0, file_info["size"])]
+                ))
+                if stop_on_failure:
+                    return []
+                continue
+
+            self._stats[relative_path] = file_stat
+            # 2. 크기와 수정 시간이 일치하거나
+            # 3. 이 PC에서 이미 검증했고 그 뒤로 바뀌지 않은 파일은 해시 검사 생략
+            if not deep and (
+                file_stat.st_mtime == file_info["mtime"]
+                or (self.cache and self.cache.is_verified(file_path, file_stat, file_info["hash"]))
+            ):
+                if self._skip_or_sample(relative_path, report, mode, seed):
+                    continue
+
+            pending.append(relative_path)
+        return pending
+
+    def _hash_pending(self, pending: List[str], report: "VerificationReport", stop_on_failure: bool):
+        """해시가 필요한 파일을 드라이브별 스레드 풀에서 검사합니다"""
+        # 드라이브별로 작업 분류
+        by_drive: Dict[str, List[str]] = {}
+        for relative_path in pending:
+            drive = drive_key(self._file_path(relative_path))
+            by_drive.setdefault(drive, []).append(relative_path)
+
+        # 큰 파일부터 시작해야 마지막에 한 스레드만 남는 상황을 줄일 수 있음
+        for paths in by_drive.values():
+            paths.sort(key=lambda p: self.manifest.files[p]["size"], reverse=True)
+
+        executors = [
+            ThreadPoolExecutor(
+                max_workers=self._workers_for(drive),
+                thread_name_prefix=f"verify-{drive}",
+                initializer=self.thread_initializer
+            )
+            for drive in by_drive
+        ]
+        remaining: Dict[str, int] = {}
+        partial: Dict[str, _TaskResult] = {}
+        failed = False
+        try:
+            futures = []
+            for executor, paths in zip(executors, by_drive.values()):
+                for relative_path in paths:
+                    tasks = self._make_tasks(relative_path)
+                    remaining[relative_path] = len(tasks)
+                    partial[relative_path] = _TaskResult(relative_path)
+                    futures.extend(executor.submit(self._run_task, task) for task in tasks)
+
+            for future in as_completed(futures):
+                try:
+                    task_result = future.result()
+                except VerificationAborted:
+                    continue
+
+                relative_path = task_result.relative_path
+                merged = partial[relative_path]
+                merged.bytes_read += task_result.bytes_read
+                merged.bad_ranges.extend(task_result.bad_ranges)
+                merged.error = merged.error or task_result.error
+                report.bytes_read += task_result.bytes_read
+
+                if stop_on_failure and (merged.bad_ranges or merged.error):
+                    # 실패한 파일은 손상 범위를 모두 찾을 때까지 계속, 나머지는 중단
+                    self._finishing.add(relative_path)
+                    self._stop.set()
+
+                remaining[relative_path] -= 1
+                if remaining[relative_path]:
+                    continue
+
+                result = self._finish_file(relative_path, merged.bytes_read, merged.bad_ranges, merged.error)
+                report.add(result)
+                # 읽기 오류는 errors에만 세어 파일마다 한 번씩만 집계
+                if result.kind != READ_ERROR:
+                    report.files_hashed += 1
+                if result.ok:
+                    self._verified_paths.append(relative_path)
+                if not result.ok:
+                    failed = True
+                if failed and stop_on_failure and not any(remaining[p] for p in self._finishing):
+                    break
+        finally:
+            self._stop.set()
+            for executor in executors:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    def _pending_bytes(self, relative_path: str) -> int:
+        if relative_path in self._samples:
+            return sum(end - start for _, start, end in self._samples[relative_path])
+        return self.manifest.files[relative_path]["size"]
+
+    def _run(self, stop_on_failure: bool, mode: str = SCAN_QUICK,
+             paths: Optional[Collection[str]] = None) -> "VerificationReport":
+        self._stop.clear()
+        self._finishing.clear()
+        self._stats.clear()
+        self._samples.clear()
+        self._verified_paths = []
+        files = self.manifest.files
+        if paths is not None:
+            files = {p: files[p] for p in paths if p in files}
+        report = VerificationReport(files_total=len(files), mode=mode)
+        started = time.perf_counter()
+        watch_token = self.watcher.begin_scan() if self.watcher else 0
+
+        seed = ""
+        if mode == SCAN_SPOT:
+            # 회차마다 다른 블록을 고르되 같은 회차는 재현 가능하도록
+            sample_round = self.cache.next_sample_round() if self.cache else 0
+            seed = f"{self.manifest.version}:{sample_round}"
+        pending = self._collect_pending(files, report, stop_on_failure, mode, seed)
+        report.stat_seconds = time.perf_counter() - started
+        if not (stop_on_failure and report.failures):
+            # 파일 수가 아닌 해시할 바이트 기준 진행률 (큰 MPQ와 작은 파일의 비중 차이 반영)
+            self._progress = ByteProgress(
+                sum(self._pending_bytes(p) for p in pending), self.progress_callback
+            )
+            self._hash_pending(pending, report, stop_on_failure)
+            self._progress.finish()
+            self._progress = None
+
+        report.elapsed = time.perf_counter() - started
+        if self.watcher:
+            self.watcher.mark_clean(self._verified_paths, since=watch_token)
+        report.cancelled = self.cancel_token.cancelled
+        report.complete = not report.cancelled and (
+            report.files_skipped + report.files_hashed + len(report.missing)
+            + len(report.size_mismatch) + len(report.errors) == report.files_total
+        )
+        if mode == SCAN_DEEP and paths is None and report.complete and report.ok and self.cache:
+            self.cache.record_full_verify(self.manifest.version)
+        for failure in report.failures:
+            self.logger.error(failure.message)
+        return report
+
+    def start_full_verify_clock(self):
+        """이 매니페스트 버전의 전체 검증 기록이 없으면 지금부터 주기를 세기 시작"""
+        if self.cache and self.cache.last_full_verify(self.manifest.version) is None:
+            self.cache.record_full_verify(self.manifest.version)
+
+    def full_verify_due(self, interval: float) -> bool:
+        """마지막 전체 해시 검증 후 interval초가 지났는지 (기록이 없으면 False)"""
+        if not self.cache:
+            return False
+        last = self.cache.last_full_verify(self.manifest.version)
+        return last is not None and time.time() - last >= interval
+
+    def scan(self, mode: str = SCAN_QUICK, paths: Optional[Collection[str]] = None) -> "VerificationReport":
+        """첫 실패에서 멈추지 않고 모든 파일(paths를 주면 그 파일만)을 검사해 전체 보고서를 반환합니다"""
+        return self._run(stop_on_failure=False, mode=mode, paths=paths)
+
+    def verify(self, mode: str = SCAN_QUICK) -> Tuple[bool, str]:
+        """모든 파일을 검사합니다. 첫 번째 실패에서 (False, 메시지)를 반환합니다"""
+        report = self._run(stop_on_failure=True, mode=mode)
+        return report.ok, report.message()
+
+    def cancel(self):
+        """진행 중인 해시 작업 중단 요청"""
+        self.cancel_token.cancel()
+        self._stop.set()
+
+
+@dataclass
+class VerificationReport:
+    """전체 검사 결과 (복구/UI 코드가 실패 목록 전체를 한 번에 처리할 수 있음)"""
+    missing: List[FileCheckResult] = field(default_factory=list)
+    size_mismatch: List[FileCheckResult] = field(default_factory=list)
+    hash_mismatch: List[FileCheckResult] = field(default_factory=list)
+    errors: List[FileCheckResult] = field(default_factory=list)
+    files_total: int = 0
+    files_skipped: int = 0  # size/mtime 또는 검증 캐시로 해시를 생략한 파일
+    files_sampled: int = 0  # 블록 표본만 해시한 파일 (files_hashed에도 포함)
+    files_hashed: int = 0   # 끝까지 해시한 파일 (읽기 오류는 errors에만 포함)
+    bytes_read: int = 0
+    stat_seconds: float = 0.0
+    elapsed: float = 0.0
+    complete: bool = True  # 모든 파일을 끝까지 검사했는지 여부
+    cancelled: bool = False
+    mode: str = SCAN_QUICK
+
+    @classmethod
+    def from_error(cls, relative_path: str, message: str) -> "VerificationReport":
+        """검사를 시작하지 못했을 때의 보고서"""
+        report = cls(complete=False)
+        report.add(FileCheckResult(relative_path, False, message, kind=READ_ERROR))
+        return report
+
+    def add(self, result: FileCheckResult):
+        target = {
+            MISSING: self.missing,
+            SIZE_MISMATCH: self.size_mismatch,
+            HASH_MISMATCH: self.hash_mismatch,
+            READ_ERROR: self.errors,
+        }.get(result.kind)
+        if target is not None:
+            target.append(result)
+
+    def replace(self, paths: Collection[str], recheck: "VerificationReport"):
+        """paths를 다시 검사한 recheck 결과로 해당 파일의 결과를 바꿉니다"""
+        paths = set(paths)
+        for results in (self.missing, self.size_mismatch, self.hash_mismatch, self.errors):
+            results[:] = [r for r in results if r.relative_path not in paths]
+        for result in recheck.failures:
+            self.add(result)
+        # 다시 검사한 파일은 모두 표본을 해시했던 파일
+        self.files_hashed += recheck.files_hashed - len(paths)
+        self.files_sampled -= len(paths)
+        self.bytes_read += recheck.bytes_read
+        self.elapsed += recheck.elapsed
+        self.cancelled = self.cancelled or recheck.cancelled
+        self.complete = self.complete and recheck.complete
+
+    @property
+    def failures(self) -> List[FileCheckResult]:
+        return sorted(
+            self.missing + self.size_mismatch + self.hash_mismatch + self.errors,
+            key=lambda r: r.relative_path
+        )
+
+    @property
+    def ok(self) -> bool:
+        return not self.cancelled and not self.failures
+
+    @property
+    def throughput(self) -> float:
+        """해시 처리량 (bytes/s)"""
+        hash_seconds = self.elapsed - self.stat_seconds
+        return self.bytes_read / hash_seconds if hash_seconds > 0 else 0.0
+
+    def message(self) -> str:
+        failures = self.failures
+        if len(failures) == 1:
+            return failures[0].message
+        if failures:
+            lines = [f"{len(failures)} files failed verification:"]
+            lines.extend(f"- {failure.message}" for failure in failures)
+            return "\n".join(lines)
+        if self.cancelled:
+            return "Verification was aborted."
+        return "All files verified successfully."
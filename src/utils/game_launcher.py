@@ -1,34 +1,64 @@
 import os
+import asyncio
+import subprocess
 from subprocess import Popen, PIPE
 from pathlib import Path
 import logging
 import platform
-import shutil
-import json
-import hashlib
+import threading
+import urllib.parse
+from typing import List, Optional, Tuple
 from PySide6.QtCore import QObject, Signal
-from utils.resource_path import resource_path
-# from utils.torrent_manager import TorrentManager
+from utils.resource_path import resource_path, app_data_path
+from utils.file_verifier import (
+    FileVerifier, FileCheckResult, VerificationReport, DEFAULT_WORKERS, DEFAULT_SAMPLES_PER_FILE, READ_ERROR
+)
+from utils.background_verifier import BackgroundVerifier, lower_thread_priority
+from utils.data_watcher import DataWatcher, normalize_path
+from utils.verification_cache import VerificationCache
+from utils.manifest import Manifest, load_manifest
+from utils.progress import CancellationToken, PauseToken, TransferStats
+from utils.http_downloader import HttpDownloader, DownloadItem, DownloadResult, DEFAULT_CONNECTIONS, DEFAULT_RETRIES, PART_SUFFIX
+from utils.disk_space import plan_space
+from utils.object_store import ObjectStore
+from utils.lan_peer import LanPeer, PEER_RETRIES
+from utils.io_scheduler import (
+    IOScheduler, Allocation, DISK, NETWORK, PRIORITY_FOREGROUND, PRIORITY_BACKGROUND, PRIORITY_SEEDING
+)
+from utils.torrent_manager import TorrentManager, TorrentStatus
+from utils.repair import plan_repair, subset_manifest
+from utils.delta import DeltaError, PATCH_DIR, apply_delta, fetch_patch_index, find_patch
+from api.latency import format_gateway, parse_gateways
 
 class GameLauncherSignals(QObject):
     client_missing = Signal()
-    download_progress = Signal(float, str, float)
     download_error = Signal(str)
+    download_finished = Signal()
+    repair_finished = Signal(bool, str)  # success, message
     login_required = Signal()
-    verification_progress = Signal(float, str)  # percentage, filename
+    verification_progress = Signal(float, str, float, float)  # percentage, filename, bytes/s, eta(s)
+    verification_state = Signal(str, str)  # state, message
+    io_allocations = Signal(object)  # List[Allocation]
 
 class GameLauncher:
     def __init__(self, settings: dict, parent=None):
         self.settings = settings
         self.parent = parent
+        # 서버 상태와 게이트웨이 왕복 시간을 측정하는 ServerAPI (메인 창이 소유)
+        self.server_api = getattr(parent, 'server_api', None)
         self.signals = GameLauncherSignals()
         self.logger = logging.getLogger('GameLauncher')
         self.platform = platform.system().lower()
         self.account_username = None
         self.account_id = None
         self.torrent_manager = None
+        # HTTP 다운로드/복구 전체에서 공유하는 취소 토큰 (출처가 여러 개여도 한 번에 중단)
+        self._download_token = None
+        # 일시정지: HTTP 작업자는 연결을 닫고 기다림 (토렌트는 libtorrent가 멈춤)
+        self._pause_token = PauseToken()
+        # 진행 중인 다운로드/복구의 전송량 (UI가 일정한 주기로 조회)
+        self.transfer_stats = TransferStats()
         self.client_version = "3.3.5a"
-        self.required_size = 17_179_869_184  # 16GB in bytes
         # 파일 경로 캐싱
         self.game_path = Path(settings.get('game', {}).get('path', ''))
         self.config_path = self.game_path / 'WTF' / 'Config.wtf'
@@ -36,12 +66,103 @@ class GameLauncher:
             self.game_path / 'Data' / 'koKR' / 'realmlist.wtf'
         ]
         self.client_info = None
+        # Data 폴더 변경 감시 (변경된 파일만 다시 검사)
+        self.data_watcher = None
+        self._manifest_paths = set()
+        # 로컬 검증 기록 (한 번 검증한 파일은 바뀌기 전까지 다시 해시하지 않음)
+        self.verification_cache = VerificationCache(app_data_path() / 'verification.db')
+        # 여러 클라이언트 설치가 같은 파일을 공유하는 저장소 (선택)
+        store_settings = settings.get('store', {})
+        self.object_store = ObjectStore(
+            Path(store_settings.get('path') or app_data_path() / 'objects'),
+            cache=self.verification_cache
+        ) if store_settings.get('enabled', False) else None
+        # 다운로드, 검증, 파일 제공이 함께 쓰는 네트워크/디스크 속도 조정 (게임 실행 중에는 낮춤)
+        limits, playing_limits = self._bandwidth_limits()
+        self.io_scheduler = IOScheduler(
+            limits, playing_limits,
+            game_running=self.is_game_running,
+            on_change=self._on_io_allocations
+        )
+        self.io_scheduler.start()
+        # 같은 네트워크의 다른 런처와 검증된 파일을 주고받기 (선택)
+        lan_settings = settings.get('lan', {})
+        self.lan_peer = LanPeer(
+            self.verification_cache, self.io_scheduler, port=lan_settings.get('port', 0)
+        ) if lan_settings.get('enabled', False) else None
+        # 시작 직후 미리 검사해 두고 게임 시작 시 결과를 재사용
+        self.background_verifier = BackgroundVerifier(
+            self,
+            max_age=settings.get('verification', {}).get('max_age', 600),
+            state_callback=self.signals.verification_state.emit,
+            full_interval=settings.get('verification', {}).get('full_interval_hours', 168) * 3600
+        )
         self.torrent_path = Path("assets/client/wow-3.3.5.torrent")
         self.trackers = [
             "udp://tracker1.example.com:6969/announce",
             "udp://tracker2.example.com:6969/announce"
         ]
 
+    def _bandwidth_limits(self) -> Tuple[dict, dict]:
+        """설정의 속도 제한 (KiB/s, MiB/s 단위)을 bytes/s로 변환"""
+        bandwidth = self.settings.get('bandwidth', {})
+        limits = {
+            NETWORK: bandwidth.get('network_limit_kb', 0) * 1024,
+            DISK: bandwidth.get('disk_limit_mb', 0) * 1024 * 1024,
+        }
+        playing_limits = {
+            NETWORK: bandwidth.get('playing_network_kb', 1024) * 1024,
+            DISK: bandwidth.get('playing_disk_mb', 8) * 1024 * 1024,
+        }
+        return limits, playing_limits
+
+    def apply_bandwidth_settings(self):
+        """설정 변경 후 속도 제한 다시 적용"""
+        self.io_scheduler.set_limits(*self._bandwidth_limits())
+
+    def _on_io_allocations(self, allocations: List[Allocation]):
+        # 토렌트는 libtorrent가 직접 속도를 제한하므로 현재 할당을 세션 설정으로 전달
+        torrent_manager = self.torrent_manager
+        if torrent_manager:
+            torrent_manager.loop.call_soon_threadsafe(
+                torrent_manager.set_rate_limits,
+                self.io_scheduler.rate_for(NETWORK, PRIORITY_FOREGROUND),
+                self.io_scheduler.rate_for(NETWORK, PRIORITY_SEEDING)
+            )
+        self.signals.io_allocations.emit(allocations)
+
+    def set_game_path(self, path: str):
+        """게임 경로 변경 시 캐시된 경로, 감시, 검증 결과를 갱신합니다"""
+        if Path(path) == self.game_path:
+            return
+        self.game_path = Path(path)
+        self.config_path = self.game_path / 'WTF' / 'Config.wtf'
+        self.realmlist_paths = [
+            self.game_path / 'Data' / 'koKR' / 'realmlist.wtf'
+        ]
+        self.background_verifier.invalidate()
+        if self.data_watcher:
+            self.stop_watching()
+            self.start_watching()
+
+    def start_watching(self):
+        """Data 폴더 감시 시작 (설정에서 끌 수 있음)"""
+        if not self.settings.get('verification', {}).get('watch', True):
+            return
+        if self.data_watcher is None:
+            self.data_watcher = DataWatcher(self.game_path / "Data", on_change=self._on_data_changed)
+        self.data_watcher.start()
+
+    def stop_watching(self):
+        if self.data_watcher:
+            self.data_watcher.stop()
+            self.data_watcher = None
+
+    def _on_data_changed(self, relative_path: str):
+        """매니페스트 파일이 바뀌면 미리 검사한 결과를 무효화"""
+        if not relative_path or normalize_path(relative_path) in self._manifest_paths:
+            self.background_verifier.invalidate()
+
     def validate_game_path(self, path: str) -> bool:
         """게임 경로의 유효성을 확인합니다"""
         if not path:
@@ -67,62 +188,151 @@ class GameLauncher:
             self.logger.error(f"게임 경로 유효성 검사 오류: {e}")
             return False
 
-    def verify_data_files(self) -> (bool, str):
-        """Verifies the integrity of game files against a manifest using size and mtime first."""
+    def create_verifier(self, background: bool = False,
+                        cancel_token: Optional[CancellationToken] = None) -> Tuple[Optional[FileVerifier], str]:
+        """매니페스트를 읽어 검증 엔진을 만듭니다. 실패 시 (None, 오류 메시지)
+
+        background=True이면 적은 스레드를 낮은 우선순위로 사용합니다.
+        """
         manifest_path = resource_path("config/manifest.json")
         if not manifest_path.exists():
-            return False, "Manifest file (manifest.json) not found. Cannot verify files."
+            return None, "Manifest file (manifest.json) not found. Cannot verify files."
 
         try:
-            with open(manifest_path, "r") as f:
-                manifest = json.load(f)
+            manifest = load_manifest(manifest_path)
         except Exception as e:
-            return False, f"Error reading manifest file: {e}"
+            return None, f"Error reading manifest file: {e}"
 
         data_path = self.game_path / "Data"
-        total_files = len(manifest)
-        checked_files = 0
+        self._manifest_paths = {normalize_path(p) for p in manifest.files}
+        # 매니페스트에서 빠진 파일의 검증 기록 정리
+        self.verification_cache.prune(
+            manifest.version, (data_path / p.replace('/', os.sep) for p in manifest.files)
+        )
+
+        # 드라이브별 병렬 해시 설정
+        verification_settings = self.settings.get('verification', {})
+        if background:
+            workers = verification_settings.get('background_workers', 1)
+            workers_per_drive = {}
+        else:
+            workers = verification_settings.get('workers', DEFAULT_WORKERS)
+            workers_per_drive = verification_settings.get('workers_per_drive', {})
+        verifier = FileVerifier(
+            data_path,
+            manifest,
+            workers=workers,
+            workers_per_drive=workers_per_drive,
+            progress_callback=self.signals.verification_progress.emit,
+            cache=self.verification_cache,
+            thread_initializer=lower_thread_priority if background else None,
+            watcher=self.data_watcher,
+            cancel_token=cancel_token,
+            samples_per_file=verification_settings.get('spot_samples', DEFAULT_SAMPLES_PER_FILE),
+            scheduler=self.io_scheduler,
+            priority=PRIORITY_BACKGROUND if background else PRIORITY_FOREGROUND
+        )
+        return verifier, ""
 
-        for relative_path, file_info in manifest.items():
+    def verify_data_files(self) -> (bool, str):
+        """Verifies the integrity of game files against a manifest using size and mtime first."""
+        verifier, error_msg = self.create_verifier()
+        if not verifier:
+            return False, error_msg
+        ok, message = verifier.verify()
+        if ok:
+            self.share_verified_files(verifier.data_path, verifier.manifest)
+        return ok, message
+
+    def scan_data_files(self) -> VerificationReport:
+        """Scans every manifest entry in one pass and returns a full report of missing/damaged files."""
+        verifier, error_msg = self.create_verifier()
+        if not verifier:
+            return VerificationReport.from_error("manifest.json", error_msg)
+        report = verifier.scan()
+        if report.ok:
+            self.share_verified_files(verifier.data_path, verifier.manifest)
+        return report
+
+    def start_lan_peer(self):
+        """LAN 피어 시작 (설정에서 켠 경우). 설치가 없어도 다른 피어를 찾을 수 있음"""
+        if not self.lan_peer:
+            return
+        try:
+            self.lan_peer.start()
+        except OSError as e:
+            self.logger.warning(f"LAN 피어를 시작할 수 없습니다: {e}")
+            self.lan_peer = None
+
+    def stop_lan_peer(self):
+        if self.lan_peer:
+            self.lan_peer.stop()
+
+    def share_verified_files(self, data_path: Path, manifest: Manifest, relative_paths=None):
+        """검증된 파일을 공유 저장소에 등록하고, 설치 전체면 LAN 피어로 제공
+
+        이미 같은 객체가 있으면 설치 파일이 그 객체를 가리키도록 바꿔 중복을 없앱니다.
+        설치 전체를 등록한 뒤에는 어느 설치도 쓰지 않는 객체를 정리합니다.
+        """
+        if self.lan_peer and relative_paths is None:
+            self.lan_peer.share(data_path, manifest)
+        if not self.object_store:
+            return
+        shared = 0
+        for relative_path in (manifest.files if relative_paths is None else relative_paths):
+            if not self.object_store.shareable(relative_path):
+                continue
+            file_hash = manifest.files[relative_path]["hash"]
             file_path = data_path / relative_path.replace('/', os.sep)
-            
-            checked_files += 1
-            progress = (checked_files / total_files) * 100
-            self.signals.verification_progress.emit(progress, relative_path)
-
-            if not file_path.exists():
-                error_msg = f"File is missing: Data\\{relative_path}"
-                self.logger.error(error_msg)
-                return False, error_msg
-
             try:
                 file_stat = file_path.stat()
-                # 1. Check size and modification time first for a quick check
-                if file_stat.st_size == file_info["size"] and file_stat.st_mtime == file_info["mtime"]:
-                    continue  # Skip hash check if size and mtime match
-
-                # 2. If they don't match, perform the expensive hash check
-                sha256_hash = hashlib.sha256()
-                with open(file_path, "rb") as f:
-                    for byte_block in iter(lambda: f.read(4096), b""):
-                        sha256_hash.update(byte_block)
-                current_hash = sha256_hash.hexdigest()
-
-                if current_hash != file_info["hash"]:
-                    error_msg = f"File is corrupt or has been modified: Data\\{relative_path}"
-                    self.logger.error(error_msg)
-                    return False, error_msg
-            
-            except IOError as e:
-                error_msg = f"Could not read file for verification: {relative_path} ({e})"
-                self.logger.error(error_msg)
-                return False, error_msg
-        
-        return True, "All files verified successfully."
+            except OSError:
+                continue
+            if self.verification_cache.is_verified(file_path, file_stat, file_hash) and \
+                    self.object_store.add(file_path, file_hash):
+                shared += 1
+        self.logger.debug(f"공유 저장소에 {shared}개 파일 등록")
+        if relative_paths is None:
+            removed = self.object_store.prune()
+            if removed:
+                self.logger.info(f"공유 저장소에서 쓰지 않는 객체 {removed}개를 정리했습니다")
+
+    def _materialize_from_store(self, data_path: Path, manifest: Manifest, relative_paths) -> List[str]:
+        """공유 저장소에 있는 파일은 받지 않고 링크로 만듭니다. 만든 파일 목록 반환"""
+        if not self.object_store:
+            return []
+        restored = []
+        for relative_path in relative_paths:
+            file_info = manifest.files.get(relative_path)
+            if not file_info or not self.object_store.shareable(relative_path) or \
+                    not self.object_store.has(file_info["hash"], file_info["size"]):
+                continue
+            file_path = data_path / relative_path.replace('/', os.sep)
+            method = self.object_store.materialize(file_info["hash"], file_path)
+            if not method:
+                continue
+            # 검증된 객체와 같은 내용이므로 이 경로도 검증된 것으로 기록
+            self.verification_cache.record(file_path, file_path.stat(), file_info["hash"], manifest.version)
+            restored.append(relative_path)
+        if restored:
+            self.logger.info(f"공유 저장소에서 {len(restored)}개 파일을 가져왔습니다")
+        return restored
+
+    def select_gateway(self, realmlist: str) -> str:
+        """realmlist에 주소가 여러 개면 최근 응답한 것 중 가장 빠른 주소 (측정 전이면 첫 주소)"""
+        gateways = parse_gateways(realmlist)
+        if len(gateways) <= 1:
+            return realmlist.strip()
+        best = self.server_api.latency.best(gateways) if self.server_api else None
+        if best is None:
+            return format_gateway(gateways[0])
+        self.logger.info(f"가장 빠른 인증 서버: {best.host}:{best.port} ({best.describe()})")
+        return format_gateway((best.host, best.port))
 
     def update_realmlist(self, path: str, realmlist: str) -> bool:
-        """realmlist.wtf 파일을 업데이트합니다"""
+        """realmlist.wtf 파일을 업데이트합니다 (주소가 여러 개면 가장 빠른 주소)"""
         try:
+            realmlist = self.select_gateway(realmlist)
             # 두 가지 가능한 경로 확인
             data_paths = [
                 Path(path) / 'Data' / 'koKR' / 'realmlist.wtf'  # 한국어 로케일 경로
@@ -133,8 +343,11 @@ class GameLauncher:
             for data_path in data_paths:
                 try:
                     data_path.parent.mkdir(parents=True, exist_ok=True)
-                    with open(data_path, 'w', encoding='utf-8') as f:
+                    # 다른 설치와 링크된 파일이어도 이 설치만 바뀌도록 임시 파일에 쓴 뒤 교체
+                    temp_path = data_path.with_name(data_path.name + '.tmp')
+                    with open(temp_path, 'w', encoding='utf-8') as f:
                         f.write(f'set realmlist {realmlist}\n')
+                    os.replace(temp_path, data_path)
                     updated = True
                 except Exception as e:
                     self.logger.warning(f"{data_path}를 업데이트할 수 없습니다: {e}")
@@ -147,8 +360,8 @@ class GameLauncher:
     def update_config_wtf(self, path: str) -> bool:
         """자동 로그인을 위해 Config.wtf 파일을 업데이트합니다"""
         try:
-            # 설정에서 realmlist 가져오기
-            realmlist = self.settings.get('game', {}).get('realmlist', '127.0.0.1')
+            # 설정에서 realmlist 가져오기 (realmlist.wtf와 같은 주소)
+            realmlist = self.select_gateway(self.settings.get('game', {}).get('realmlist', '127.0.0.1'))
             
             config_path = Path(path) / 'WTF' / 'Config.wtf'
             
@@ -299,14 +512,28 @@ class GameLauncher:
             self.logger.error(f"게임 시작 오류: {e}")
             return False 
 
-    def _check_free_space(self, path: str) -> bool:
-        """사용 가능한 공간이 충분한지 확인"""
-        try:
-            free_space = shutil.disk_usage(path).free
-            return free_space >= self.required_size
-        except Exception as e:
-            self.logger.error(f"사용 가능한 공간 확인 오류: {e}")
-            return False
+    def _check_free_space(self, needs: List[Tuple[Path, int]]):
+        """기록할 경로별 필요 공간을 볼륨마다 합산해 확인하고, 부족하면 RuntimeError"""
+        plan = plan_space(needs)
+        if not plan.ok:
+            raise RuntimeError(plan.message())
+        self.logger.info(plan.message())
+
+    def _space_needs(self, dest_dir: Path, items: List[DownloadItem]) -> List[Tuple[Path, int]]:
+        """HTTP 다운로드에 추가로 필요한 공간
+
+        .part 파일에 받은 뒤 교체하므로 기존 파일이 있어도 전체 크기가 필요하고,
+        이미 할당된 .part 파일(이어받기)은 제외합니다.
+        """
+        needs = []
+        for item in items:
+            part_path = dest_dir / (item.relative_path.replace('/', os.sep) + PART_SUFFIX)
+            try:
+                allocated = part_path.stat().st_size
+            except OSError:
+                allocated = 0
+            needs.append((part_path, item.size - allocated))
+        return needs
 
     def _verify_client_files(self, path: str) -> tuple[bool, list[str]]:
         """클라이언트 파일 무결성 확인"""
@@ -354,8 +581,8 @@ class GameLauncher:
 
     def is_game_running(self) -> bool:
         """게임이 실행 중인지 확인"""
-        if self.platform == 'linux':
-            # Linux의 경우 wine 프로세스 확인
+        if self.platform != 'windows':
+            # Linux/macOS의 경우 wine 프로세스 확인
             try:
                 result = subprocess.run(['pgrep', '-f', 'Wow.exe'], 
                                       stdout=subprocess.PIPE)
@@ -365,45 +592,414 @@ class GameLauncher:
         else:
             # Windows의 경우 Wow.exe 프로세스 확인
             try:
+                # 콘솔 없는 빌드에서 주기적으로 호출하므로 콘솔 창이 뜨지 않게
                 result = subprocess.run(['tasklist', '/FI', 'IMAGENAME eq Wow.exe'],
-                                      stdout=subprocess.PIPE)
+                                      stdout=subprocess.PIPE,
+                                      creationflags=subprocess.CREATE_NO_WINDOW)
                 return b"Wow.exe" in result.stdout
             except:
                 return False
 
-    def _download_client(self):
-        """클라이언트 다운로드 시작"""
-        try:
-            if not self.torrent_path.exists():
-                raise RuntimeError("토렌트 파일을 찾을 수 없습니다")
-
-            # 사용 가능한 공간 확인
-            if not self._check_free_space(self.settings['game']['path']):
-                raise RuntimeError("사용 가능한 공간이 부족합니다")
+    def _download_items(self, game_path: Path, manifest: Manifest) -> List[DownloadItem]:
+        """매니페스트 기준으로 없거나 크기가 다른 Data 파일 목록 (받으면서 검증할 해시 포함)"""
+        items = []
+        for relative_path, file_info in manifest.files.items():
+            file_path = game_path / 'Data' / relative_path.replace('/', os.sep)
+            try:
+                if file_path.stat().st_size == file_info["size"]:
+                    continue
+            except OSError:
+                pass
+            items.append(DownloadItem(
+                f"Data/{relative_path}",
+                file_info["size"],
+                hash=file_info["hash"],
+                algorithm=manifest.algorithm,
+                block_size=manifest.block_size or 0,
+                blocks=file_info.get("blocks") if manifest.has_blocks(relative_path) else None
+            ))
+        return items
+
+    def _all_files_cached(self, game_path: Path, manifest: Manifest) -> bool:
+        """매니페스트의 모든 파일이 검증 캐시에 기록된 상태 그대로인지 (stat만 사용)"""
+        for relative_path, file_info in manifest.files.items():
+            file_path = game_path / 'Data' / relative_path.replace('/', os.sep)
+            try:
+                file_stat = file_path.stat()
+            except OSError:
+                return False
+            if not self.verification_cache.is_verified(file_path, file_stat, file_info["hash"]):
+                return False
+        return True
 
-            # 디렉토리가 없으면 생성
-            Path(self.settings['game']['path']).mkdir(parents=True, exist_ok=True)
+    def _on_file_downloaded(self, manifest: Manifest, relative_path: str, file_path: Path, verified: bool):
+        """받으면서 해시가 일치한 파일은 검증 캐시에 기록 (다시 읽어 검사하지 않음)"""
+        if not verified:
+            return
+        data_relative = relative_path.split('/', 1)[1]
+        try:
+            self.verification_cache.record(
+                file_path, file_path.stat(), manifest.files[data_relative]["hash"], manifest.version
+            )
+        except OSError as e:
+            self.logger.warning(f"다운로드한 파일을 검증 캐시에 기록할 수 없습니다: {e}")
+            return
+        if self.object_store:
+            self.object_store.add(file_path, manifest.files[data_relative]["hash"])
 
-            # TorrentManager 초기화
-            if not self.torrent_manager:
-                # self.torrent_manager = TorrentManager()
-                pass
+    def _download_client(self):
+        """클라이언트 다운로드 시작 (HTTP 미러 또는 토렌트, 둘 다 백그라운드에서 진행)"""
+        try:
+            if self._download_token or self.torrent_manager:
+                return  # 이미 받는 중
 
-            # 푸터에 진행률 표시
-            self.signals.download_progress.emit(0, '', 0)
+            # 디렉토리가 없으면 생성 (필요한 공간은 방식별로 매니페스트 기준 확인)
+            game_path = Path(self.settings['game']['path'])
+            game_path.mkdir(parents=True, exist_ok=True)
 
-            # 다운로드 시작
-            # self.torrent_manager.start_download(
-            #     torrent_path=str(self.torrent_path),
-            #     save_path=self.settings['game']['path'],
-            #     trackers=self.trackers,
-            #     status_callback=lambda s: self.signals.download_progress.emit(
-            #         s.progress, s.state, s.speed
-            #     )
-            # )
-            pass
+            self._pause_token.resume()
+            if self.settings.get('download', {}).get('method', 'http') == 'torrent':
+                self._start_torrent_download(game_path)
+            else:
+                self._start_http_download(game_path)
 
         except Exception as e:
             self.logger.error(f"클라이언트 다운로드 오류: {e}")
             self.signals.download_error.emit(str(e))
-            raise
\ No newline at end of file
+            raise
+
+    def _start_torrent_download(self, game_path: Path):
+        if not self.torrent_path.exists():
+            raise RuntimeError("토렌트 파일을 찾을 수 없습니다")
+
+        # 토렌트는 파일에 직접 기록하므로 이미 있는 파일 크기만큼은 추가로 필요하지 않음
+        manifest = load_manifest(resource_path("config/manifest.json"))
+        self._materialize_from_store(game_path / 'Data', manifest, [
+            item.relative_path.split('/', 1)[1] for item in self._download_items(game_path, manifest)
+        ])
+        needs = []
+        for item in self._download_items(game_path, manifest):
+            file_path = game_path / item.relative_path.replace('/', os.sep)
+            existing = file_path.stat().st_size if file_path.exists() else 0
+            needs.append((file_path, item.size - existing))
+        self._check_free_space(needs)
+
+        # 알림 처리와 상태 타이머는 런처의 asyncio 루프에서 실행
+        loop = self.parent.loop
+        self.torrent_manager = TorrentManager(
+            loop,
+            status_callback=self._emit_torrent_status,
+            resume_path=app_data_path() / 'client.resume'
+        )
+        self.torrent_manager.set_rate_limits(
+            self.io_scheduler.rate_for(NETWORK, PRIORITY_FOREGROUND),
+            self.io_scheduler.rate_for(NETWORK, PRIORITY_SEEDING)
+        )
+        # 토렌트는 acquire()를 거치지 않으므로 받는 동안 게임 실행 확인을 유지
+        self.io_scheduler.hold()
+
+        # 푸터 진행률은 UI가 transfer_stats를 주기적으로 조회해 표시
+        self.transfer_stats.reset()
+
+        future = asyncio.run_coroutine_threadsafe(
+            self.torrent_manager.download(str(self.torrent_path), str(game_path), self.trackers),
+            loop
+        )
+        future.add_done_callback(self._on_torrent_done)
+
+    def _emit_torrent_status(self, status: TorrentStatus):
+        self.transfer_stats.update(status.bytes_done, status.bytes_total, status.state)
+
+    def _on_torrent_done(self, future):
+        self.io_scheduler.release()
+        if future.cancelled():
+            return
+        self.torrent_manager = None
+        error = future.exception()
+        if error:
+            self.logger.error(f"클라이언트 다운로드 오류: {error}")
+            self.signals.download_error.emit(str(error))
+            return
+        self.background_verifier.invalidate()
+        self.signals.download_finished.emit()
+
+    def _start_http_download(self, game_path: Path):
+        if not self.settings.get('download', {}).get('mirror_url') and not self.lan_peer:
+            raise RuntimeError("다운로드 미러 주소가 설정되지 않았습니다")
+
+        manifest = load_manifest(resource_path("config/manifest.json"))
+        items = self._download_items(game_path, manifest)
+        restored = self._materialize_from_store(
+            game_path / 'Data', manifest, [item.relative_path.split('/', 1)[1] for item in items]
+        )
+        items = [item for item in items if item.relative_path.split('/', 1)[1] not in restored]
+        self._check_free_space(self._space_needs(game_path, items))
+        token = self._download_token = CancellationToken()
+
+        # 푸터 진행률은 UI가 transfer_stats를 주기적으로 조회해 표시
+        self.transfer_stats.reset()
+
+        # 다운로드 시작 (받은 구간은 저장되어 다음 실행 때 이어받음, 피어 찾기도 이 스레드에서)
+        thread = threading.Thread(
+            target=self._run_download, args=(game_path, items, manifest, token),
+            name="client-download", daemon=True
+        )
+        thread.start()
+
+    def _download_sources(self, manifest: Manifest) -> List[str]:
+        """받을 곳 목록: 같은 매니페스트를 가진 LAN 피어(최근 순) 다음 미러"""
+        sources = [peer.url for peer in self.lan_peer.discover(manifest.version)] if self.lan_peer else []
+        if sources:
+            self.logger.info(f"LAN 피어 {len(sources)}곳에서 먼저 받습니다")
+        mirror_url = self.settings.get('download', {}).get('mirror_url')
+        if mirror_url:
+            sources.append(mirror_url)
+        if not sources:
+            raise RuntimeError("다운로드 미러 주소가 설정되지 않았습니다")
+        return sources
+
+    def _download_from_sources(self, dest_dir: Path, items: List[DownloadItem], manifest: Manifest,
+                               token: CancellationToken, **kwargs) -> DownloadResult:
+        """출처를 차례로 사용해 받고, 받지 못한 파일만 다음 출처로 넘김
+
+        받은 구간은 매니페스트 블록 해시로 검사하므로 피어가 잘못된 데이터를 보내도
+        설치에 들어가지 않습니다. 이어받기 상태는 출처가 바뀌어도 유지됩니다.
+        """
+        download_settings = self.settings.get('download', {})
+        mirror_url = download_settings.get('mirror_url')
+        combined = DownloadResult()
+        remaining = items
+        for base_url in self._download_sources(manifest):
+            downloader = HttpDownloader(
+                base_url,
+                dest_dir,
+                app_data_path() / 'download_state.json',
+                connections=download_settings.get('connections', DEFAULT_CONNECTIONS),
+                cancel_token=token,
+                # 피어는 빨리 포기하고 다음 출처로
+                max_retries=DEFAULT_RETRIES if base_url == mirror_url else PEER_RETRIES,
+                scheduler=self.io_scheduler,
+                stats=self.transfer_stats,
+                pause_token=self._pause_token,
+                **kwargs
+            )
+            result = downloader.download(remaining)
+            combined.completed.extend(result.completed)
+            combined.verified.extend(result.verified)
+            combined.bytes_downloaded += result.bytes_downloaded
+            combined.elapsed += result.elapsed
+            combined.failed = result.failed
+            if result.cancelled:
+                combined.cancelled = True
+                break
+            remaining = [item for item in remaining if item.relative_path in result.failed]
+            if not remaining:
+                break
+            self.logger.info(f"{base_url}에서 받지 못한 파일 {len(remaining)}개는 다음 출처에서 받습니다")
+        return combined
+
+    def _run_download(self, game_path: Path, items: List[DownloadItem], manifest: Manifest,
+                      token: CancellationToken):
+        try:
+            result = self._download_from_sources(
+                game_path, items, manifest, token,
+                segment_size=self.settings.get('download', {}).get('segment_size_mb', 16) * 1024 * 1024,
+                on_file_complete=lambda relative_path, file_path, verified:
+                    self._on_file_downloaded(manifest, relative_path, file_path, verified)
+            )
+        except Exception as e:
+            self.logger.error(f"클라이언트 다운로드 오류: {e}")
+            self.signals.download_error.emit(str(e))
+            return
+        finally:
+            if self._download_token is token:
+                self._download_token = None
+
+        if result.cancelled:
+            return
+        if not result.ok:
+            self.signals.download_error.emit(result.message())
+            return
+        if self._all_files_cached(game_path, manifest):
+            # 새로 설치: 모든 파일을 받으면서 검증했으므로 전체 검증을 마친 것과 같음
+            self.verification_cache.record_full_verify(manifest.version)
+            if self.lan_peer:
+                self.lan_peer.share(game_path / 'Data', manifest)
+        self.logger.info(
+            f"{len(result.completed)}개 파일 다운로드 완료 "
+            f"({result.bytes_downloaded / max(result.elapsed, 0.001) / 1024 / 1024:.1f} MiB/s)"
+        )
+        self.background_verifier.invalidate()
+        self.signals.download_finished.emit()
+
+    def repair_data_files(self, report: VerificationReport) -> VerificationReport:
+        """검사에서 실패한 파일(블록 해시가 있으면 손상된 블록)만 다시 받고 그 파일만 재검사
+
+        임시 파일(.part)에 기록한 뒤 원래 파일과 원자적으로 교체합니다.
+        """
+        mirror_url = self.settings.get('download', {}).get('mirror_url')
+        if not mirror_url and not self.lan_peer:
+            return VerificationReport.from_error("", "다운로드 미러 주소가 설정되지 않았습니다")
+        try:
+            manifest = load_manifest(resource_path("config/manifest.json"))
+        except Exception as e:
+            return VerificationReport.from_error("manifest.json", f"Error reading manifest file: {e}")
+
+        data_path = self.game_path / "Data"
+        restored = self._materialize_from_store(data_path, manifest, [f.relative_path for f in report.failures])
+        token = self._download_token = CancellationToken()
+        self._pause_token.resume()
+        self.transfer_stats.reset()
+        try:
+            # 델타는 미러에만 있음
+            patched = self._apply_patches(report, manifest, mirror_url, token, exclude=restored) if mirror_url else []
+            if patched is None:
+                return VerificationReport(complete=False, cancelled=True)
+            patched = restored + patched
+            items = plan_repair(report, manifest, data_path, exclude=patched)
+            plan = plan_space(self._space_needs(self.game_path, items))
+            if not plan.ok:
+                return VerificationReport.from_error("", plan.message())
+            result = self._download_from_sources(self.game_path, items, manifest, token)
+        finally:
+            if self._download_token is token:
+                self._download_token = None
+        if result.cancelled:
+            return VerificationReport(complete=False, cancelled=True)
+        self.logger.info(
+            f"복구: {len(result.completed)}개 파일, {result.bytes_downloaded}바이트 다운로드"
+        )
+
+        # 복구한 파일만 다시 검사 (수정 시간이 바뀌었으므로 전체 해시, 패치한 파일은 캐시로 확인)
+        repaired = patched + [path.split('/', 1)[1] for path in result.completed]
+        verifier = FileVerifier(data_path, subset_manifest(manifest, repaired), cache=self.verification_cache)
+        recheck = verifier.scan()
+        for relative_path, error in result.failed.items():
+            recheck.add(FileCheckResult(relative_path.split('/', 1)[1], False, error, kind=READ_ERROR))
+        self.background_verifier.invalidate()
+        return recheck
+
+    def _apply_patches(self, report: VerificationReport, manifest: Manifest,
+                       mirror_url: str, token: CancellationToken, exclude=()) -> Optional[List[str]]:
+        """미러에 델타가 있는 실패 파일은 이전 파일 + 델타로 새 파일을 만듭니다
+
+        델타를 적용한 결과가 새 매니페스트 해시와 같을 때만 원래 파일과 교체하고,
+        실패한 파일은 일반 복구(다시 받기)로 넘어갑니다. 패치한 파일 목록을
+        반환하며 취소되면 None.
+        """
+        index = fetch_patch_index(mirror_url)
+        if not index:
+            return []
+        data_path = self.game_path / "Data"
+        patches = {}
+        for failure in report.failures:
+            file_info = manifest.files.get(failure.relative_path)
+            if not file_info or failure.relative_path in exclude:
+                continue
+            file_path = data_path / failure.relative_path.replace('/', os.sep)
+            entry = find_patch(index, failure.relative_path, file_path, file_info["hash"], manifest.algorithm)
+            if entry:
+                patches[failure.relative_path] = entry
+        if not patches:
+            return []
+
+        patch_path = app_data_path() / 'patches'
+        # 델타는 앱 데이터 폴더에, 새 파일은 한 번에 하나씩 Data 폴더에 만듦
+        plan = plan_space([
+            (patch_path, sum(entry["delta_size"] for entry in patches.values())),
+            (data_path, max(manifest.files[p]["size"] for p in patches)),
+        ])
+        if not plan.ok:
+            self.logger.warning(f"패치를 적용할 공간이 부족합니다: {plan.message()}")
+            return []
+        download_settings = self.settings.get('download', {})
+        downloader = HttpDownloader(
+            urllib.parse.urljoin(mirror_url.rstrip('/') + '/', PATCH_DIR),
+            patch_path,
+            app_data_path() / 'patch_state.json',
+            connections=download_settings.get('connections', DEFAULT_CONNECTIONS),
+            cancel_token=token,
+            scheduler=self.io_scheduler,
+            stats=self.transfer_stats,
+            pause_token=self._pause_token
+        )
+        result = downloader.download([
+            DownloadItem(entry["delta"], entry["delta_size"], hash=entry["delta_hash"],
+                         algorithm=manifest.algorithm)
+            for entry in patches.values()
+        ])
+        if result.cancelled:
+            return None
+
+        patched = []
+        self.transfer_stats.begin(sum(
+            manifest.files[p]["size"] for p, entry in patches.items() if entry["delta"] in result.completed
+        ))
+        for relative_path, entry in patches.items():
+            if entry["delta"] not in result.completed:
+                continue
+            self.transfer_stats.add(0, f"패치 적용: {relative_path}")
+            file_path = data_path / relative_path.replace('/', os.sep)
+            temp_path = file_path.with_name(file_path.name + '.patch')
+            delta_path = patch_path / entry["delta"].replace('/', os.sep)
+            file_hash = manifest.files[relative_path]["hash"]
+            try:
+                apply_delta(file_path, delta_path, temp_path, expected_hash=file_hash,
+                            on_chunk=self.transfer_stats.add)
+                os.replace(temp_path, file_path)
+                self.verification_cache.record(file_path, file_path.stat(), file_hash, manifest.version)
+                self.share_verified_files(data_path, manifest, [relative_path])
+                patched.append(relative_path)
+            except (OSError, DeltaError) as e:
+                self.logger.warning(f"패치 적용 실패, 전체 파일을 다시 받습니다 ({relative_path}): {e}")
+                temp_path.unlink(missing_ok=True)
+            finally:
+                delta_path.unlink(missing_ok=True)
+        if patched:
+            saved = sum(manifest.files[p]["size"] - patches[p]["delta_size"] for p in patched)
+            self.logger.info(f"패치: {len(patched)}개 파일, 전체 다운로드 대비 {saved}바이트 절약")
+        return patched
+
+    def start_repair(self, report: VerificationReport):
+        """백그라운드에서 복구를 실행하고 repair_finished 시그널로 결과 전달"""
+        def run():
+            try:
+                recheck = self.repair_data_files(report)
+                self.signals.repair_finished.emit(recheck.ok, recheck.message())
+            except Exception as e:
+                self.logger.error(f"복구 오류: {e}")
+                self.signals.repair_finished.emit(False, str(e))
+
+        threading.Thread(target=run, name="repair", daemon=True).start()
+
+    @property
+    def download_paused(self) -> bool:
+        return self._pause_token.paused
+
+    def pause_download(self):
+        """다운로드/복구 일시정지. HTTP는 연결을 닫고 받은 위치에서 기다림"""
+        if self.torrent_manager:
+            self._pause_token.pause()
+            self.torrent_manager.loop.call_soon_threadsafe(self.torrent_manager.pause)
+        elif self._download_token:
+            self._pause_token.pause()
+
+    def resume_download(self):
+        """일시정지한 다운로드/복구를 같은 작업 안에서 계속"""
+        if not self._pause_token.paused:
+            return
+        self._pause_token.resume()
+        torrent_manager = self.torrent_manager
+        if torrent_manager:
+            torrent_manager.loop.call_soon_threadsafe(torrent_manager.resume)
+
+    def cancel_download(self):
+        """다운로드 중단. 받은 부분은 다음 다운로드에서 이어받음"""
+        torrent_manager, self.torrent_manager = self.torrent_manager, None
+        if torrent_manager:
+            torrent_manager.loop.call_soon_threadsafe(torrent_manager.cancel)
+        token = self._download_token
+        if token:
+            token.cancel()
+        # 일시정지 중인 작업자가 취소를 확인하도록 깨움
+        self._pause_token.resume()
@@ -0,0 +1,149 @@
+import os
+import hashlib
+import threading
+from pathlib import Path
+from typing import Callable, Iterator, List, Optional, Tuple
+
+# 한 번에 읽는 크기. 4096바이트 단위로 읽던 기존 루프보다 시스템 호출이 256배 적음
+DEFAULT_BUFFER_SIZE = 1024 * 1024
+
+# Windows: FILE_FLAG_SEQUENTIAL_SCAN 으로 열어 미리 읽기 힌트 제공
+_OPEN_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0) | getattr(os, 'O_SEQUENTIAL', 0)
+
+_local = threading.local()
+
+
+def _buffer(size: int) -> memoryview:
+    """스레드마다 한 번만 할당해서 재사용하는 읽기 버퍼"""
+    buffer = getattr(_local, 'buffer', None)
+    if buffer is None or len(buffer) < size:
+        buffer = memoryview(bytearray(size))
+        _local.buffer = buffer
+    return buffer[:size]
+
+
+def _advise_sequential(fd: int, offset: int, length: int):
+    """Linux: posix_fadvise로 순차 읽기임을 커널에 알림"""
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            os.posix_fadvise(fd, offset, length, os.POSIX_FADV_SEQUENTIAL)
+        except OSError:
+            pass
+
+
+def iter_file_chunks(file_path: Path, start: int = 0, length: Optional[int] = None,
+                     buffer_size: int = DEFAULT_BUFFER_SIZE) -> Iterator[memoryview]:
+    """파일 구간을 재사용 버퍼로 읽어 memoryview로 돌려줍니다
+
+    반환된 view는 다음 반복에서 덮어쓰이므로 바로 소비해야 합니다.
+    """
+    buffer = _buffer(buffer_size)
+    fd = os.open(str(file_path), _OPEN_FLAGS)
+    with open(fd, 'rb', buffering=0) as f:
+        _advise_sequential(fd, start, length or 0)
+        if start:
+            f.seek(start)
+        remaining = length
+        while remaining is None or remaining > 0:
+            view = buffer if remaining is None or remaining >= buffer_size else buffer[:remaining]
+            n = f.readinto(view)
+            if not n:
+                break
+            if remaining is not None:
+                remaining -= n
+            yield view[:n]
+
+
+def hash_file(file_path: Path, algorithm: str = 'sha256', start: int = 0, length: Optional[int] = None,
+              stop_check: Optional[Callable[[], None]] = None,
+              on_chunk: Optional[Callable[[int], None]] = None,
+              buffer_size: int = DEFAULT_BUFFER_SIZE) -> Tuple[str, int]:
+    """파일(또는 구간)의 해시와 읽은 바이트 수를 반환합니다
+
+    stop_check는 청크마다 호출되며 예외를 던져 작업을 중단할 수 있습니다.
+    """
+    hasher = hashlib.new(algorithm)
+    bytes_read = 0
+    for chunk in iter_file_chunks(file_path, start, length, buffer_size):
+        if stop_check:
+            stop_check()
+        hasher.update(chunk)
+        bytes_read += len(chunk)
+        if on_chunk:
+            on_chunk(len(chunk))
+    return hasher.hexdigest(), bytes_read
+
+
+def hash_blocks(file_path: Path, block_size: int, start: int = 0, length: Optional[int] = None,
+                algorithm: str = 'sha256', file_hasher=None,
+                stop_check: Optional[Callable[[], None]] = None,
+                on_chunk: Optional[Callable[[int], None]] = None,
+                buffer_size: int = DEFAULT_BUFFER_SIZE) -> Tuple[List[bytes], int]:
+    """start(블록 경계)부터 block_size 단위 해시 목록을 계산합니다
+
+    file_hasher를 넘기면 같은 읽기로 파일 전체 해시도 함께 갱신합니다.
+    """
+    digests = []
+    bytes_read = 0
+    block_hasher = hashlib.new(algorithm)
+    block_filled = 0
+    for chunk in iter_file_chunks(file_path, start, length, buffer_size):
+        if stop_check:
+            stop_check()
+        if file_hasher is not None:
+            file_hasher.update(chunk)
+        offset = 0
+        while offset < len(chunk):
+            take = min(block_size - block_filled, len(chunk) - offset)
+            block_hasher.update(chunk[offset:offset + take])
+            block_filled += take
+            offset += take
+            if block_filled == block_size:
+                digests.append(block_hasher.digest())
+                block_hasher = hashlib.new(algorithm)
+                block_filled = 0
+        bytes_read += len(chunk)
+        if on_chunk:
+            on_chunk(len(chunk))
+    if block_filled:
+        digests.append(block_hasher.digest())
+    return digests, bytes_read
+
+
+class BlockHasher:
+    """순서대로 들어오는 바이트를 block_size 단위로 해시하는 스트림 해시
+
+    파일을 읽지 않고 다운로드하면서 기록하는 데이터를 그대로 넣어 블록 해시를
+    계산할 때 사용합니다. position은 파일 안에서 다음에 들어올 바이트의 위치
+    (블록 경계)이고, 마지막 블록은 file_size에서 끝납니다.
+    """
+
+    def __init__(self, block_size: int, file_size: int, algorithm: str = 'sha256', position: int = 0):
+        self.block_size = block_size
+        self.file_size = file_size
+        self.algorithm = algorithm
+        self.position = position
+        self._hasher = hashlib.new(algorithm)
+        self._completed: List[Tuple[int, str]] = []
+
+    def reset(self, position: int = 0):
+        self.position = position
+        self._hasher = hashlib.new(self.algorithm)
+        self._completed.clear()
+
+    def update(self, data: memoryview):
+        offset = 0
+        while offset < len(data):
+            block_end = min((self.position // self.block_size + 1) * self.block_size, self.file_size)
+            take = min(block_end - self.position, len(data) - offset)
+            self._hasher.update(data[offset:offset + take])
+            self.position += take
+            offset += take
+            if self.position == block_end:
+                self._completed.append(((block_end - 1) // self.block_size, self._hasher.hexdigest()))
+                self._hasher = hashlib.new(self.algorithm)
+
+    def pop_completed(self) -> List[Tuple[int, str]]:
+        """지난 호출 이후 완성된 (블록 번호, 해시) 목록"""
+        completed, self._completed = self._completed, []
+        return completed
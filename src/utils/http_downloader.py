@@ -0,0 +1,563 @@
+import os
+import json
+import shutil
+import time
+import logging
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.disk_space import preallocate
+from utils.hashing import BlockHasher, iter_file_chunks
+from utils.io_scheduler import DISK, NETWORK, PRIORITY_FOREGROUND, IOScheduler
+from utils.progress import ByteProgress, CancellationToken, OperationCancelled, PauseToken, TransferStats
+
+DEFAULT_CONNECTIONS = 4
+# 한 Range 요청이 받는 구간 크기
+DEFAULT_SEGMENT_SIZE = 16 * 1024 * 1024  # 16 MiB
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_RETRIES = 5
+CHUNK_SIZE = 256 * 1024
+PART_SUFFIX = ".part"
+# 이어받기 상태 저장 최소 간격 (초)
+STATE_SAVE_INTERVAL = 1.0
+STATE_VERSION = 2
+
+
+class DownloadError(Exception):
+    """재시도로 해결할 수 없는 다운로드 오류"""
+
+
+@dataclass
+class DownloadItem:
+    relative_path: str  # dest_dir 기준 경로 (예: "Data/common.MPQ")
+    size: int
+    url: str = ""  # 비어 있으면 base_url + relative_path
+    # 매니페스트 해시: 받으면서 계산해 비교 (없으면 검증 안 함)
+    hash: str = ""
+    algorithm: str = "sha256"
+    block_size: int = 0
+    blocks: Optional[List[str]] = None
+    # 복구: base_path를 복사한 뒤 ranges에 걸친 블록만 다시 받음 (블록 해시 필요)
+    ranges: Optional[List[Tuple[int, int]]] = None
+    base_path: Optional[Path] = None
+
+    @property
+    def expected_digests(self) -> List[str]:
+        """해시 단위별 기대값 (블록 해시가 없으면 파일 전체 해시 하나)"""
+        return self.blocks if self.blocks else [self.hash]
+
+    @property
+    def hash_block_size(self) -> int:
+        if self.blocks and self.block_size:
+            return self.block_size
+        return self.size if self.hash else 0
+
+
+@dataclass
+class DownloadResult:
+    completed: List[str] = field(default_factory=list)
+    verified: List[str] = field(default_factory=list)  # 받으면서 매니페스트 해시와 일치한 파일
+    failed: Dict[str, str] = field(default_factory=dict)
+    bytes_downloaded: int = 0
+    elapsed: float = 0.0
+    cancelled: bool = False
+
+    @property
+    def ok(self) -> bool:
+        return not self.cancelled and not self.failed
+
+    def message(self) -> str:
+        if self.failed:
+            lines = [f"{len(self.failed)} files could not be downloaded:"]
+            lines.extend(f"- {path}: {error}" for path, error in sorted(self.failed.items()))
+            return "\n".join(lines)
+        if self.cancelled:
+            return "Download was cancelled."
+        return f"Downloaded {len(self.completed)} files."
+
+
+@dataclass
+class _FileEntry:
+    """파일 하나의 이어받기 상태 (구간마다 받은 바이트 수)"""
+    url: str
+    size: int
+    segment_size: int
+    validator: str = ""  # ETag 또는 Last-Modified
+    done: List[int] = field(default_factory=list)
+    hash_block_size: int = 0  # 0이면 해시하지 않음
+    algorithm: str = "sha256"
+    digests: List[str] = field(default_factory=list)  # 해시 단위별로 받으면서 계산한 해시
+
+    def hash_blocks_in(self, start: int, end: int) -> range:
+        """구간에 포함된 해시 블록 번호"""
+        if not self.hash_block_size or end <= start:
+            return range(0)
+        return range(start // self.hash_block_size, (end - 1) // self.hash_block_size + 1)
+
+    @property
+    def segments(self) -> List[Tuple[int, int, int]]:
+        """(구간 번호, 시작, 끝) 목록"""
+        return [
+            (index, start, min(start + self.segment_size, self.size))
+            for index, start in enumerate(range(0, self.size, self.segment_size))
+        ]
+
+    @property
+    def bytes_done(self) -> int:
+        return sum(self.done)
+
+
+class DownloadState:
+    """런처를 다시 시작해도 이어받을 수 있도록 구간별 진행 상태를 JSON으로 저장"""
+
+    def __init__(self, state_path: Path):
+        self.state_path = Path(state_path)
+        self.logger = logging.getLogger('DownloadState')
+        self._lock = threading.Lock()
+        self._entries: Dict[str, _FileEntry] = {}
+        self._last_save = 0.0
+        self._load()
+
+    def _load(self):
+        try:
+            with open(self.state_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("version") != STATE_VERSION:
+                return
+            for relative_path, entry in data.get("files", {}).items():
+                self._entries[relative_path] = _FileEntry(**entry)
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, TypeError) as e:
+            self.logger.warning(f"다운로드 상태를 읽을 수 없어 처음부터 받습니다: {e}")
+
+    def get(self, relative_path: str) -> Optional[_FileEntry]:
+        with self._lock:
+            return self._entries.get(relative_path)
+
+    def put(self, relative_path: str, entry: _FileEntry):
+        with self._lock:
+            self._entries[relative_path] = entry
+        self.save(force=True)
+
+    def remove(self, relative_path: str):
+        with self._lock:
+            self._entries.pop(relative_path, None)
+        self.save(force=True)
+
+    def advance(self, entry: _FileEntry, index: int, n_bytes: int):
+        with self._lock:
+            entry.done[index] += n_bytes
+        self.save()
+
+    def set_digests(self, entry: _FileEntry, digests: List[Tuple[int, str]]):
+        if not digests:
+            return
+        with self._lock:
+            for block, digest in digests:
+                entry.digests[block] = digest
+        self.save()
+
+    def reset_segment(self, entry: _FileEntry, index: int, blocks: range):
+        """해시가 맞지 않는 구간을 처음부터 다시 받도록 초기화"""
+        with self._lock:
+            entry.done[index] = 0
+            for block in blocks:
+                entry.digests[block] = ""
+        self.save(force=True)
+
+    def save(self, force: bool = False):
+        with self._lock:
+            now = time.monotonic()
+            if not force and now - self._last_save < STATE_SAVE_INTERVAL:
+                return
+            self._last_save = now
+            data = {
+                "version": STATE_VERSION,
+                "files": {path: entry.__dict__ for path, entry in self._entries.items()}
+            }
+            try:
+                self.state_path.parent.mkdir(parents=True, exist_ok=True)
+                temp_path = self.state_path.with_name(self.state_path.name + ".tmp")
+                with open(temp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f)
+                os.replace(temp_path, self.state_path)
+            except OSError as e:
+                self.logger.warning(f"다운로드 상태 저장 오류: {e}")
+
+
+class HttpDownloader:
+    """HTTP 미러에서 파일을 여러 Range 요청으로 나누어 병렬로 받는 다운로더
+
+    각 파일은 segment_size 구간으로 나뉘고 connections개의 스레드가 구간을
+    나누어 받습니다. 받은 데이터는 <파일>.part에 바로 기록되고 구간별 진행
+    상태가 state_path에 저장되므로, 연결이 끊기거나 런처가 종료되어도 받은
+    부분부터 이어받습니다. 모든 구간을 받으면 .part를 원래 이름으로 바꿉니다.
+
+    DownloadItem에 매니페스트 해시가 있으면 기록하는 바이트로 블록 해시를
+    함께 계산해 구간이 끝날 때 비교하므로, 다 받은 뒤 파일을 다시 읽어
+    검증할 필요가 없습니다.
+
+    pause()하면 작업자는 받던 응답을 닫고 resume()까지 기다린 뒤 받은
+    위치부터 이어서 요청합니다 (download()는 계속 진행 중인 상태).
+    """
+
+    def __init__(self, base_url: str, dest_dir: Path, state_path: Path,
+                 connections: int = DEFAULT_CONNECTIONS,
+                 segment_size: int = DEFAULT_SEGMENT_SIZE,
+                 progress_callback: Optional[Callable[[float, str, float, float], None]] = None,
+                 cancel_token: Optional[CancellationToken] = None,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 max_retries: int = DEFAULT_RETRIES,
+                 on_file_complete: Optional[Callable[[str, Path, bool], None]] = None,
+                 scheduler: Optional[IOScheduler] = None,
+                 priority: int = PRIORITY_FOREGROUND,
+                 stats: Optional[TransferStats] = None,
+                 pause_token: Optional[PauseToken] = None):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.dest_dir = Path(dest_dir)
+        self.state = DownloadState(state_path)
+        self.connections = max(1, connections)
+        self.segment_size = max(CHUNK_SIZE, segment_size)
+        self.progress_callback = progress_callback
+        self.cancel_token = cancel_token or CancellationToken()
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.on_file_complete = on_file_complete
+        self.scheduler = scheduler
+        self.priority = priority
+        self.stats = stats
+        self.pause_token = pause_token or PauseToken()
+        self.logger = logging.getLogger('HttpDownloader')
+        self._progress: Optional[ByteProgress] = None
+        self._downloaded = 0
+        self._lock = threading.Lock()
+
+    def _url_for(self, item: DownloadItem) -> str:
+        return item.url or urllib.parse.urljoin(self.base_url, urllib.parse.quote(item.relative_path))
+
+    def _dest_path(self, relative_path: str) -> Path:
+        return self.dest_dir / relative_path.replace('/', os.sep)
+
+    def _part_path(self, relative_path: str) -> Path:
+        path = self._dest_path(relative_path)
+        return path.with_name(path.name + PART_SUFFIX)
+
+    def _open(self, url: str, headers: Dict[str, str]):
+        request = urllib.request.Request(url, headers=headers)
+        return urllib.request.urlopen(request, timeout=self.timeout)
+
+    @staticmethod
+    def _validator(response) -> str:
+        return response.headers.get("ETag") or response.headers.get("Last-Modified") or ""
+
+    # --- 준비 ---
+
+    def _probe(self, url: str) -> Tuple[bool, str]:
+        """(Range 지원 여부, 검증자) 확인"""
+        with self._open(url, {"Range": "bytes=0-0"}) as response:
+            return response.status == 206, self._validator(response)
+
+    def _prepare(self, item: DownloadItem) -> _FileEntry:
+        """이어받을 수 있는 상태를 찾거나 새 .part 파일을 만듭니다"""
+        url = self._url_for(item)
+        part_path = self._part_path(item.relative_path)
+        entry = self.state.get(item.relative_path)
+        segment_size = self.segment_size
+        hash_block_size = item.hash_block_size
+        repair = bool(item.ranges is not None and item.blocks and item.base_path and Path(item.base_path).exists())
+        if repair:
+            # 손상된 블록만 받도록 블록 하나가 한 구간
+            segment_size = hash_block_size
+        elif hash_block_size:
+            # 구간이 해시 블록 경계에서 나뉘어야 스레드마다 순서대로 해시할 수 있음
+            # (블록 해시가 없으면 파일 전체가 한 블록이므로 한 연결로 받음)
+            segment_size = max(hash_block_size, segment_size // hash_block_size * hash_block_size)
+
+        ranges_supported, validator = True, ""
+        if item.size > segment_size:
+            # 여러 구간으로 나눌 파일만 미리 확인 (작은 파일은 요청 하나로 충분)
+            ranges_supported, validator = self._probe(url)
+            if not ranges_supported:
+                self.logger.info(f"Range 요청을 지원하지 않아 한 연결로 받습니다: {item.relative_path}")
+                segment_size = max(item.size, 1)
+                repair = False
+
+        resumable = (
+            entry is not None
+            and entry.size == item.size
+            and entry.segment_size == segment_size
+            and entry.hash_block_size == hash_block_size
+            and (
+                (entry.url == url and (not validator or entry.validator == validator))
+                or self._same_content(item, entry)
+            )
+            and part_path.exists()
+            and part_path.stat().st_size == item.size
+        )
+        if resumable:
+            if entry.url != url:
+                # 다른 출처(LAN 피어 ↔ 미러)에서 이어받기: 받은 블록은 매니페스트 해시로 확인됨
+                entry.url, entry.validator = url, validator
+            return entry
+
+        if entry is not None:
+            self.logger.info(f"미러 파일이 바뀌었거나 상태가 맞지 않아 처음부터 받습니다: {item.relative_path}")
+        entry = _FileEntry(url, item.size, segment_size, validator,
+                           hash_block_size=hash_block_size, algorithm=item.algorithm)
+        entry.done = [0] * len(entry.segments)
+        entry.digests = [""] * len(entry.hash_blocks_in(0, item.size))
+        part_path.parent.mkdir(parents=True, exist_ok=True)
+        if repair:
+            # 기존 파일의 정상 블록은 그대로 쓰고 손상 범위에 걸친 블록만 받음
+            shutil.copyfile(item.base_path, part_path)
+            expected = item.expected_digests
+            for index, start, end in entry.segments:
+                if not any(start < bad_end and bad_start < end for bad_start, bad_end in item.ranges):
+                    entry.done[index] = end - start
+                    for block in entry.hash_blocks_in(start, end):
+                        entry.digests[block] = expected[block]
+        with open(part_path, "r+b" if repair else "wb") as f:
+            # 전체 크기를 미리 할당해 조각화를 줄이고 공간 부족은 여기서 바로 실패
+            # (구간을 병렬로 받으면 뒤쪽부터 기록하므로 Windows에서는 sparse로 크기만 맞춤)
+            preallocate(f.fileno(), item.size, out_of_order=len(entry.segments) > 1)
+        self.state.put(item.relative_path, entry)
+        return entry
+
+    @staticmethod
+    def _same_content(item: DownloadItem, entry: _FileEntry) -> bool:
+        """출처가 달라도 매니페스트 블록 해시가 같은 파일이면 받은 부분을 그대로 사용"""
+        expected = item.expected_digests
+        return (
+            bool(entry.hash_block_size) and bool(item.hash)
+            and len(entry.digests) == len(expected)
+            and all(not digest or digest == expected[i] for i, digest in enumerate(entry.digests))
+        )
+
+    # --- 받으면서 해시 ---
+
+    def _resume_hasher(self, relative_path: str, entry: _FileEntry, index: int,
+                       start: int, end: int) -> Optional[BlockHasher]:
+        """구간에서 아직 해시가 없는 첫 블록부터 이어서 해시할 준비
+
+        이미 받은 부분 중 해시가 저장되지 않은 블록 앞부분만 디스크에서 다시
+        읽습니다 (중단 없이 받은 경우에는 읽지 않음).
+        """
+        missing = [b for b in entry.hash_blocks_in(start, end) if not entry.digests[b]]
+        if not missing:
+            return None
+        hasher = BlockHasher(entry.hash_block_size, entry.size, entry.algorithm,
+                             position=missing[0] * entry.hash_block_size)
+        offset = start + entry.done[index]
+        if offset > hasher.position:
+            for chunk in iter_file_chunks(self._part_path(relative_path), hasher.position, offset - hasher.position):
+                self.cancel_token.raise_if_cancelled()
+                hasher.update(chunk)
+            self.state.set_digests(entry, hasher.pop_completed())
+        return hasher
+
+    def _segment_matches(self, item: DownloadItem, entry: _FileEntry, start: int, end: int) -> bool:
+        """구간의 모든 블록 해시가 매니페스트와 같은지 (해시가 없는 파일은 항상 True)"""
+        expected = item.expected_digests
+        return all(entry.digests[b] == expected[b] for b in entry.hash_blocks_in(start, end))
+
+    # --- 구간 다운로드 ---
+
+    def _download_segment(self, item: DownloadItem, entry: _FileEntry, index: int, start: int, end: int):
+        relative_path = item.relative_path
+        mismatches = 0
+        while True:
+            hasher = self._resume_hasher(relative_path, entry, index, start, end)
+            attempt = 0
+            while start + entry.done[index] < end:
+                self.pause_token.wait(self.cancel_token)
+                offset = start + entry.done[index]
+                try:
+                    self._fetch_range(relative_path, entry, index, offset, end, hasher)
+                    attempt = 0
+                except urllib.error.HTTPError as e:
+                    if e.code < 500 and e.code not in (408, 429):
+                        raise DownloadError(f"HTTP {e.code} {e.reason}")
+                    attempt = self._backoff(relative_path, attempt, e, entry.done[index], offset - start)
+                except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                    attempt = self._backoff(relative_path, attempt, e, entry.done[index], offset - start)
+
+            if self._segment_matches(item, entry, start, end):
+                return
+            # 전송 중 손상: 이 구간만 다시 받음
+            mismatches += 1
+            # 다음 시도(또는 다음 실행)에서 이 구간을 완료된 것으로 보지 않도록 먼저 초기화
+            self.state.reset_segment(entry, index, entry.hash_blocks_in(start, end))
+            if mismatches > self.max_retries:
+                raise DownloadError("Downloaded data does not match the manifest hash")
+            self.logger.warning(f"{relative_path} 구간 {index} 해시 불일치, 다시 받습니다 ({mismatches}/{self.max_retries})")
+
+    def _backoff(self, relative_path: str, attempt: int, error: Exception, done_now: int, done_before: int) -> int:
+        """재시도 대기. 이번 시도에서 받은 데이터가 있으면 재시도 횟수를 초기화"""
+        self.cancel_token.raise_if_cancelled()
+        attempt = 1 if done_now > done_before else attempt + 1
+        if attempt > self.max_retries:
+            raise DownloadError(str(error))
+        self.logger.warning(f"{relative_path} 연결 오류, 다시 시도합니다 ({attempt}/{self.max_retries}): {error}")
+        if self.cancel_token.wait(min(2 ** attempt, 30)):
+            raise OperationCancelled()
+        return attempt
+
+    def _fetch_range(self, relative_path: str, entry: _FileEntry, index: int, offset: int, end: int,
+                     hasher: Optional[BlockHasher]):
+        headers = {"Range": f"bytes={offset}-{end - 1}"}
+        if entry.validator:
+            # 미러 파일이 바뀌었으면 206 대신 200 전체 응답이 옴
+            headers["If-Range"] = entry.validator
+
+        with self._open(entry.url, headers) as response:
+            if response.status == 200:
+                if len(entry.segments) > 1:
+                    raise DownloadError("File changed on the mirror during download")
+                # 한 구간짜리 파일은 처음부터 다시 기록
+                self.state.reset_segment(entry, index, entry.hash_blocks_in(0, entry.size))
+                offset = 0
+                if hasher:
+                    hasher.reset(0)
+            elif response.status == 206:
+                content_range = response.headers.get("Content-Range", "")
+                if not content_range.startswith(f"bytes {offset}-"):
+                    raise DownloadError(f"Unexpected Content-Range: {content_range}")
+            else:
+                raise DownloadError(f"Unexpected HTTP status {response.status}")
+            if not entry.validator:
+                entry.validator = self._validator(response)
+
+            buffer = bytearray(CHUNK_SIZE)
+            view = memoryview(buffer)
+            # 버퍼 없이 기록해야 저장된 상태가 실제로 기록된 데이터와 일치
+            with open(self._part_path(relative_path), "r+b", buffering=0) as f:
+                f.seek(offset)
+                position = offset
+                while position < end:
+                    self.cancel_token.raise_if_cancelled()
+                    if self.pause_token.paused:
+                        break  # 연결을 닫고 _download_segment에서 다시 시작할 때까지 대기
+                    n_bytes = response.readinto(view[:min(CHUNK_SIZE, end - position)])
+                    if not n_bytes:
+                        break  # 연결이 끊김: 남은 부분은 재시도
+                    if self.scheduler:
+                        self.scheduler.acquire(NETWORK, n_bytes, self.priority, self.cancel_token)
+                        self.scheduler.acquire(DISK, n_bytes, self.priority, self.cancel_token)
+                    f.write(view[:n_bytes])
+                    position += n_bytes
+                    self.state.advance(entry, index, n_bytes)
+                    if hasher:
+                        hasher.update(view[:n_bytes])
+                        self.state.set_digests(entry, hasher.pop_completed())
+                    with self._lock:
+                        self._downloaded += n_bytes
+                    if self._progress:
+                        self._progress.advance(n_bytes, relative_path)
+
+    # --- 완료 처리 ---
+
+    def _finish_file(self, relative_path: str, verified: bool):
+        dest_path = self._dest_path(relative_path)
+        os.replace(self._part_path(relative_path), dest_path)
+        self.state.remove(relative_path)
+        if self.on_file_complete:
+            self.on_file_complete(relative_path, dest_path, verified)
+
+    def download(self, items: List[DownloadItem]) -> DownloadResult:
+        """모든 파일을 받습니다. 취소되면 진행 상태를 저장하고 cancelled 결과 반환"""
+        result = DownloadResult()
+        started = time.monotonic()
+        self._downloaded = 0
+
+        entries: Dict[str, _FileEntry] = {}
+        by_path = {item.relative_path: item for item in items}
+        for item in items:
+            try:
+                self.cancel_token.raise_if_cancelled()
+                entries[item.relative_path] = self._prepare(item)
+            except OperationCancelled:
+                result.cancelled = True
+                return result
+            except (urllib.error.URLError, http.client.HTTPException, OSError) as e:
+                result.failed[item.relative_path] = str(e)
+
+        total = sum(entry.size for entry in entries.values())
+        done = sum(entry.bytes_done for entry in entries.values())
+        self._progress = ByteProgress(total, self.progress_callback, done_bytes=done, stats=self.stats)
+
+        remaining: Dict[str, int] = {}
+        with ThreadPoolExecutor(max_workers=self.connections, thread_name_prefix="download") as executor:
+            futures = {}
+            # 파일 순서대로 구간을 넣어 앞쪽 파일부터 완성되도록
+            for relative_path, entry in entries.items():
+                segments = [
+                    (index, start, end) for index, start, end in entry.segments
+                    if entry.done[index] < end - start
+                    or not self._segment_matches(by_path[relative_path], entry, start, end)
+                ]
+                remaining[relative_path] = len(segments)
+                for index, start, end in segments:
+                    future = executor.submit(self._download_segment, by_path[relative_path], entry, index, start, end)
+                    futures[future] = relative_path
+
+            # 이미 모두 받았지만 이름을 바꾸기 전에 종료된 파일
+            for relative_path in [p for p, count in remaining.items() if not count]:
+                self._complete(by_path[relative_path], entries[relative_path], result)
+
+            for future in as_completed(futures):
+                relative_path = futures[future]
+                try:
+                    future.result()
+                except OperationCancelled:
+                    result.cancelled = True
+                    continue
+                except Exception as e:
+                    if relative_path not in result.failed:
+                        self.logger.error(f"다운로드 실패: {relative_path} ({e})")
+                        result.failed[relative_path] = str(e)
+                    continue
+
+                remaining[relative_path] -= 1
+                if not remaining[relative_path] and relative_path not in result.failed:
+                    self._complete(by_path[relative_path], entries[relative_path], result)
+
+        self.state.save(force=True)
+        if not result.cancelled:
+            self._progress.finish()
+        self._progress = None
+        result.bytes_downloaded = self._downloaded
+        result.elapsed = time.monotonic() - started
+        return result
+
+    def _complete(self, item: DownloadItem, entry: _FileEntry, result: DownloadResult):
+        # 모든 구간이 매니페스트 해시와 일치했으면 다시 읽지 않고 검증된 파일로 취급
+        relative_path = item.relative_path
+        if entry.hash_block_size and not self._segment_matches(item, entry, 0, entry.size):
+            result.failed[relative_path] = "Downloaded data does not match the manifest hash"
+            return
+        verified = bool(entry.hash_block_size)
+        try:
+            self._finish_file(relative_path, verified)
+            result.completed.append(relative_path)
+            if verified:
+                result.verified.append(relative_path)
+        except OSError as e:
+            result.failed[relative_path] = str(e)
+
+    def pause(self):
+        """받던 연결을 닫고 resume()까지 대기"""
+        self.pause_token.pause()
+
+    def resume(self):
+        self.pause_token.resume()
+
+    def cancel(self):
+        """진행 중인 다운로드 중단 (받은 부분은 다음 download()에서 이어받음)"""
+        self.cancel_token.cancel()
@@ -0,0 +1,267 @@
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.progress import CancellationToken
+
+# 자원 종류
+NETWORK = "network"
+DISK = "disk"
+RESOURCES = (NETWORK, DISK)
+
+# 우선순위 (작을수록 먼저)
+PRIORITY_FOREGROUND = 0  # 사용자가 시작한 복구, 다운로드, 검증
+PRIORITY_BACKGROUND = 1  # 시작 시 미리 검사
+PRIORITY_SEEDING = 2     # 다른 런처/토렌트에 파일 제공
+PRIORITIES = (PRIORITY_FOREGROUND, PRIORITY_BACKGROUND, PRIORITY_SEEDING)
+PRIORITY_NAMES = {
+    PRIORITY_FOREGROUND: "foreground",
+    PRIORITY_BACKGROUND: "background",
+    PRIORITY_SEEDING: "seeding",
+}
+
+# 제한이 있을 때 동시에 사용하는 우선순위끼리 나누는 비율
+WEIGHTS = {PRIORITY_FOREGROUND: 8, PRIORITY_BACKGROUND: 2, PRIORITY_SEEDING: 1}
+# 제한이 없을 때 더 높은 우선순위가 사용 중이면 낮은 우선순위에 허용하는 속도
+YIELD_RATES = {NETWORK: 256 * 1024, DISK: 16 * 1024 * 1024}
+# 게임 실행 중 기본 제한 (bytes/s)
+DEFAULT_PLAYING_LIMITS = {NETWORK: 1024 * 1024, DISK: 8 * 1024 * 1024}
+
+# 마지막 사용 후 이 시간(초)이 지나면 사용하지 않는 것으로 봄
+ACTIVE_WINDOW = 1.0
+# 버킷에 모아둘 수 있는 최대 토큰 (초 단위 속도)
+BURST_SECONDS = 0.5
+# 게임 실행 여부 확인 주기 (초)
+GAME_CHECK_INTERVAL = 5.0
+
+
+@dataclass
+class Allocation:
+    resource: str
+    priority: str
+    rate: float        # 허용 속도 (bytes/s), 0이면 제한 없음
+    active: bool
+    throughput: float  # 최근 실제 사용량 (bytes/s)
+
+
+class _Bucket:
+    def __init__(self):
+        self.rate = 0.0
+        self.tokens = 0.0
+        self.updated = time.monotonic()
+        self.last_used = 0.0
+        self.window_start = self.updated
+        self.window_bytes = 0
+        self.throughput = 0.0
+
+    def take(self, n_bytes: int, rate: float, now: float) -> float:
+        """n_bytes를 사용하고 기다려야 할 시간(초)을 반환 (부족분은 빚으로 남김)"""
+        if rate != self.rate:
+            self.rate = rate
+            self.tokens = min(self.tokens, rate * BURST_SECONDS)
+        if rate <= 0:
+            self.tokens = 0.0
+            self.updated = now
+            return 0.0
+        self.tokens = min(rate * BURST_SECONDS, self.tokens + (now - self.updated) * rate)
+        self.updated = now
+        self.tokens -= n_bytes
+        return -self.tokens / rate if self.tokens < 0 else 0.0
+
+    def count(self, n_bytes: int, now: float):
+        self.last_used = now
+        self.window_bytes += n_bytes
+        elapsed = now - self.window_start
+        if elapsed >= 1.0:
+            self.throughput = self.window_bytes / elapsed
+            self.window_start, self.window_bytes = now, 0
+
+
+class IOScheduler:
+    """다운로드, 검증, 파일 제공이 함께 쓰는 네트워크/디스크 속도 조정
+
+    작업자는 읽거나 받은 만큼 acquire()를 호출하고, 자원별 토큰 버킷이
+    허용하는 만큼 기다립니다. 제한이 있으면 사용 중인 우선순위끼리 WEIGHTS
+    비율로 나누고, 제한이 없으면 가장 높은 우선순위만 제한 없이 쓰고 나머지는
+    YIELD_RATES로 물러납니다. 게임이 실행 중이면 playing_limits가 추가로
+    적용됩니다. 게임 실행 여부는 start()로 시작한 스레드가 GAME_CHECK_INTERVAL마다
+    확인하므로 acquire()는 프로세스 조회를 기다리지 않습니다. 사용 중인 버킷이나
+    hold()한 전송이 없으면 확인도 쉬었다가 다시 사용할 때 바로 확인합니다. 할당이 바뀌면
+    on_change로 알립니다 (작업자 스레드 또는 확인 스레드에서 호출).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, float]] = None,
+                 playing_limits: Optional[Dict[str, float]] = None,
+                 game_running: Optional[Callable[[], bool]] = None,
+                 on_change: Optional[Callable[[List[Allocation]], None]] = None):
+        self.limits = {resource: 0.0 for resource in RESOURCES}
+        self.limits.update(limits or {})
+        self.playing_limits = dict(DEFAULT_PLAYING_LIMITS)
+        self.playing_limits.update(playing_limits or {})
+        self.game_running = game_running
+        self.on_change = on_change
+        self.logger = logging.getLogger('IOScheduler')
+        self._lock = threading.Lock()
+        self._buckets: Dict[Tuple[str, int], _Bucket] = {
+            (resource, priority): _Bucket() for resource in RESOURCES for priority in PRIORITIES
+        }
+        self._playing = False
+        self._last_state = None
+        self._holds = 0
+        self._stop = threading.Event()
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def set_limits(self, limits: Dict[str, float], playing_limits: Optional[Dict[str, float]] = None):
+        """설정 변경 시 제한 갱신 (0이면 제한 없음)"""
+        with self._lock:
+            self.limits.update(limits)
+            if playing_limits:
+                self.playing_limits.update(playing_limits)
+        self._notify_if_changed()
+
+    @property
+    def playing(self) -> bool:
+        return self._playing
+
+    def start(self):
+        """게임 실행 여부 확인 스레드 시작 (game_running이 없으면 아무것도 하지 않음)"""
+        if self.game_running is None or (self._thread and self._thread.is_alive()):
+            return
+        self._stop.clear()
+        self._wake.clear()
+        self._thread = threading.Thread(target=self._game_check_loop, name="io-game-check", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+        thread, self._thread = self._thread, None
+        if thread:
+            thread.join(timeout=2)
+
+    def hold(self):
+        """acquire()를 거치지 않는 전송 (토렌트) 동안에도 게임 실행 여부를 확인"""
+        with self._lock:
+            self._holds += 1
+        self._wake.set()
+
+    def release(self):
+        with self._lock:
+            self._holds = max(0, self._holds - 1)
+
+    def _busy(self) -> bool:
+        with self._lock:
+            if self._holds:
+                return True
+            now = time.monotonic()
+            return any(now - bucket.last_used < ACTIVE_WINDOW for bucket in self._buckets.values())
+
+    def _game_check_loop(self):
+        while not self._stop.is_set():
+            if not self._busy():
+                # 쉬는 동안에는 프로세스를 조회하지 않고 acquire()나 hold()가 깨울 때까지 대기
+                self._wake.wait()
+                self._wake.clear()
+                continue
+            self._update_game_state()
+            self._stop.wait(GAME_CHECK_INTERVAL)
+
+    def _update_game_state(self):
+        """게임 실행 여부를 확인해 저장 (확인 스레드에서만 호출)"""
+        try:
+            playing = bool(self.game_running())
+        except Exception as e:
+            self.logger.debug(f"게임 실행 여부를 확인할 수 없습니다: {e}")
+            return
+        with self._lock:
+            changed = playing != self._playing
+            self._playing = playing
+        if changed:
+            self._notify_if_changed()
+
+    def _active(self, resource: str, now: float) -> List[int]:
+        return [
+            priority for priority in PRIORITIES
+            if now - self._buckets[(resource, priority)].last_used < ACTIVE_WINDOW
+        ]
+
+    def _limit(self, resource: str) -> float:
+        limit = self.limits.get(resource, 0)
+        if self._playing:
+            playing = self.playing_limits.get(resource, 0)
+            if playing:
+                limit = min(limit, playing) if limit else playing
+        return limit
+
+    def _rate(self, resource: str, priority: int, now: float) -> float:
+        active = set(self._active(resource, now)) | {priority}
+        limit = self._limit(resource)
+        if limit:
+            return limit * WEIGHTS[priority] / sum(WEIGHTS[p] for p in active)
+        if priority == min(active):
+            return 0.0
+        return YIELD_RATES[resource]
+
+    def rate_for(self, resource: str, priority: int) -> float:
+        """우선순위가 지금 받을 수 있는 속도 (0이면 제한 없음). 직접 속도를 제한하는 토렌트용"""
+        with self._lock:
+            return self._rate(resource, priority, time.monotonic())
+
+    def acquire(self, resource: str, n_bytes: int, priority: int = PRIORITY_FOREGROUND,
+                cancel_token: Optional[CancellationToken] = None):
+        """n_bytes 사용을 기록하고 허용 속도를 넘었으면 대기. 취소되면 바로 반환"""
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._buckets[(resource, priority)]
+            was_active = now - bucket.last_used < ACTIVE_WINDOW
+            delay = bucket.take(n_bytes, self._rate(resource, priority, now), now)
+            bucket.count(n_bytes, now)
+        if not was_active:
+            self._wake.set()
+            self._notify_if_changed()
+        if delay > 0:
+            if cancel_token:
+                cancel_token.wait(delay)
+            else:
+                time.sleep(delay)
+
+    def allocations(self) -> List[Allocation]:
+        """UI와 로그용 현재 할당"""
+        with self._lock:
+            now = time.monotonic()
+            result = []
+            for (resource, priority), bucket in self._buckets.items():
+                active = now - bucket.last_used < ACTIVE_WINDOW
+                result.append(Allocation(
+                    resource=resource,
+                    priority=PRIORITY_NAMES[priority],
+                    rate=self._rate(resource, priority, now),
+                    active=active,
+                    throughput=bucket.throughput if active else 0.0
+                ))
+            return result
+
+    def describe(self) -> str:
+        """로그용 한 줄 요약"""
+        parts = []
+        for allocation in self.allocations():
+            if not allocation.active:
+                continue
+            rate = "unlimited" if not allocation.rate else f"{allocation.rate / 1024 / 1024:.1f} MiB/s"
+            parts.append(f"{allocation.resource}/{allocation.priority}={rate}")
+        suffix = " (game running)" if self._playing else ""
+        return (", ".join(parts) or "idle") + suffix
+
+    def _notify_if_changed(self):
+        """활성 우선순위나 제한이 바뀌었을 때만 로그와 on_change 호출"""
+        allocations = self.allocations()
+        state = tuple((a.resource, a.priority, a.active, a.rate) for a in allocations) + (self._playing,)
+        with self._lock:
+            if state == self._last_state:
+                return
+            self._last_state = state
+        self.logger.info(f"I/O 할당: {self.describe()}")
+        if self.on_change:
+            self.on_change(allocations)
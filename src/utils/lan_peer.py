@@ -0,0 +1,320 @@
+import os
+import json
+import time
+import uuid
+import socket
+import struct
+import logging
+import threading
+import urllib.parse
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+from utils.io_scheduler import DISK, NETWORK, PRIORITY_SEEDING, IOScheduler
+from utils.manifest import Manifest
+from utils.verification_cache import VerificationCache
+
+# 같은 네트워크의 런처끼리 알림을 주고받는 멀티캐스트 그룹 (TTL 1: 라우터를 넘지 않음)
+LAN_GROUP = "239.255.43.21"
+LAN_PORT = 37021
+SERVICE = "wowlauncher-peer"
+ANNOUNCE_INTERVAL = 5.0
+# 이 시간 동안 알림이 없으면 사라진 피어로 봄
+PEER_TIMEOUT = 15.0
+CHUNK_SIZE = 256 * 1024
+# 피어는 언제든 사라질 수 있으므로 빨리 포기하고 다음 출처(미러)로 넘어감
+PEER_RETRIES = 1
+
+
+@dataclass
+class Peer:
+    peer_id: str
+    host: str
+    port: int
+    version: str
+    last_seen: float
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}/"
+
+
+def _parse_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """'bytes=a-b' → (start, end) (end 미포함). 지원하지 않는 형식이면 None"""
+    if not header.startswith("bytes=") or "," in header:
+        return None
+    start_text, _, end_text = header[6:].partition("-")
+    try:
+        if start_text:
+            start = int(start_text)
+            end = int(end_text) + 1 if end_text else size
+        else:
+            start, end = max(0, size - int(end_text)), size
+    except ValueError:
+        return None
+    end = min(end, size)
+    if start >= end:
+        return None
+    return start, end
+
+
+class _PeerRequestHandler(BaseHTTPRequestHandler):
+    """미러와 같은 경로(/Data/...)로 검증된 파일을 제공 (Range 지원)"""
+    server_version = "WoWLauncherPeer/1"
+
+    def log_message(self, format, *args):
+        self.server.peer.logger.debug(f"{self.address_string()} {format % args}")
+
+    def do_HEAD(self):
+        self._serve(send_body=False)
+
+    def do_GET(self):
+        self._serve(send_body=True)
+
+    def _serve(self, send_body: bool):
+        peer = self.server.peer
+        path = urllib.parse.unquote(urllib.parse.urlparse(self.path).path).lstrip('/')
+        resolved = peer.resolve(path[len("Data/"):]) if path.startswith("Data/") else None
+        if resolved is None:
+            self.send_error(404)
+            return
+        file_path, size, file_hash = resolved
+
+        start, end, status = 0, size, 200
+        range_header = self.headers.get("Range")
+        if_range = self.headers.get("If-Range")
+        if range_header and (not if_range or if_range == f'"{file_hash}"'):
+            byte_range = _parse_range(range_header, size)
+            if byte_range is None:
+                self.send_response(416)
+                self.send_header("Content-Range", f"bytes */{size}")
+                self.end_headers()
+                return
+            (start, end), status = byte_range, 206
+
+        self.send_response(status)
+        self.send_header("Accept-Ranges", "bytes")
+        # 매니페스트 해시가 곧 내용이므로 강한 검증자로 사용
+        self.send_header("ETag", f'"{file_hash}"')
+        self.send_header("Content-Length", str(end - start))
+        if status == 206:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{size}")
+        self.end_headers()
+        if not send_body:
+            return
+        try:
+            with open(file_path, "rb") as f:
+                f.seek(start)
+                remaining = end - start
+                while remaining:
+                    data = f.read(min(CHUNK_SIZE, remaining))
+                    if not data:
+                        break
+                    peer.throttle(len(data))
+                    self.wfile.write(data)
+                    remaining -= len(data)
+        except (ConnectionError, OSError) as e:
+            peer.logger.debug(f"피어 전송 중단: {path} ({e})")
+
+
+class LanPeer:
+    """LAN의 다른 런처와 검증된 클라이언트 파일을 주고받기 (선택 기능)
+
+    share()로 검증된 설치를 등록하면 HTTP로 Data 파일을 제공하고 멀티캐스트로
+    주기적으로 알립니다. 다른 런처는 discover()로 같은 매니페스트 버전의
+    피어를 찾아 미러보다 먼저 사용하고, 받은 구간은 HttpDownloader가
+    매니페스트 블록 해시로 검사합니다. 검증 캐시에 기록된 그대로인 파일만
+    제공하므로 손상된 파일이 퍼지지 않습니다. 같은 PC에서 여러 런처를 띄워도
+    멀티캐스트 루프백으로 서로 찾을 수 있습니다.
+    """
+
+    def __init__(self, cache: VerificationCache, scheduler: Optional[IOScheduler] = None,
+                 port: int = 0, group: str = LAN_GROUP, discovery_port: int = LAN_PORT,
+                 peer_id: Optional[str] = None):
+        self.cache = cache
+        self.scheduler = scheduler
+        self.port = port
+        self.group = group
+        self.discovery_port = discovery_port
+        self.peer_id = peer_id or uuid.uuid4().hex
+        self.logger = logging.getLogger('LanPeer')
+        self._data_path: Optional[Path] = None
+        self._manifest: Optional[Manifest] = None
+        self._peers: Dict[str, Peer] = {}
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._changed = threading.Condition(self._lock)
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._listen_socket: Optional[socket.socket] = None
+        self._send_socket: Optional[socket.socket] = None
+        self._threads: List[threading.Thread] = []
+
+    # --- 제공 ---
+
+    @property
+    def sharing(self) -> bool:
+        return self._manifest is not None
+
+    @property
+    def server_port(self) -> int:
+        return self._server.server_address[1] if self._server else 0
+
+    def share(self, data_path: Path, manifest: Manifest):
+        """검증된 설치를 제공 대상으로 등록하고 바로 알림"""
+        changed = self._manifest is None or self._manifest.version != manifest.version
+        self._data_path, self._manifest = Path(data_path), manifest
+        if changed:
+            self.logger.info(f"LAN 피어로 파일 제공 시작 (매니페스트 {manifest.version[:12]})")
+            self._announce()
+
+    def stop_sharing(self):
+        self._manifest = None
+
+    def resolve(self, relative_path: str) -> Optional[Tuple[Path, int, str]]:
+        """제공할 수 있는 파일이면 (경로, 크기, 해시). 검증된 뒤 바뀌지 않은 파일만"""
+        manifest, data_path = self._manifest, self._data_path
+        if manifest is None or relative_path not in manifest.files:
+            return None
+        file_info = manifest.files[relative_path]
+        file_path = data_path / relative_path.replace('/', os.sep)
+        try:
+            file_stat = file_path.stat()
+        except OSError:
+            return None
+        if not self.cache.is_verified(file_path, file_stat, file_info["hash"]):
+            return None
+        return file_path, file_stat.st_size, file_info["hash"]
+
+    def throttle(self, n_bytes: int):
+        if self.scheduler:
+            self.scheduler.acquire(DISK, n_bytes, PRIORITY_SEEDING)
+            self.scheduler.acquire(NETWORK, n_bytes, PRIORITY_SEEDING)
+
+    # --- 알림 / 찾기 ---
+
+    def _message(self, kind: str) -> bytes:
+        manifest = self._manifest
+        return json.dumps({
+            "service": SERVICE,
+            "type": kind,
+            "id": self.peer_id,
+            "port": self.server_port,
+            "version": manifest.version if manifest else "",
+        }).encode()
+
+    def _send(self, kind: str):
+        if self._send_socket is None:
+            return
+        try:
+            self._send_socket.sendto(self._message(kind), (self.group, self.discovery_port))
+        except OSError as e:
+            self.logger.debug(f"LAN 알림 전송 오류: {e}")
+
+    def _announce(self):
+        if self.sharing and self._server:
+            self._send("announce")
+
+    def _announce_loop(self):
+        while not self._stop.wait(ANNOUNCE_INTERVAL):
+            self._announce()
+
+    def _listen_loop(self):
+        while not self._stop.is_set():
+            try:
+                data, (host, _) = self._listen_socket.recvfrom(4096)
+                message = json.loads(data)
+            except socket.timeout:
+                continue
+            except (OSError, ValueError):
+                if self._stop.is_set():
+                    return
+                continue
+            if message.get("service") != SERVICE or message.get("id") == self.peer_id:
+                continue
+            if message.get("type") == "query":
+                self._announce()
+            elif message.get("type") == "announce" and message.get("port"):
+                with self._changed:
+                    self._peers[message["id"]] = Peer(
+                        message["id"], host, int(message["port"]), message.get("version", ""), time.monotonic()
+                    )
+                    self._changed.notify_all()
+
+    def peers(self, version: Optional[str] = None) -> List[Peer]:
+        """최근에 알림을 보낸 피어 (version이 있으면 같은 매니페스트만). 최근 순"""
+        now = time.monotonic()
+        with self._lock:
+            for peer_id in [p for p, peer in self._peers.items() if now - peer.last_seen > PEER_TIMEOUT]:
+                del self._peers[peer_id]
+            peers = [p for p in self._peers.values() if version is None or p.version == version]
+        return sorted(peers, key=lambda p: p.last_seen, reverse=True)
+
+    def discover(self, version: Optional[str] = None, timeout: float = 1.5) -> List[Peer]:
+        """피어에게 바로 알림을 요청하고 timeout 동안 응답을 기다림"""
+        if self.peers(version):
+            return self.peers(version)
+        self._send("query")
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while not self._stop.is_set():
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._changed.wait(remaining)
+                if any(version is None or p.version == version for p in self._peers.values()):
+                    break
+        return self.peers(version)
+
+    # --- 시작 / 종료 ---
+
+    def start(self):
+        if self._threads:
+            return
+        self._stop.clear()
+        self._server = ThreadingHTTPServer(("", self.port), _PeerRequestHandler)
+        self._server.daemon_threads = True
+        self._server.peer = self
+
+        listen = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        listen.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        if hasattr(socket, "SO_REUSEPORT"):
+            try:
+                listen.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+            except OSError:
+                pass
+        listen.bind(("", self.discovery_port))
+        membership = struct.pack("4s4s", socket.inet_aton(self.group), socket.inet_aton("0.0.0.0"))
+        listen.setsockopt(socket.IPPROTO_IP, socket.IP_ADD_MEMBERSHIP, membership)
+        listen.settimeout(1.0)
+        self._listen_socket = listen
+
+        send = socket.socket(socket.AF_INET, socket.SOCK_DGRAM, socket.IPPROTO_UDP)
+        send.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_TTL, 1)
+        send.setsockopt(socket.IPPROTO_IP, socket.IP_MULTICAST_LOOP, 1)
+        self._send_socket = send
+
+        for target, name in ((self._server.serve_forever, "lan-peer-http"),
+                             (self._listen_loop, "lan-peer-listen"),
+                             (self._announce_loop, "lan-peer-announce")):
+            thread = threading.Thread(target=target, name=name, daemon=True)
+            thread.start()
+            self._threads.append(thread)
+        self.logger.info(f"LAN 피어 시작 (HTTP 포트 {self.server_port})")
+        self._announce()
+
+    def stop(self):
+        self._stop.set()
+        with self._changed:
+            self._changed.notify_all()
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+        for sock in (self._listen_socket, self._send_socket):
+            if sock:
+                sock.close()
+        self._listen_socket = self._send_socket = None
+        for thread in self._threads:
+            thread.join(timeout=2)
+        self._threads = []
@@ -0,0 +1,146 @@
+import json
+import math
+import hashlib
+import logging
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+# 블록 단위(Merkle) 매니페스트 형식
+MANIFEST_FORMAT = 2
+DEFAULT_BLOCK_SIZE = 4 * 1024 * 1024  # 4 MiB
+# format 1(평면) 매니페스트는 항상 SHA-256
+DEFAULT_ALGORITHM = "sha256"
+# 고정 길이 해시만 사용 (shake_* 등 길이를 정해야 하는 알고리즘은 hexdigest()가 동작하지 않음)
+SUPPORTED_ALGORITHMS = ("sha256", "sha1", "blake2b", "md5")
+
+logger = logging.getLogger('Manifest')
+
+
+def manifest_version(manifest_bytes: bytes) -> str:
+    """매니페스트 내용으로 버전 문자열을 만듭니다"""
+    return hashlib.sha256(manifest_bytes).hexdigest()[:16]
+
+
+def merkle_root(block_digests: List[bytes], algorithm: str = DEFAULT_ALGORITHM) -> str:
+    """블록 해시 목록으로 이진 Merkle 트리의 루트 해시를 계산합니다"""
+    if not block_digests:
+        return hashlib.new(algorithm, b"").hexdigest()
+    level = list(block_digests)
+    while len(level) > 1:
+        next_level = []
+        for i in range(0, len(level), 2):
+            if i + 1 < len(level):
+                next_level.append(hashlib.new(algorithm, level[i] + level[i + 1]).digest())
+            else:
+                # 짝이 없는 노드는 그대로 올림
+                next_level.append(level[i])
+        level = next_level
+    return level[0].hex()
+
+
+@dataclass
+class Manifest:
+    """파일 목록 매니페스트
+
+    format 1: {"경로": {"hash", "size", "mtime"}} 형태의 기존 평면 JSON
+    format 2: {"format": 2, "algorithm": "sha256", "block_size": N,
+               "files": {"경로": {..., "root", "blocks"}}}
+    """
+    files: Dict[str, dict]
+    block_size: Optional[int] = None
+    format: int = 1
+    algorithm: str = DEFAULT_ALGORITHM
+    version: str = ""
+    extra: dict = field(default_factory=dict)
+    # 블록 해시가 root/크기/파일 해시와 맞지 않아 파일 전체 해시로만 검사하는 경로
+    rejected_blocks: List[str] = field(default_factory=list)
+
+    def __len__(self):
+        return len(self.files)
+
+    def has_blocks(self, relative_path: str) -> bool:
+        return bool(self.block_size) and "blocks" in self.files[relative_path]
+
+    def block_ranges(self, relative_path: str) -> List[Tuple[int, int, int]]:
+        """(블록 번호, 시작 오프셋, 끝 오프셋) 목록"""
+        size = self.files[relative_path]["size"]
+        return [
+            (index, start, min(start + self.block_size, size))
+            for index, start in enumerate(range(0, size, self.block_size))
+        ]
+
+
+def _check_blocks(files: Dict[str, dict], block_size: int, algorithm: str) -> List[str]:
+    """블록 해시가 root, 크기, 파일 해시와 맞지 않는 항목은 블록 해시를 버리고 경로 목록 반환
+
+    버린 항목은 파일 전체 해시로만 검증하고 다운로드합니다.
+    """
+    rejected = []
+    for relative_path, file_info in files.items():
+        blocks = file_info.get("blocks")
+        if blocks is None:
+            continue
+        try:
+            valid = (
+                len(blocks) == math.ceil(file_info["size"] / block_size)
+                and ("root" not in file_info
+                     or merkle_root([bytes.fromhex(b) for b in blocks], algorithm) == file_info["root"])
+                # 블록이 하나뿐이면 블록 해시가 곧 파일 해시
+                and (len(blocks) != 1 or blocks[0] == file_info["hash"])
+            )
+        except (TypeError, ValueError):
+            valid = False
+        if not valid:
+            file_info.pop("blocks", None)
+            file_info.pop("root", None)
+            rejected.append(relative_path)
+    return rejected
+
+
+def parse_manifest(manifest_bytes: bytes) -> Manifest:
+    """JSON 매니페스트를 해석합니다 (format 1/2 모두 지원)"""
+    data = json.loads(manifest_bytes)
+    version = manifest_version(manifest_bytes)
+
+    if isinstance(data.get("format"), int) and isinstance(data.get("files"), dict):
+        if data["format"] > MANIFEST_FORMAT:
+            raise ValueError(f"Unsupported manifest format: {data['format']}")
+        if data.get("algorithm", DEFAULT_ALGORITHM) not in SUPPORTED_ALGORITHMS:
+            raise ValueError(f"Unsupported hash algorithm: {data['algorithm']}")
+        extra = {k: v for k, v in data.items() if k not in ("format", "algorithm", "block_size", "files")}
+        algorithm = data.get("algorithm", DEFAULT_ALGORITHM)
+        rejected = _check_blocks(data["files"], data["block_size"], algorithm) if data.get("block_size") else []
+        if rejected:
+            logger.warning(f"블록 해시가 맞지 않는 매니페스트 항목 {len(rejected)}개는 전체 해시로 검사합니다: "
+                           f"{', '.join(rejected[:5])}")
+        return Manifest(
+            files=data["files"],
+            block_size=data.get("block_size"),
+            format=data["format"],
+            algorithm=algorithm,
+            version=version,
+            extra=extra,
+            rejected_blocks=rejected
+        )
+
+    # 기존 평면 형식
+    return Manifest(files=data, version=version)
+
+
+def load_manifest(manifest_path: Path) -> Manifest:
+    with open(manifest_path, "rb") as f:
+        return parse_manifest(f.read())
+
+
+def build_manifest_document(files: Dict[str, dict], block_size: Optional[int] = DEFAULT_BLOCK_SIZE,
+                            algorithm: str = DEFAULT_ALGORITHM) -> dict:
+    """파일 항목으로 저장할 매니페스트 JSON 객체를 만듭니다"""
+    if not block_size and algorithm == DEFAULT_ALGORITHM:
+        return dict(files)
+    return {
+        "format": MANIFEST_FORMAT,
+        "algorithm": algorithm,
+        "block_size": block_size,
+        "files": dict(files)
+    }
@@ -0,0 +1,146 @@
+import os
+import errno
+import logging
+import platform
+from pathlib import Path
+from typing import Optional
+from utils.verification_cache import VerificationCache
+
+# Linux FICLONE ioctl (btrfs, XFS 등에서 데이터를 공유하는 사본)
+_FICLONE = 0x40049409
+
+REFLINK = "reflink"
+HARDLINK = "hardlink"
+# 클라이언트가 제자리에서 고쳐 쓰지 않는 파일만 저장소에 넣음 (realmlist.wtf 등 설정 파일 제외)
+SHARED_SUFFIXES = (".mpq",)
+
+
+def _reflink(source: Path, dest: Path) -> bool:
+    """copy-on-write 사본 생성. 파일 시스템이 지원하지 않으면 False"""
+    system = platform.system().lower()
+    try:
+        if system == 'linux':
+            import fcntl
+            with open(source, 'rb') as src, open(dest, 'wb') as dst:
+                fcntl.ioctl(dst.fileno(), _FICLONE, src.fileno())
+            return True
+        if system == 'darwin':
+            import ctypes
+            libc = ctypes.CDLL(None, use_errno=True)
+            if libc.clonefile(os.fsencode(source), os.fsencode(dest), 0) == 0:
+                return True
+    except OSError:
+        pass
+    try:
+        os.unlink(dest)
+    except OSError:
+        pass
+    return False
+
+
+class ObjectStore:
+    """매니페스트 해시를 이름으로 쓰는 공유 파일 저장소
+
+    여러 클라이언트(클래식/TBC/WotLK, PTR 사본)에 들어 있는 같은 파일을
+    한 번만 저장합니다. 설치 폴더에는 저장소 객체를 reflink(가능하면)
+    또는 하드링크로 만듭니다. 하드링크는 같은 파일이므로 런처의 검증
+    기록(file-id 기준)이 모든 설치에 함께 적용됩니다. 하드링크된 파일을
+    제자리에서 고쳐 쓰면 모든 설치가 함께 바뀌므로, 내용이 바뀌지 않는 MPQ
+    아카이브만 저장소에 넣습니다. 런처가 이 파일을 고칠 때는 임시 파일에 쓴
+    뒤 교체하므로 다른 설치에는 영향이 없습니다.
+    """
+
+    def __init__(self, root: Path, cache: Optional[VerificationCache] = None):
+        self.root = Path(root)
+        self.cache = cache
+        self.logger = logging.getLogger('ObjectStore')
+
+    @staticmethod
+    def shareable(file_path) -> bool:
+        return str(file_path).lower().endswith(SHARED_SUFFIXES)
+
+    def object_path(self, file_hash: str) -> Path:
+        return self.root / file_hash[:2] / file_hash
+
+    def has(self, file_hash: str, size: int) -> bool:
+        """크기가 맞고, 캐시가 있으면 검증된 뒤 바뀌지 않은 객체인지"""
+        object_path = self.object_path(file_hash)
+        try:
+            object_stat = object_path.stat()
+        except OSError:
+            return False
+        if object_stat.st_size != size:
+            return False
+        return self.cache is None or self.cache.is_verified(object_path, object_stat, file_hash)
+
+    def add(self, file_path: Path, file_hash: str) -> bool:
+        """검증된 설치 파일을 저장소에 등록 (복사하지 않고 하드링크)
+
+        같은 객체가 이미 있으면 설치 파일을 객체의 링크로 바꿔 중복을 없앱니다.
+        저장소에 넣지 않는 파일이거나 저장소와 다른 볼륨이라 링크할 수 없으면 False.
+        """
+        if not self.shareable(file_path):
+            return False
+        object_path = self.object_path(file_hash)
+        try:
+            file_stat = os.stat(file_path)
+            try:
+                object_stat = object_path.stat()
+            except FileNotFoundError:
+                object_path.parent.mkdir(parents=True, exist_ok=True)
+                os.link(file_path, object_path)
+                return True
+            if os.path.samestat(file_stat, object_stat):
+                return True
+            if self.has(file_hash, file_stat.st_size):
+                self._link(object_path, Path(file_path), allow_reflink=False)
+            else:
+                # 바뀌었거나 검증되지 않은 객체는 검증된 설치 파일로 교체
+                self._link(Path(file_path), object_path, allow_reflink=False)
+            return True
+        except OSError as e:
+            if e.errno not in (errno.EXDEV, errno.EPERM, errno.ENOTSUP):
+                self.logger.warning(f"공유 저장소에 등록할 수 없습니다 ({file_path}): {e}")
+            return False
+
+    def materialize(self, file_hash: str, dest_path: Path) -> Optional[str]:
+        """저장소 객체로 설치 파일을 만듭니다. 사용한 방식(reflink/hardlink) 또는 None
+
+        has()로 객체를 확인한 뒤 호출합니다.
+        """
+        if not self.shareable(dest_path):
+            return None
+        object_path = self.object_path(file_hash)
+        try:
+            Path(dest_path).parent.mkdir(parents=True, exist_ok=True)
+            return self._link(object_path, Path(dest_path))
+        except OSError as e:
+            self.logger.info(f"공유 저장소에서 파일을 가져올 수 없습니다 ({dest_path}): {e}")
+            return None
+
+    def _link(self, source_path: Path, dest_path: Path, allow_reflink: bool = True) -> str:
+        """임시 이름으로 만든 뒤 교체해 기존 파일이 중간 상태로 남지 않게 함"""
+        temp_path = dest_path.with_name(dest_path.name + '.link')
+        if temp_path.exists():
+            temp_path.unlink()
+        if allow_reflink and _reflink(source_path, temp_path):
+            method = REFLINK
+        else:
+            os.link(source_path, temp_path)
+            method = HARDLINK
+        os.replace(temp_path, dest_path)
+        return method
+
+    def prune(self) -> int:
+        """어느 설치에서도 하드링크하지 않는 객체 삭제. 지운 개수 반환"""
+        removed = 0
+        if not self.root.is_dir():
+            return 0
+        for object_path in self.root.glob("*/*"):
+            try:
+                if object_path.is_file() and object_path.stat().st_nlink <= 1:
+                    object_path.unlink()
+                    removed += 1
+            except OSError as e:
+                self.logger.warning(f"공유 저장소 정리 오류 ({object_path}): {e}")
+        return removed
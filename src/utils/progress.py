@@ -0,0 +1,244 @@
+import math
+import time
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+# 진행률 콜백 최대 호출 빈도 (Hz)
+DEFAULT_MAX_RATE = 20.0
+# 처리량 지수 이동 평균의 시간 상수 (초). 보고 빈도와 관계없이 같은 정도로 평활
+SPEED_TIME_CONSTANT = 3.0
+# 최고/평균 속도를 계산하는 최근 구간 (초)
+SPEED_WINDOW = 30.0
+# 이보다 짧은 간격의 보고는 모아서 한 표본으로 사용
+SAMPLE_INTERVAL = 0.25
+# 이 시간 동안 측정한 뒤부터 남은 시간을 추정
+ETA_WARMUP = 2.0
+
+
+class OperationCancelled(Exception):
+    """CancellationToken으로 작업이 취소되었을 때 발생"""
+
+
+class CancellationToken:
+    """여러 작업자 스레드가 공유하는 취소 요청 플래그"""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise OperationCancelled()
+
+    def wait(self, timeout: float) -> bool:
+        """취소되거나 timeout이 지날 때까지 대기. 취소되었으면 True"""
+        return self._event.wait(timeout)
+
+
+class PauseToken:
+    """여러 작업자 스레드가 공유하는 일시정지 플래그"""
+
+    def __init__(self):
+        self._running = threading.Event()
+        self._running.set()
+
+    def pause(self):
+        self._running.clear()
+
+    def resume(self):
+        self._running.set()
+
+    @property
+    def paused(self) -> bool:
+        return not self._running.is_set()
+
+    def wait(self, cancel_token: CancellationToken, interval: float = 0.5):
+        """일시정지가 풀릴 때까지 대기. 그동안 취소되면 OperationCancelled"""
+        while not self._running.wait(interval):
+            cancel_token.raise_if_cancelled()
+        cancel_token.raise_if_cancelled()
+
+
+@dataclass
+class TransferSnapshot:
+    percent: float
+    label: str
+    done_bytes: int
+    total_bytes: int
+    speed: float    # 지수 이동 평균 (bytes/s)
+    average: float  # 최근 SPEED_WINDOW초 평균 (bytes/s)
+    peak: float     # 최근 SPEED_WINDOW초 중 가장 빠른 표본 (bytes/s)
+    eta: float      # 남은 시간(초), 추정할 수 없으면 -1
+    elapsed: float
+
+
+class TransferStats:
+    """전송량으로 처리량과 남은 시간을 추정 (작업자 스레드에서 갱신, UI에서 조회)
+
+    가중치를 표본 간격과 시간 상수로 정하므로 보고가 잦거나 드물어도 같은
+    속도가 나옵니다. 남은 시간은 이전 추정에서 흐른 시간을 뺀 값과 새 추정을
+    같은 가중치로 섞어, 속도가 잠깐 흔들려도 표시가 튀지 않습니다.
+    """
+
+    def __init__(self, total_bytes: int = 0, done_bytes: int = 0, label: str = "",
+                 time_constant: float = SPEED_TIME_CONSTANT, window: float = SPEED_WINDOW):
+        self.time_constant = time_constant
+        self.window = window
+        self._lock = threading.Lock()
+        self._reset(total_bytes, done_bytes, label)
+
+    def _reset(self, total_bytes: int, done_bytes: int, label: str):
+        now = time.monotonic()
+        self.total_bytes = total_bytes
+        self.done_bytes = done_bytes
+        self.label = label
+        self._started = now
+        self._sample_time = now
+        self._sample_bytes = done_bytes
+        self._speed = 0.0
+        self._eta = -1.0
+        self._eta_time = now
+        self._samples = deque()  # (시각, 바이트, 간격)
+
+    def reset(self, total_bytes: int = 0, done_bytes: int = 0, label: str = ""):
+        """새 전송 시작 (속도 기록도 지움)"""
+        with self._lock:
+            self._reset(total_bytes, done_bytes, label)
+
+    def begin(self, total_bytes: int, done_bytes: int = 0, label: str = ""):
+        """같은 전송의 다음 단계 (다른 출처, 이어받기). 총량과 기준점만 바꾸고 속도 기록은 유지"""
+        with self._lock:
+            self.total_bytes = total_bytes
+            self.done_bytes = self._sample_bytes = done_bytes
+            self._sample_time = time.monotonic()
+            if label:
+                self.label = label
+
+    def add(self, n_bytes: int, label: str = ""):
+        with self._lock:
+            self.done_bytes += n_bytes
+            if label:
+                self.label = label
+            self._sample(time.monotonic())
+
+    def update(self, done_bytes: int, total_bytes: Optional[int] = None, label: str = ""):
+        """누적 전송량으로 갱신 (토렌트처럼 합계만 알 때). 줄어들면 기준점만 옮김"""
+        with self._lock:
+            if total_bytes is not None:
+                self.total_bytes = total_bytes
+            if done_bytes < self._sample_bytes:
+                self._sample_bytes = done_bytes
+            self.done_bytes = done_bytes
+            if label:
+                self.label = label
+            self._sample(time.monotonic())
+
+    def _sample(self, now: float):
+        interval = now - self._sample_time
+        if interval < SAMPLE_INTERVAL:
+            return
+        n_bytes = self.done_bytes - self._sample_bytes
+        instant = n_bytes / interval
+        alpha = 1 - math.exp(-interval / self.time_constant)
+        self._speed = instant if not self._samples else self._speed + alpha * (instant - self._speed)
+        self._samples.append((now, n_bytes, interval))
+        while self._samples and now - self._samples[0][0] > self.window:
+            self._samples.popleft()
+        self._sample_time, self._sample_bytes = now, self.done_bytes
+
+        remaining = max(0, self.total_bytes - self.done_bytes)
+        if remaining == 0:
+            self._eta = 0.0
+        elif self._speed <= 0 or now - self._started < ETA_WARMUP:
+            self._eta = -1.0
+        else:
+            estimate = remaining / self._speed
+            if self._eta < 0:
+                self._eta = estimate
+            else:
+                predicted = max(0.0, self._eta - (now - self._eta_time))
+                self._eta = predicted + alpha * (estimate - predicted)
+        self._eta_time = now
+
+    def snapshot(self) -> TransferSnapshot:
+        """현재 추정값. 보고가 멈춘 동안에도 호출할 때마다 속도가 줄어듦"""
+        with self._lock:
+            now = time.monotonic()
+            self._sample(now)
+            total_interval = sum(interval for _, _, interval in self._samples)
+            eta = max(0.0, self._eta - (now - self._eta_time)) if self._eta >= 0 else -1.0
+            return TransferSnapshot(
+                percent=min(100.0, self.done_bytes / self.total_bytes * 100) if self.total_bytes > 0 else 0.0,
+                label=self.label,
+                done_bytes=self.done_bytes,
+                total_bytes=self.total_bytes,
+                speed=self._speed,
+                average=sum(n for _, n, _ in self._samples) / total_interval if total_interval else 0.0,
+                peak=max((n / interval for _, n, interval in self._samples), default=0.0),
+                eta=eta,
+                elapsed=now - self._started
+            )
+
+
+class ByteProgress:
+    """처리한 바이트 기준 진행률을 제한된 빈도로 보고합니다
+
+    callback(percent, label, bytes_per_second, eta_seconds)는 여러 작업자
+    스레드에서 advance()가 호출되어도 초당 max_rate번을 넘지 않습니다.
+    eta_seconds는 아직 추정할 수 없으면 -1입니다. stats를 넘기면 UI가 직접
+    조회할 수 있도록 그 TransferStats에 기록합니다.
+    """
+
+    def __init__(self, total_bytes: int,
+                 callback: Optional[Callable[[float, str, float, float], None]],
+                 max_rate: float = DEFAULT_MAX_RATE, done_bytes: int = 0,
+                 stats: Optional[TransferStats] = None):
+        self.total_bytes = total_bytes
+        self.callback = callback
+        self.min_interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.stats = stats or TransferStats()
+        self.stats.begin(total_bytes, done_bytes)
+        self._lock = threading.Lock()
+        self._started = time.monotonic()
+        self._initial_bytes = done_bytes
+        self._last_emit = 0.0
+
+    @property
+    def done_bytes(self) -> int:
+        return self.stats.done_bytes
+
+    @property
+    def percent(self) -> float:
+        if self.total_bytes <= 0:
+            return 100.0
+        return min(100.0, self.done_bytes / self.total_bytes * 100)
+
+    def advance(self, n_bytes: int, label: str = ""):
+        self.stats.add(n_bytes, label)
+        if not self.callback:
+            return
+        with self._lock:
+            now = time.monotonic()
+            if now - self._last_emit < self.min_interval:
+                return
+            self._last_emit = now
+        snapshot = self.stats.snapshot()
+        self.callback(self.percent, snapshot.label, snapshot.speed, snapshot.eta)
+
+    def finish(self, label: str = ""):
+        """마지막 상태를 빈도 제한 없이 보고 (속도는 전체 평균)"""
+        if label:
+            self.stats.update(self.done_bytes, label=label)
+        elapsed = time.monotonic() - self._started
+        average = (self.done_bytes - self._initial_bytes) / elapsed if elapsed > 0 else 0.0
+        if self.callback:
+            self.callback(100.0 if self.done_bytes >= self.total_bytes else self.percent,
+                          self.stats.label, average, 0.0)
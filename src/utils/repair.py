@@ -0,0 +1,85 @@
+import os
+from pathlib import Path
+from typing import Collection, List, Tuple
+from utils.file_verifier import (
+    VerificationReport, FileCheckResult, HASH_MISMATCH, SIZE_MISMATCH, merge_ranges
+)
+from utils.hashing import hash_blocks
+from utils.http_downloader import DownloadItem
+from utils.manifest import Manifest
+
+
+def subset_manifest(manifest: Manifest, relative_paths: List[str]) -> Manifest:
+    """일부 파일만 담은 매니페스트 (복구한 파일만 다시 검사할 때 사용)"""
+    return Manifest(
+        files={p: manifest.files[p] for p in relative_paths if p in manifest.files},
+        block_size=manifest.block_size,
+        format=manifest.format,
+        algorithm=manifest.algorithm,
+        version=manifest.version,
+        extra=manifest.extra
+    )
+
+
+def _bad_ranges_by_blocks(file_path: Path, manifest: Manifest, relative_path: str) -> List[Tuple[int, int]]:
+    """크기가 다른(잘린) 파일에서 온전히 남아 있는 정상 블록을 제외한 범위"""
+    expected = manifest.files[relative_path]["blocks"]
+    current_size = file_path.stat().st_size
+    bad = []
+    # 현재 파일 안에 끝까지 들어 있는 블록만 해시해서 재사용 여부 판단
+    complete = [
+        (index, start, end) for index, start, end in manifest.block_ranges(relative_path)
+        if end <= current_size
+    ]
+    digests = []
+    if complete:
+        length = complete[-1][2]
+        digests, _ = hash_blocks(file_path, manifest.block_size, 0, length, algorithm=manifest.algorithm)
+    for (index, start, end), digest in zip(complete, digests):
+        if digest.hex() != expected[index]:
+            bad.append((start, end))
+    reusable_end = complete[-1][2] if complete else 0
+    if reusable_end < manifest.files[relative_path]["size"]:
+        bad.append((reusable_end, manifest.files[relative_path]["size"]))
+    return merge_ranges(bad)
+
+
+def repair_item(failure: FileCheckResult, manifest: Manifest, data_path: Path) -> DownloadItem:
+    """검사 실패 하나를 다시 받을 항목으로 변환 (가능하면 손상된 블록만)"""
+    relative_path = failure.relative_path
+    file_info = manifest.files[relative_path]
+    file_path = data_path / relative_path.replace('/', os.sep)
+    item = DownloadItem(
+        f"Data/{relative_path}",
+        file_info["size"],
+        hash=file_info["hash"],
+        algorithm=manifest.algorithm,
+        block_size=manifest.block_size or 0,
+        blocks=file_info.get("blocks") if manifest.has_blocks(relative_path) else None
+    )
+    if not item.blocks or not file_path.exists():
+        return item
+
+    if failure.kind == HASH_MISMATCH and failure.bad_ranges:
+        item.ranges = failure.bad_ranges
+    elif failure.kind == SIZE_MISMATCH:
+        try:
+            item.ranges = _bad_ranges_by_blocks(file_path, manifest, relative_path)
+        except OSError:
+            return item
+    if item.ranges is not None:
+        item.base_path = file_path
+    return item
+
+
+def plan_repair(report: VerificationReport, manifest: Manifest, data_path: Path,
+                exclude: Collection[str] = ()) -> List[DownloadItem]:
+    """검증 보고서의 실패 목록으로 다시 받을 파일(또는 블록) 목록을 만듭니다
+
+    exclude에 있는 파일(델타 패치로 이미 고친 파일 등)은 건너뜁니다.
+    """
+    return [
+        repair_item(failure, manifest, Path(data_path))
+        for failure in report.failures
+        if failure.relative_path in manifest.files and failure.relative_path not in exclude
+    ]
@@ -12,3 +12,11 @@ def resource_path(relative_path):
         base_path = Path(__file__).parent.parent.parent
     
     return base_path / relative_path
+
+def app_data_path():
+    """ Get the per-user launcher data folder (%LOCALAPPDATA%/WoWLauncher) """
+    base_path = os.getenv('LOCALAPPDATA')
+    if base_path:
+        return Path(base_path) / 'WoWLauncher'
+    # LOCALAPPDATA가 없는 환경(Linux/macOS)용 대체 경로
+    return Path.home() / '.local' / 'share' / 'WoWLauncher'
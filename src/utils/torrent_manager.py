@@ -1,93 +1,227 @@
-import libtorrent as lt
 import time
+import asyncio
 import logging
 from pathlib import Path
 from dataclasses import dataclass
-from typing import Optional, Callable
+from typing import Callable, Dict, Optional
+
+try:
+    import libtorrent as lt
+except ImportError:  # 선택 의존성 (requirements.txt 참고)
+    lt = None
+
+# post_torrent_updates 요청 주기 (초)
+STATUS_INTERVAL = 1.0
+DEFAULT_LISTEN_INTERFACES = "0.0.0.0:6881,[::]:6881"
+
+
+class TorrentError(Exception):
+    """libtorrent가 보고한 토렌트 오류"""
+
 
 @dataclass
 class TorrentStatus:
     updated_at: int
-    bytes_total: int 
+    bytes_total: int
     bytes_done: int
     progress: float
     state: str
     speed: float
+    paused: bool = False
+
+
+def create_session(listen_interfaces: str = DEFAULT_LISTEN_INTERFACES):
+    """상태/오류/진행 알림을 받도록 설정한 libtorrent 세션"""
+    if lt is None:
+        raise TorrentError("libtorrent is not installed")
+    return lt.session({
+        'listen_interfaces': listen_interfaces,
+        'alert_mask': (lt.alert.category_t.status_notification
+                       | lt.alert.category_t.error_notification
+                       | lt.alert.category_t.storage_notification),
+    })
+
 
 class TorrentManager:
-    def __init__(self):
-        self.session = lt.session()
-        self.session.listen_on(6881, 6891)
+    """libtorrent 알림(alert)으로 동작하는 토렌트 다운로더
+
+    스레드를 sleep 루프로 붙잡지 않습니다. libtorrent가 알림을 쌓으면
+    set_alert_notify 콜백이 asyncio 루프로 처리를 넘기고, 진행률은
+    call_later 타이머로 post_torrent_updates를 요청해 state_update 알림으로
+    받습니다. 세션은 주입할 수 있어 가짜 세션으로 테스트할 수 있습니다
+    (add_torrent, pop_alerts, post_torrent_updates, set_alert_notify,
+    remove_torrent만 사용).
+    """
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, session=None,
+                 status_callback: Optional[Callable[[TorrentStatus], None]] = None,
+                 resume_path: Optional[Path] = None):
+        self.loop = loop
+        self.session = session if session is not None else create_session()
+        self.status_callback = status_callback
+        self.resume_path = Path(resume_path) if resume_path else None
         self.handle = None
         self.logger = logging.getLogger('TorrentManager')
-        self._status_callback = None
-        
-    def start_download(self, torrent_path: str, save_path: str, 
-                      trackers: list = None,
-                      status_callback=None):
-        try:
-            # Загружаем торрент файл
-            info = lt.torrent_info(torrent_path)
-            
-            # Добавляем трекеры если указаны
-            if trackers:
-                for tracker in trackers:
-                    info.add_tracker(tracker)
-                    
-            # Создаем handle
-            self.handle = self.session.add_torrent({
-                'ti': info,
-                'save_path': save_path
-            })
-            
-            # Запускаем мониторинг
-            self._monitor_download(status_callback)
-            
-        except Exception as e:
-            self.logger.error(f"Error starting download: {e}")
-            raise
-            
-    def _monitor_download(self, status_callback):
-        """Отслеживает прогресс загрузки"""
-        while not self.handle.is_seed():
-            s = self.handle.status()
-            
+        self._done: Optional[asyncio.Future] = None
+        self._status_timer: Optional[asyncio.TimerHandle] = None
+        self._paused = False
+        self.session.set_alert_notify(self._on_alert_notify)
+
+    # --- 알림 처리 ---
+
+    def _on_alert_notify(self):
+        """libtorrent 내부 스레드에서 호출됨: 여기서는 루프로 넘기기만 함"""
+        self.loop.call_soon_threadsafe(self._drain_alerts)
+
+    def _drain_alerts(self):
+        handlers: Dict[str, Callable] = {
+            'state_update': self._on_state_update,
+            'torrent_finished': self._on_finished,
+            'torrent_error': self._on_error,
+            'file_error': self._on_error,
+            'save_resume_data': self._on_resume_data,
+            'torrent_paused': self._on_paused,
+            'torrent_resumed': self._on_resumed,
+        }
+        for alert in self.session.pop_alerts():
+            handler = handlers.get(alert.what())
+            if handler:
+                handler(alert)
+
+    def _on_state_update(self, alert):
+        for s in alert.status:
+            if self.handle is None or s.handle != self.handle:
+                continue
             status = TorrentStatus(
                 updated_at=int(time.time()),
                 bytes_total=s.total_wanted,
-                bytes_done=s.total_wanted_done, 
+                bytes_done=s.total_wanted_done,
                 progress=s.progress * 100,
                 state=self._get_state(s.state),
-                speed=s.download_rate
+                speed=s.download_rate,
+                paused=self._paused
             )
-            
-            if status_callback:
-                status_callback(status)
-                
-            time.sleep(1)
-            
+            if self.status_callback:
+                self.status_callback(status)
+
+    def _on_finished(self, alert):
+        self._stop_status_timer()
+        self._save_resume_data()
+        if self._done and not self._done.done():
+            self._done.set_result(None)
+
+    def _on_error(self, alert):
+        self.logger.error(f"토렌트 오류: {alert.message()}")
+        self._stop_status_timer()
+        if self._done and not self._done.done():
+            self._done.set_exception(TorrentError(alert.message()))
+
+    def _on_paused(self, alert):
+        self._paused = True
+        self._post_updates()
+
+    def _on_resumed(self, alert):
+        self._paused = False
+
+    def _on_resume_data(self, alert):
+        """이어받기 데이터를 저장해 런처를 다시 시작해도 처음부터 확인하지 않도록 함"""
+        if not self.resume_path or lt is None:
+            return
+        try:
+            self.resume_path.parent.mkdir(parents=True, exist_ok=True)
+            self.resume_path.write_bytes(lt.write_resume_data_buf(alert.params))
+        except OSError as e:
+            self.logger.warning(f"이어받기 데이터 저장 오류: {e}")
+
+    # --- 상태 타이머 ---
+
+    def _post_updates(self):
+        self.session.post_torrent_updates()
+
+    def _schedule_status(self):
+        self._post_updates()
+        self._status_timer = self.loop.call_later(STATUS_INTERVAL, self._schedule_status)
+
+    def _stop_status_timer(self):
+        if self._status_timer:
+            self._status_timer.cancel()
+            self._status_timer = None
+
+    def _save_resume_data(self):
+        if self.handle is not None and self.resume_path:
+            self.handle.save_resume_data()
+
+    # --- 공개 API (asyncio 루프에서 호출) ---
+
+    def _add_params(self, torrent_path: str, save_path: str, trackers: Optional[list]):
+        params = None
+        if self.resume_path and self.resume_path.exists() and lt is not None:
+            try:
+                params = lt.read_resume_data(self.resume_path.read_bytes())
+            except Exception as e:
+                self.logger.warning(f"이어받기 데이터를 읽을 수 없습니다: {e}")
+        if params is None:
+            params = lt.add_torrent_params() if lt is not None else {}
+        if lt is not None:
+            params.ti = lt.torrent_info(torrent_path)
+            params.save_path = save_path
+            if trackers:
+                params.trackers = list(trackers)
+        else:
+            # libtorrent 없이 가짜 세션으로 테스트할 때는 dict로 전달
+            params.update({'ti': torrent_path, 'save_path': save_path, 'trackers': list(trackers or [])})
+        return params
+
+    async def download(self, torrent_path: str, save_path: str, trackers: list = None):
+        """다운로드가 끝날 때까지 대기. 오류 시 TorrentError, 취소 시 CancelledError"""
+        self._done = self.loop.create_future()
+        self.handle = self.session.add_torrent(self._add_params(torrent_path, save_path, trackers))
+        self._paused = False
+        self._schedule_status()
+        try:
+            await self._done
+        finally:
+            self._stop_status_timer()
+
+    def pause(self):
+        if self.handle is not None:
+            self.handle.pause()
+            self._save_resume_data()
+
+    def resume(self):
+        if self.handle is not None:
+            self.handle.resume()
+
+    def set_rate_limits(self, download: int, upload: int):
+        """세션 전체 속도 제한 (bytes/s, 0이면 제한 없음)"""
+        self.session.apply_settings({
+            'download_rate_limit': int(download),
+            'upload_rate_limit': int(upload),
+        })
+
+    def cancel(self):
+        """다운로드 중단. 받은 파일과 이어받기 데이터는 남겨둠"""
+        self._stop_status_timer()
+        if self.handle is not None:
+            self._save_resume_data()
+            self.session.remove_torrent(self.handle)
+            self.handle = None
+        if self._done and not self._done.done():
+            self._done.cancel()
+
     def _get_state(self, state):
         """Возвращает текстовое состояние загрузки"""
+        if lt is None:
+            return str(state)
         states = {
             lt.torrent_status.checking_files: "checking",
             lt.torrent_status.downloading_metadata: "dl metadata",
             lt.torrent_status.downloading: "progress",
             lt.torrent_status.finished: "finished",
             lt.torrent_status.seeding: "seeding",
-            lt.torrent_status.allocating: "allocating",
             lt.torrent_status.checking_resume_data: "checking resume"
         }
-        return states.get(state, "progress") 
-
-    def add_torrent(self, torrent_path: str = None, magnet_uri: str = None):
-        """Добавляет торрент из файла или магнет-ссылки"""
-        if torrent_path:
-            info = lt.torrent_info(torrent_path)
-            return self.session.add_torrent({'ti': info})
-        elif magnet_uri:
-            return self.session.add_torrent({'url': magnet_uri})
-        else:
-            raise ValueError("Необходимо указать torrent_path или magnet_uri")
+        return states.get(state, "progress")
 
     def check_files(self):
         """Запускает проверку файлов"""
@@ -96,16 +230,18 @@ class TorrentManager:
 
     def get_files(self):
         """Возвращает список файлов в торренте"""
-        if not self.handle or not self.handle.has_metadata():
+        if not self.handle or not self.handle.status().has_metadata:
             return []
-            
+
         files = []
-        torrent_info = self.handle.get_torrent_info()
-        
-        for f in torrent_info.files():
+        torrent_info = self.handle.torrent_file()
+        progress = self.handle.file_progress()
+        storage = torrent_info.files()
+
+        for index in range(storage.num_files()):
             files.append({
-                'path': f.path,
-                'size': f.size,
-                'progress': 0  # Будет обновляться в _monitor_download
+                'path': storage.file_path(index),
+                'size': storage.file_size(index),
+                'progress': progress[index] if index < len(progress) else 0
             })
-        return files 
\ No newline at end of file
+        return files
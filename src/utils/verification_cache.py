@@ -0,0 +1,193 @@
+import os
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Iterable, Optional
+
+
+def file_identity(file_stat: os.stat_result) -> str:
+    """볼륨 + 파일 인덱스(inode / Windows file-id)로 파일을 식별합니다"""
+    return f"{file_stat.st_dev}:{file_stat.st_ino}"
+
+
+class VerificationCache:
+    """로컬에서 검증된 파일 해시를 저장하는 SQLite 데이터베이스
+
+    (경로, 크기, mtime_ns, file-id)가 그대로이고 기록된 해시가 현재
+    매니페스트의 해시와 같으면 파일을 다시 해시하지 않습니다. 같은 파일을
+    하드링크로 공유하는 설치(공유 저장소)는 file-id 기록으로 검증을 함께 씁니다.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.logger = logging.getLogger('VerificationCache')
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+            # 검증 작업자 스레드에서도 사용하므로 잠금으로 직렬화
+            self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS verified_files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    file_id TEXT NOT NULL,
+                    manifest_version TEXT NOT NULL,
+                    hash TEXT NOT NULL,
+                    verified_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS verified_objects (
+                    file_id TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    hash TEXT NOT NULL,
+                    verified_at REAL NOT NULL
+                )
+            """)
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL
+                )
+            """)
+            self._conn.commit()
+        return self._conn
+
+    @staticmethod
+    def _key(file_path: Path) -> str:
+        return os.path.normcase(os.path.abspath(file_path))
+
+    def is_verified(self, file_path: Path, file_stat: os.stat_result, expected_hash: str) -> bool:
+        """파일이 변경 없이 expected_hash로 검증된 적이 있는지 확인
+
+        이 경로의 기록이 없으면 같은 파일(하드링크)을 다른 경로에서 검증한 기록을 씁니다.
+        """
+        file_id = file_identity(file_stat)
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT size, mtime_ns, file_id, hash FROM verified_files WHERE path = ?",
+                    (self._key(file_path),)
+                ).fetchone()
+                if not row or row[2] != file_id:
+                    row = conn.execute(
+                        "SELECT size, mtime_ns, file_id, hash FROM verified_objects WHERE file_id = ?",
+                        (file_id,)
+                    ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 조회 오류: {e}")
+            return False
+
+        if not row:
+            return False
+        size, mtime_ns, verified_id, verified_hash = row
+        return (
+            size == file_stat.st_size
+            and mtime_ns == file_stat.st_mtime_ns
+            and verified_id == file_id
+            and verified_hash == expected_hash
+        )
+
+    def record(self, file_path: Path, file_stat: os.stat_result, file_hash: str, version: str):
+        """검증에 성공한 파일 기록"""
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute(
+                    "INSERT OR REPLACE INTO verified_files VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    (self._key(file_path), file_stat.st_size, file_stat.st_mtime_ns,
+                     file_identity(file_stat), version, file_hash, time.time())
+                )
+                conn.execute(
+                    "INSERT OR REPLACE INTO verified_objects VALUES (?, ?, ?, ?, ?)",
+                    (file_identity(file_stat), file_stat.st_size, file_stat.st_mtime_ns,
+                     file_hash, time.time())
+                )
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 기록 오류: {e}")
+
+    def invalidate(self, file_path: Path):
+        """파일의 검증 기록 삭제 (같은 파일을 공유하는 다른 경로의 기록도 함께)"""
+        try:
+            file_id = file_identity(os.stat(file_path))
+        except OSError:
+            file_id = None
+        try:
+            with self._lock:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT file_id FROM verified_files WHERE path = ?", (self._key(file_path),)
+                ).fetchone()
+                conn.execute("DELETE FROM verified_files WHERE path = ?", (self._key(file_path),))
+                for stale_id in {file_id, row[0] if row else None} - {None}:
+                    conn.execute("DELETE FROM verified_files WHERE file_id = ?", (stale_id,))
+                    conn.execute("DELETE FROM verified_objects WHERE file_id = ?", (stale_id,))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 삭제 오류: {e}")
+
+    def prune(self, version: str, keep_paths: Iterable[Path]):
+        """매니페스트가 바뀌었을 때 더 이상 포함되지 않는 파일의 기록 삭제"""
+        keep = {self._key(p) for p in keep_paths}
+        try:
+            with self._lock:
+                conn = self._connect()
+                rows = conn.execute(
+                    "SELECT path FROM verified_files WHERE manifest_version != ?", (version,)
+                ).fetchall()
+                stale = [(path,) for (path,) in rows if path not in keep]
+                if stale:
+                    conn.executemany("DELETE FROM verified_files WHERE path = ?", stale)
+                    conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 정리 오류: {e}")
+
+    def get_meta(self, key: str) -> Optional[str]:
+        try:
+            with self._lock:
+                row = self._connect().execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 조회 오류: {e}")
+            return None
+        return row[0] if row else None
+
+    def set_meta(self, key: str, value: str):
+        try:
+            with self._lock:
+                conn = self._connect()
+                conn.execute("INSERT OR REPLACE INTO meta VALUES (?, ?)", (key, value))
+                conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"검증 캐시 기록 오류: {e}")
+
+    def last_full_verify(self, version: str) -> Optional[float]:
+        """이 매니페스트 버전으로 마지막 전체 해시 검증에 성공한 시각 (time.time())"""
+        if self.get_meta("full_verify_version") != version:
+            return None
+        value = self.get_meta("full_verify_at")
+        return float(value) if value else None
+
+    def record_full_verify(self, version: str):
+        self.set_meta("full_verify_version", version)
+        self.set_meta("full_verify_at", str(time.time()))
+
+    def next_sample_round(self) -> int:
+        """표본 검사마다 다른 블록을 고르도록 1씩 증가하는 회차 번호"""
+        value = int(self.get_meta("sample_round") or 0) + 1
+        self.set_meta("sample_round", str(value))
+        return value
+
+    def close(self):
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
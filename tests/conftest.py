@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 런처 코드는 src를 기준으로 import (from utils.x import y)
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / "src"))
@@ -0,0 +1,66 @@
+import hashlib
+import os
+import random
+
+import pytest
+
+from utils.delta import DeltaError, apply_delta, create_delta, read_delta_header
+
+
+def _round_trip(tmp_path, source, target):
+    source_path, target_path = tmp_path / "old.MPQ", tmp_path / "new.MPQ"
+    delta_path, output_path = tmp_path / "new.MPQ.delta", tmp_path / "out.MPQ"
+    source_path.write_bytes(source)
+    target_path.write_bytes(target)
+
+    header = create_delta(source_path, target_path, delta_path)
+    digest = apply_delta(source_path, delta_path, output_path, expected_hash=hashlib.sha256(target).hexdigest())
+
+    assert output_path.read_bytes() == target
+    assert digest == header["target_hash"]
+    return delta_path.stat().st_size
+
+
+def test_round_trip_with_insert_delete_and_edit(tmp_path):
+    rng = random.Random(1)
+    source = rng.randbytes(3 * 1024 * 1024)
+    target = bytearray(source)
+    target[100_000:100_000] = rng.randbytes(5000)         # 삽입: 뒤쪽 블록이 모두 밀림
+    del target[1_500_000:1_520_000]                       # 삭제
+    target[2_000_000:2_000_100] = b"\x00" * 100           # 제자리 수정
+    target += rng.randbytes(70_000)                        # 끝에 추가
+
+    delta_size = _round_trip(tmp_path, source, bytes(target))
+
+    # 바뀐 부분만 기록되므로 새 파일보다 훨씬 작음
+    assert delta_size < 200_000
+
+
+def test_round_trip_small_and_empty_files(tmp_path):
+    _round_trip(tmp_path, b"", b"patch 3.3.5a")
+    _round_trip(tmp_path, b"patch 3.3.5a", b"")
+    _round_trip(tmp_path, os.urandom(1000), os.urandom(1000))
+
+
+def test_header_describes_target(tmp_path):
+    source, target = os.urandom(10_000), os.urandom(20_000)
+    _round_trip(tmp_path, source, target)
+
+    with open(tmp_path / "new.MPQ.delta", "rb") as f:
+        header = read_delta_header(f)
+    assert header["target_size"] == len(target)
+    assert header["source_hash"] == hashlib.sha256(source).hexdigest()
+
+
+def test_wrong_source_or_manifest_hash_is_rejected(tmp_path):
+    rng = random.Random(2)
+    source = rng.randbytes(512 * 1024)
+    target = source[:200_000] + rng.randbytes(1000) + source[200_000:]
+    _round_trip(tmp_path, source, target)
+
+    (tmp_path / "other.MPQ").write_bytes(bytes(reversed(source)))
+    with pytest.raises(DeltaError):
+        apply_delta(tmp_path / "other.MPQ", tmp_path / "new.MPQ.delta", tmp_path / "bad.MPQ")
+    with pytest.raises(DeltaError):
+        apply_delta(tmp_path / "old.MPQ", tmp_path / "new.MPQ.delta", tmp_path / "bad.MPQ",
+                    expected_hash=hashlib.sha256(b"other").hexdigest())
@@ -0,0 +1,155 @@
+import errno
+import hashlib
+import json
+import os
+
+import pytest
+
+from utils import file_verifier
+from utils.file_verifier import FileVerifier, SCAN_DEEP, SCAN_QUICK, SCAN_SPOT
+from utils.manifest import build_manifest_document, merkle_root, parse_manifest
+from utils.verification_cache import VerificationCache
+
+BLOCK_SIZE = 1024
+FILES = {
+    "common.MPQ": 5 * BLOCK_SIZE + 100,
+    "patch.MPQ": 2 * BLOCK_SIZE,
+    "realmlist.wtf": 40,
+}
+
+
+def _entry(file_path):
+    data = file_path.read_bytes()
+    blocks = [hashlib.sha256(data[i:i + BLOCK_SIZE]).digest() for i in range(0, len(data), BLOCK_SIZE)]
+    return {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "mtime": file_path.stat().st_mtime,
+        "root": merkle_root(blocks),
+        "blocks": [b.hex() for b in blocks],
+    }
+
+
+@pytest.fixture
+def client(tmp_path):
+    """블록 매니페스트와 일치하는 Data 폴더"""
+    data_path = tmp_path / "Data"
+    data_path.mkdir()
+    files = {}
+    for relative_path, size in FILES.items():
+        file_path = data_path / relative_path
+        file_path.write_bytes(os.urandom(size))
+        files[relative_path] = _entry(file_path)
+    manifest = parse_manifest(json.dumps(build_manifest_document(files, BLOCK_SIZE)).encode())
+    return data_path, manifest
+
+
+def _verifier(client, **kwargs):
+    data_path, manifest = client
+    return FileVerifier(data_path, manifest, workers=2, **kwargs)
+
+
+def _rot(file_path, offset):
+    """수정 시간은 그대로 두고 바이트 하나를 바꿈 (디스크 손상)"""
+    before = file_path.stat()
+    with open(file_path, "r+b") as f:
+        f.seek(offset)
+        value = f.read(1)[0]
+        f.seek(offset)
+        f.write(bytes([value ^ 0xFF]))
+    os.utime(file_path, ns=(before.st_atime_ns, before.st_mtime_ns))
+
+
+def test_intact_client_passes_every_mode(client):
+    quick = _verifier(client).scan(SCAN_QUICK)
+    assert quick.ok and quick.complete
+    assert quick.files_skipped == 3 and quick.files_hashed == 0
+
+    spot = _verifier(client).scan(SCAN_SPOT)
+    assert spot.ok and spot.complete
+    assert spot.files_sampled == spot.files_hashed == 3
+
+    deep = _verifier(client).scan(SCAN_DEEP)
+    assert deep.ok and deep.complete
+    assert deep.files_hashed == 3 and deep.bytes_read == sum(FILES.values())
+
+
+def test_bit_rot_with_mtime_restored(client):
+    data_path, _ = client
+    _rot(data_path / "common.MPQ", BLOCK_SIZE + 10)
+
+    # size/mtime이 그대로라 빠른 검사로는 찾을 수 없음
+    assert _verifier(client).scan(SCAN_QUICK).ok
+
+    spot = _verifier(client, samples_per_file=8).scan(SCAN_SPOT)
+    assert [r.relative_path for r in spot.hash_mismatch] == ["common.MPQ"]
+    assert spot.hash_mismatch[0].bad_ranges == [(BLOCK_SIZE, 2 * BLOCK_SIZE)]
+
+    deep = _verifier(client).scan(SCAN_DEEP)
+    assert deep.complete and not deep.ok
+    assert deep.hash_mismatch[0].bad_ranges == [(BLOCK_SIZE, 2 * BLOCK_SIZE)]
+
+
+def test_recheck_finds_every_bad_range_of_sampled_file(client):
+    data_path, _ = client
+    for offset in range(0, FILES["common.MPQ"], BLOCK_SIZE):
+        _rot(data_path / "common.MPQ", offset)
+
+    verifier = _verifier(client, samples_per_file=1)
+    report = verifier.scan(SCAN_SPOT)
+    assert len(report.hash_mismatch[0].bad_ranges) == 1
+
+    failed = [r.relative_path for r in report.hash_mismatch]
+    report.replace(failed, verifier.scan(SCAN_DEEP, paths=failed))
+
+    assert report.complete and report.files_hashed == 3 and report.files_sampled == 2
+    assert report.hash_mismatch[0].bad_ranges == [(0, FILES["common.MPQ"])]
+
+
+def test_truncated_and_missing_files(client):
+    data_path, _ = client
+    os.truncate(data_path / "patch.MPQ", BLOCK_SIZE)
+    (data_path / "realmlist.wtf").unlink()
+
+    report = _verifier(client).scan(SCAN_QUICK)
+
+    assert report.complete and not report.ok
+    assert [r.relative_path for r in report.size_mismatch] == ["patch.MPQ"]
+    assert [r.relative_path for r in report.missing] == ["realmlist.wtf"]
+    assert report.files_skipped == 1
+
+
+def test_read_error_is_counted_once(client, monkeypatch):
+    hash_blocks = file_verifier.hash_blocks
+
+    def failing_hash_blocks(file_path, *args, **kwargs):
+        if file_path.name == "common.MPQ":
+            raise OSError(errno.EIO, "Input/output error")
+        return hash_blocks(file_path, *args, **kwargs)
+
+    monkeypatch.setattr(file_verifier, "hash_blocks", failing_hash_blocks)
+    report = _verifier(client).scan(SCAN_DEEP)
+
+    assert [r.relative_path for r in report.errors] == ["common.MPQ"]
+    assert report.files_hashed == 2
+    # 모든 파일의 결과가 있으므로 복구를 제안할 수 있음
+    assert report.complete and not report.ok
+
+
+def test_full_verify_clock(client, tmp_path):
+    cache = VerificationCache(tmp_path / "cache.db")
+    verifier = _verifier(client, cache=cache)
+
+    # 기록이 없으면 확인만 하고 기록하지 않음
+    assert not verifier.full_verify_due(0)
+    assert cache.last_full_verify(verifier.manifest.version) is None
+
+    verifier.start_full_verify_clock()
+    assert verifier.full_verify_due(0)
+    assert not verifier.full_verify_due(3600)
+
+    # 일부 파일만 다시 검사한 것은 전체 검증으로 기록하지 않음
+    started = cache.last_full_verify(verifier.manifest.version)
+    verifier.scan(SCAN_DEEP, paths=["patch.MPQ"])
+    assert cache.last_full_verify(verifier.manifest.version) == started
+    cache.close()
@@ -0,0 +1,231 @@
+import hashlib
+import os
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from utils.http_downloader import DownloadItem, HttpDownloader
+from utils.progress import CancellationToken
+
+BLOCK_SIZE = 256 * 1024
+FILE_SIZE = 4 * BLOCK_SIZE + 1234
+
+
+class FastToken(CancellationToken):
+    """재시도 대기 없이 바로 다시 시도"""
+
+    def wait(self, timeout: float) -> bool:
+        return super().wait(0)
+
+
+class MirrorHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        mirror = self.server.mirror
+        data = mirror.files.get(self.path.lstrip("/"))
+        if data is None:
+            self.send_error(404)
+            return
+        start, end = 0, len(data)
+        range_header = self.headers.get("Range")
+        if range_header:
+            first, _, last = range_header[len("bytes="):].partition("-")
+            start, end = int(first), min(int(last) + 1, len(data))
+        with mirror.lock:
+            if mirror.offline:
+                self.send_error(503)
+                return
+            mirror.ranges.append((start, end))
+            corrupt = end - start > 1 and mirror.corrupt > 0
+            if corrupt:
+                mirror.corrupt -= 1
+            drop = end - start > 1 and mirror.drops > 0
+            if drop:
+                mirror.drops -= 1
+                mirror.offline = mirror.offline_after_drop
+
+        body = bytearray(data[start:end])
+        if corrupt:
+            body[0] ^= 0xFF
+        self.send_response(206 if range_header else 200)
+        if range_header:
+            self.send_header("Content-Range", f"bytes {start}-{end - 1}/{len(data)}")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", '"v1"')
+        self.end_headers()
+        if drop:
+            # 응답 중간에 연결 끊기
+            self.wfile.write(body[:len(body) // 2])
+            self.wfile.flush()
+            self.close_connection = True
+            return
+        self.wfile.write(body)
+
+
+class Mirror:
+    def __init__(self):
+        self.files = {}
+        self.ranges = []
+        self.corrupt = 0
+        self.drops = 0
+        self.offline = False
+        self.offline_after_drop = False
+        self.lock = threading.Lock()
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), MirrorHandler)
+        self.server.daemon_threads = True
+        self.server.mirror = self
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}/"
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self._thread.start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+@pytest.fixture
+def mirror():
+    server = Mirror()
+    yield server
+    server.close()
+
+
+def _item(relative_path, data, **kwargs):
+    blocks = [
+        hashlib.sha256(data[i:i + BLOCK_SIZE]).hexdigest()
+        for i in range(0, len(data), BLOCK_SIZE)
+    ]
+    values = dict(
+        relative_path=relative_path, size=len(data),
+        hash=hashlib.sha256(data).hexdigest(), block_size=BLOCK_SIZE, blocks=blocks
+    )
+    values.update(kwargs)
+    return DownloadItem(**values)
+
+
+def _downloader(mirror, tmp_path, **kwargs):
+    return HttpDownloader(
+        mirror.url, tmp_path / "game", tmp_path / "state.json",
+        connections=2, segment_size=BLOCK_SIZE, cancel_token=FastToken(), timeout=5, **kwargs
+    )
+
+
+def test_downloads_and_verifies_segments(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+
+    result = _downloader(mirror, tmp_path).download([_item("Data/common.MPQ", data)])
+
+    assert result.ok
+    assert result.verified == ["Data/common.MPQ"]
+    assert (tmp_path / "game" / "Data" / "common.MPQ").read_bytes() == data
+    assert not (tmp_path / "game" / "Data" / "common.MPQ.part").exists()
+
+
+def test_resumes_from_saved_state(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    mirror.drops = 1
+    mirror.offline_after_drop = True
+
+    first = _downloader(mirror, tmp_path, max_retries=0).download([_item("Data/common.MPQ", data)])
+    assert "Data/common.MPQ" in first.failed
+    assert first.bytes_downloaded > 0
+
+    mirror.offline = False
+    mirror.ranges.clear()
+    second = _downloader(mirror, tmp_path).download([_item("Data/common.MPQ", data)])
+
+    assert second.ok and second.verified == ["Data/common.MPQ"]
+    assert second.bytes_downloaded < len(data)
+    # 끊긴 구간은 받은 위치부터 이어서 요청
+    assert any(start % BLOCK_SIZE for start, end in mirror.ranges)
+    assert (tmp_path / "game" / "Data" / "common.MPQ").read_bytes() == data
+
+
+def test_retries_after_mid_segment_disconnect(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    mirror.drops = 3
+
+    result = _downloader(mirror, tmp_path).download([_item("Data/common.MPQ", data)])
+
+    assert result.ok and result.verified == ["Data/common.MPQ"]
+    assert (tmp_path / "game" / "Data" / "common.MPQ").read_bytes() == data
+
+
+def test_refetches_segment_on_hash_mismatch(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    mirror.corrupt = 2
+
+    result = _downloader(mirror, tmp_path).download([_item("Data/common.MPQ", data)])
+
+    assert result.ok and result.verified == ["Data/common.MPQ"]
+    assert (tmp_path / "game" / "Data" / "common.MPQ").read_bytes() == data
+
+
+def test_wrong_manifest_hash_is_never_installed(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    item = _item("Data/common.MPQ", data)
+    item.blocks[1] = hashlib.sha256(b"not this block").hexdigest()
+
+    for _ in range(2):
+        result = _downloader(mirror, tmp_path, max_retries=1).download([item])
+        assert "Data/common.MPQ" in result.failed
+        assert not result.completed and not result.verified
+        assert not (tmp_path / "game" / "Data" / "common.MPQ").exists()
+
+
+def test_file_without_hash_is_completed_unverified(mirror, tmp_path):
+    data = os.urandom(1000)
+    mirror.files["Data/koKR/realmlist.wtf"] = data
+
+    result = _downloader(mirror, tmp_path).download([
+        DownloadItem("Data/koKR/realmlist.wtf", len(data))
+    ])
+
+    assert result.ok
+    assert result.completed == ["Data/koKR/realmlist.wtf"] and not result.verified
+    assert (tmp_path / "game" / "Data" / "koKR" / "realmlist.wtf").read_bytes() == data
+
+
+def test_pause_holds_workers_until_resume(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    downloader = _downloader(mirror, tmp_path)
+    downloader.pause()
+    results = []
+    thread = threading.Thread(target=lambda: results.append(downloader.download([_item("Data/common.MPQ", data)])))
+    thread.start()
+
+    thread.join(timeout=1)
+    assert thread.is_alive()
+    # 일시정지 중에는 Range 확인 요청 외에 데이터를 요청하지 않음
+    assert all(end - start <= 1 for start, end in mirror.ranges)
+
+    downloader.resume()
+    thread.join(timeout=10)
+    assert results[0].ok and results[0].verified == ["Data/common.MPQ"]
+    assert (tmp_path / "game" / "Data" / "common.MPQ").read_bytes() == data
+
+
+def test_cancel_while_paused(mirror, tmp_path):
+    data = os.urandom(FILE_SIZE)
+    mirror.files["Data/common.MPQ"] = data
+    downloader = _downloader(mirror, tmp_path)
+    downloader.pause()
+    results = []
+    thread = threading.Thread(target=lambda: results.append(downloader.download([_item("Data/common.MPQ", data)])))
+    thread.start()
+
+    downloader.cancel()
+    thread.join(timeout=5)
+    assert not thread.is_alive()
+    assert results[0].cancelled and not results[0].completed
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import socket
+import urllib.error
+import urllib.request
+
+import pytest
+
+from utils.http_downloader import DownloadItem, HttpDownloader
+from utils.lan_peer import LanPeer, _parse_range
+from utils.manifest import Manifest
+from utils.verification_cache import VerificationCache
+
+
+def _free_udp_port() -> int:
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.bind(("", 0))
+        return s.getsockname()[1]
+
+
+def _install(root, data):
+    """검증 캐시에 기록된 Data/common.MPQ 설치"""
+    file_path = root / "Data" / "common.MPQ"
+    file_path.parent.mkdir(parents=True)
+    file_path.write_bytes(data)
+    file_hash = hashlib.sha256(data).hexdigest()
+    manifest = Manifest(files={"common.MPQ": {"hash": file_hash, "size": len(data)}}, version="v1")
+    cache = VerificationCache(root / "cache.db")
+    cache.record(file_path, file_path.stat(), file_hash, manifest.version)
+    return manifest, cache
+
+
+@pytest.fixture
+def peers(tmp_path):
+    """같은 PC에서 실행한 런처 여러 개 (멀티캐스트 루프백으로 서로 찾음)"""
+    discovery_port = _free_udp_port()
+    created = []
+
+    def make(name):
+        root = tmp_path / name
+        root.mkdir()
+        peer = LanPeer(VerificationCache(root / "peer.db"), discovery_port=discovery_port)
+        try:
+            peer.start()
+        except OSError as e:
+            pytest.skip(f"멀티캐스트를 사용할 수 없습니다: {e}")
+        created.append(peer)
+        return peer, root
+
+    yield make
+    for peer in created:
+        peer.stop()
+
+
+def test_discovers_sharing_peers_with_same_version(peers):
+    seeder_a, root_a = peers("a")
+    seeder_b, root_b = peers("b")
+    other, root_other = peers("other")
+    client, _ = peers("client")
+    data = os.urandom(64 * 1024)
+    for seeder, root in ((seeder_a, root_a), (seeder_b, root_b)):
+        manifest, seeder.cache = _install(root, data)
+        seeder.share(root / "Data", manifest)
+    manifest_other, other.cache = _install(root_other, data)
+    manifest_other.version = "v2"
+    other.share(root_other / "Data", manifest_other)
+
+    found = client.discover("v1", timeout=3)
+    for _ in range(10):
+        if len(found) == 2:
+            break
+        found = client.discover("v1", timeout=0.5)
+
+    assert {p.port for p in found} == {seeder_a.server_port, seeder_b.server_port}
+    assert all(p.version == "v1" for p in found)
+
+
+def test_downloads_from_peer_and_refuses_modified_files(peers, tmp_path):
+    seeder, root = peers("seeder")
+    data = os.urandom(600 * 1024)
+    manifest, seeder.cache = _install(root, data)
+    seeder.share(root / "Data", manifest)
+    url = f"http://127.0.0.1:{seeder.server_port}/"
+
+    item = DownloadItem("Data/common.MPQ", len(data), hash=manifest.files["common.MPQ"]["hash"])
+    result = HttpDownloader(url, tmp_path / "client", tmp_path / "state.json", segment_size=256 * 1024).download([item])
+    assert result.ok and result.verified == ["Data/common.MPQ"]
+    assert (tmp_path / "client" / "Data" / "common.MPQ").read_bytes() == data
+
+    # 검증 뒤 바뀐 파일은 제공하지 않음
+    (root / "Data" / "common.MPQ").write_bytes(os.urandom(len(data)))
+    with pytest.raises(urllib.error.HTTPError) as error:
+        urllib.request.urlopen(url + "Data/common.MPQ", timeout=5)
+    assert error.value.code == 404
+
+
+def test_parse_range():
+    assert _parse_range("bytes=0-99", 1000) == (0, 100)
+    assert _parse_range("bytes=900-", 1000) == (900, 1000)
+    assert _parse_range("bytes=-100", 1000) == (900, 1000)
+    assert _parse_range("bytes=0-5000", 1000) == (0, 1000)
+    assert _parse_range("bytes=1000-", 1000) is None
+    assert _parse_range("bytes=0-1,5-6", 1000) is None
@@ -0,0 +1,52 @@
+import hashlib
+import json
+import os
+
+from utils.manifest import build_manifest_document, merkle_root, parse_manifest
+
+BLOCK_SIZE = 1024
+
+
+def _entry(data):
+    blocks = [hashlib.sha256(data[i:i + BLOCK_SIZE]).digest() for i in range(0, len(data), BLOCK_SIZE)]
+    return {
+        "hash": hashlib.sha256(data).hexdigest(),
+        "size": len(data),
+        "root": merkle_root(blocks),
+        "blocks": [b.hex() for b in blocks],
+    }
+
+
+def _parse(files):
+    return parse_manifest(json.dumps(build_manifest_document(files, BLOCK_SIZE)).encode())
+
+
+def test_consistent_blocks_are_kept():
+    manifest = _parse({
+        "common.MPQ": _entry(os.urandom(5 * BLOCK_SIZE + 7)),
+        "patch.MPQ": _entry(os.urandom(100)),
+        "empty.txt": _entry(b""),
+    })
+    assert not manifest.rejected_blocks
+    assert all(manifest.has_blocks(path) for path in manifest.files)
+
+
+def test_inconsistent_blocks_fall_back_to_file_hash():
+    tampered_block = _entry(os.urandom(3 * BLOCK_SIZE))
+    tampered_block["blocks"][1] = hashlib.sha256(b"other").hexdigest()
+    missing_block = _entry(os.urandom(3 * BLOCK_SIZE))
+    missing_block["blocks"].pop()
+    missing_block["root"] = merkle_root([bytes.fromhex(b) for b in missing_block["blocks"]])
+    wrong_hash = _entry(os.urandom(100))
+    wrong_hash["hash"] = hashlib.sha256(b"other").hexdigest()
+
+    manifest = _parse({
+        "good.MPQ": _entry(os.urandom(2 * BLOCK_SIZE)),
+        "tampered.MPQ": tampered_block,
+        "missing.MPQ": missing_block,
+        "wrong_hash.MPQ": wrong_hash,
+    })
+
+    assert sorted(manifest.rejected_blocks) == ["missing.MPQ", "tampered.MPQ", "wrong_hash.MPQ"]
+    assert manifest.has_blocks("good.MPQ")
+    assert not any(manifest.has_blocks(path) for path in manifest.rejected_blocks)
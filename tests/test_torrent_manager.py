@@ -0,0 +1,123 @@
+import asyncio
+from types import SimpleNamespace
+
+from utils.torrent_manager import TorrentManager
+
+
+class FakeAlert:
+    def __init__(self, kind, **values):
+        self.kind = kind
+        self.__dict__.update(values)
+
+    def what(self):
+        return self.kind
+
+    def message(self):
+        return self.kind
+
+
+class FakeHandle:
+    def __init__(self):
+        self.paused = False
+        self.resume_data_requests = 0
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+    def save_resume_data(self):
+        self.resume_data_requests += 1
+
+
+class FakeSession:
+    """TorrentManager가 사용하는 libtorrent 세션 API만 흉내"""
+
+    def __init__(self):
+        self.alerts = []
+        self.notify = None
+        self.handle = None
+        self.settings = {}
+
+    def set_alert_notify(self, callback):
+        self.notify = callback
+
+    def add_torrent(self, params):
+        self.handle = FakeHandle()
+        return self.handle
+
+    def remove_torrent(self, handle):
+        self.handle = None
+
+    def apply_settings(self, settings):
+        self.settings.update(settings)
+
+    def post_torrent_updates(self):
+        if self.handle is None:
+            return
+        status = SimpleNamespace(
+            handle=self.handle, total_wanted=100, total_wanted_done=40,
+            progress=0.4, state="downloading", download_rate=0 if self.handle.paused else 1000
+        )
+        self.push(FakeAlert("state_update", status=[status]))
+
+    def push(self, alert):
+        # libtorrent처럼 내부 스레드에서 알림을 쌓고 notify 호출
+        self.alerts.append(alert)
+        self.notify()
+
+    def pop_alerts(self):
+        alerts, self.alerts = self.alerts, []
+        return alerts
+
+
+def test_pause_and_resume_keep_the_same_download(tmp_path):
+    async def run():
+        loop = asyncio.get_running_loop()
+        session = FakeSession()
+        statuses = []
+        manager = TorrentManager(loop, session=session, status_callback=statuses.append,
+                                 resume_path=tmp_path / "client.resume")
+        task = asyncio.ensure_future(manager.download("client.torrent", "/games/wow"))
+        await asyncio.sleep(0.05)
+        handle = session.handle
+
+        manager.pause()
+        assert handle.paused and handle.resume_data_requests == 1
+        session.push(FakeAlert("torrent_paused"))
+        await asyncio.sleep(0.05)
+        assert statuses[-1].paused and statuses[-1].speed == 0
+
+        manager.resume()
+        session.push(FakeAlert("torrent_resumed"))
+        session.post_torrent_updates()
+        await asyncio.sleep(0.05)
+        assert not handle.paused
+        assert session.handle is handle and not task.done()
+        assert not statuses[-1].paused and statuses[-1].bytes_done == 40
+
+        session.push(FakeAlert("torrent_finished"))
+        await asyncio.wait_for(task, timeout=1)
+
+    asyncio.run(run())
+
+
+def test_cancel_keeps_resume_data_and_cancels_download(tmp_path):
+    async def run():
+        session = FakeSession()
+        manager = TorrentManager(asyncio.get_running_loop(), session=session,
+                                 resume_path=tmp_path / "client.resume")
+        task = asyncio.ensure_future(manager.download("client.torrent", "/games/wow"))
+        await asyncio.sleep(0.05)
+        handle = session.handle
+
+        manager.cancel()
+        assert handle.resume_data_requests == 1 and session.handle is None
+        try:
+            await task
+        except asyncio.CancelledError:
+            return
+        raise AssertionError("download() should be cancelled")
+
+    asyncio.run(run())